@@ -2,138 +2,285 @@
 Configuration settings for Thunderbolts application.
 """
 import os
+from dataclasses import dataclass, field, fields
+from enum import IntFlag, auto
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, ClassVar, Dict, List, Optional, Tuple
 
 
+# Project paths never change at runtime, so build them once at import
+_PROJECT_ROOT = Path(__file__).parent.parent
+_DATA_DIR = _PROJECT_ROOT / "data"
+_MODELS_DIR = _DATA_DIR / "models"
+_TEMP_DIR = _DATA_DIR / "temp"
+
+
+def _to_bool(value) -> bool:
+    """Interpret an environment value as a boolean flag."""
+    return str(value).lower() == "true"
+
+
+def _to_str(value):
+    """Pass strings (and None defaults) through unchanged."""
+    return value
+
+
+# Coercion functions keyed by schema type
+_COERCE = {bool: _to_bool, int: int, float: float, str: _to_str}
+
+
+class Flag(IntFlag):
+    """Boolean feature switches packed into ``Settings.flags``."""
+    WEB_SEARCH = auto()
+    FUNCTION_CALLING = auto()
+    TTS = auto()
+    VOCAL_SEPARATION = auto()
+    EXTRACT_CACHE = auto()
+    CACHE = auto()
+    METRICS = auto()
+
+
+# (flag, environment variable, default)
+_FLAG_SCHEMA = (
+    (Flag.WEB_SEARCH, "ENABLE_WEB_SEARCH", False),
+    (Flag.FUNCTION_CALLING, "ENABLE_FUNCTION_CALLING", False),
+    (Flag.TTS, "ENABLE_TTS", True),
+    (Flag.VOCAL_SEPARATION, "ENABLE_VOCAL_SEPARATION", False),
+    (Flag.EXTRACT_CACHE, "ENABLE_EXTRACT_CACHE", True),
+    (Flag.CACHE, "CACHE_ENABLED", True),
+    (Flag.METRICS, "ENABLE_METRICS", True),
+)
+
+
+def _flag_property(flag: Flag, doc: str) -> property:
+    """Expose a single bit of ``Settings.flags`` as a boolean attribute."""
+    return property(lambda self: bool(self.flags & flag), doc=doc)
+
+
+def _getenv(key: str, default: Any) -> Any:
+    """Read ``key`` from the environment, after loading the .env file."""
+    Settings._load_env_file()
+    return os.environ.get(key, default)
+
+
+def _env_flags() -> Flag:
+    """Feature switches from the environment."""
+    flags = Flag(0)
+    for flag, key, default in _FLAG_SCHEMA:
+        if _to_bool(_getenv(key, default)):
+            flags |= flag
+    return flags
+
+
+def _env(key: str, typ: type, default: Any) -> Any:
+    """Declare a settings field read from environment variable ``key``.
+
+    The field defaults to the environment value, so ``Settings()`` reads the
+    environment like ``Settings.from_env()``.
+    """
+    coerce = _COERCE[typ]
+    return field(
+        default_factory=lambda: coerce(_getenv(key, default)),
+        metadata={"env": key, "coerce": coerce, "default": default},
+    )
+
+
+@dataclass(frozen=True, slots=True)
 class Settings:
-    """Application settings with environment variable support."""
+    """Application settings with environment variable support.
+
+    Instances are immutable. ``Settings()`` reads the environment (and the
+    .env file); ``Settings.from_env()`` does the same with one pass over the
+    environment, and ``get_settings()`` returns the shared instance.
+    """
+
+    # Parsed .env contents keyed by (path, mtime_ns)
+    _ENV_CACHE: ClassVar[Dict[Tuple[str, int], Dict[str, str]]] = {}
+
+    # Application Settings
+    app_name: str = _env("APP_NAME", str, "Thunderbolts")
+    app_version: str = _env("APP_VERSION", str, "1.0.0")
+    debug: bool = _env("DEBUG", bool, False)
+    log_level: str = _env("LOG_LEVEL", str, "INFO")
+    use_openai: bool = _env("USE_OPENAI", bool, True)
+
+    # Azure OpenAI Configuration
+    azure_openai_api_key: Optional[str] = _env("AZURE_OPENAI_API_KEY", str, None)
+    azure_openai_endpoint: Optional[str] = _env("AZURE_OPENAI_ENDPOINT", str, None)
+    azure_openai_api_version: str = _env("AZURE_OPENAI_API_VERSION", str, "2024-02-15-preview")
+    azure_openai_deployment_name: str = _env("AZURE_OPENAI_DEPLOYMENT_NAME", str, "gpt-4")
+    azure_openai_embedding_deployment: str = _env("AZURE_OPENAI_EMBEDDING_DEPLOYMENT", str, "text-embedding-ada-002")
+
+    # OpenAI Configuration (and compatible providers)
+    openai_api_key: Optional[str] = _env("OPENAI_API_KEY", str, None)
+    openai_base_url: str = _env("OPENAI_BASE_URL", str, "https://api.openai.com/v1")
+    openai_chat_model: Optional[str] = _env("OPENAI_CHAT_MODEL", str, None)
+    openai_embedding_api_key: Optional[str] = _env("OPENAI_EMBEDDINGS_API_KEY", str, None)
+    openai_embedding_model: Optional[str] = _env("OPENAI_EMBEDDING_MODEL", str, None)
+
+    # OpenAI Model Parameters
+    openai_temperature: float = _env("OPENAI_TEMPERATURE", float, 0.7)
+    openai_max_tokens: int = _env("OPENAI_MAX_TOKENS", int, 2000)
+    openai_top_p: float = _env("OPENAI_TOP_P", float, 0.9)
+    openai_frequency_penalty: float = _env("OPENAI_FREQUENCY_PENALTY", float, 0.0)
+    openai_presence_penalty: float = _env("OPENAI_PRESENCE_PENALTY", float, 0.0)
 
-    def __init__(self):
+    # Google Search API
+    google_api_key: Optional[str] = _env("GOOGLE_API_KEY", str, None)
+    google_cse_id: Optional[str] = _env("GOOGLE_CSE_ID", str, None)
+
+    # SerpAPI
+    serpapi_api_key: Optional[str] = _env("SERPAPI_API_KEY", str, None)
+
+    # File Processing Settings
+    max_file_size_mb: int = _env("MAX_FILE_SIZE_MB", int, 500)
+
+    # Document extraction performance/caching
+    # Consider PDFs larger than this size (MB) as large; prefer PyMuPDF when available
+    pdf_large_file_size_mb: int = _env("PDF_LARGE_FILE_SIZE_MB", int, 15)
+
+    # Vector Database Settings
+    vector_db_path: str = _env("VECTOR_DB_PATH", str, "./data/vectordb")
+    # Local embedding model name (used only when not using OpenAI)
+    chunk_size: int = _env("CHUNK_SIZE", int, 1000)
+    chunk_overlap: int = _env("CHUNK_OVERLAP", int, 200)
+    max_chunks_per_query: int = _env("MAX_CHUNKS_PER_QUERY", int, 10)
+
+    # Search Settings
+    similarity_threshold: float = _env("SIMILARITY_THRESHOLD", float, 0.7)
+    max_web_search_results: int = _env("MAX_WEB_SEARCH_RESULTS", int, 5)
+    rerank_top_k: int = _env("RERANK_TOP_K", int, 5)
+    max_results: int = _env("MAX_RESULTS", int, 10)
+
+    # Audio Processing Settings
+    audio_sample_rate: int = _env("AUDIO_SAMPLE_RATE", int, 16000)
+    noise_reduction_strength: float = _env("NOISE_REDUCTION_STRENGTH", float, 0.8)
+    vocal_separation_model: str = _env("VOCAL_SEPARATION_MODEL", str, "spleeter:2stems-16kHz")
+    tts_voice: str = _env("TTS_VOICE", str, "alloy")
+
+    # Language Settings
+    default_language: str = _env("DEFAULT_LANGUAGE", str, "vi")
+
+    # Interface Settings
+    # Removed per reliance on Streamlit global theme
+    auto_save: bool = _env("AUTO_SAVE", bool, True)
+    # Deprecated UI flags removed for simplicity:
+    # show_processing_time, show_confidence_score, enable_animations
+
+    # Performance Settings
+    disable_nltk_downloads: bool = _env("DISABLE_NLTK_DOWNLOADS", bool, True)
+    backup_enabled: bool = _env("BACKUP_ENABLED", bool, True)
+
+    # Feature switches (see Flag); also exposed as enable_* properties below
+    flags: Flag = field(default_factory=_env_flags)
+
+    # Static (non-environment) settings
+    supported_video_formats: List[str] = field(
+        default_factory=lambda: ["mp4", "avi", "mov", "mkv", "webm"])
+    supported_audio_formats: List[str] = field(
+        default_factory=lambda: ["mp3", "wav", "m4a", "flac", "ogg"])
+    supported_document_formats: List[str] = field(
+        default_factory=lambda: ["pdf", "docx", "txt", "xlsx", "ppt", "pptx", "csv"])
+    supported_languages: List[str] = field(
+        default_factory=lambda: ["vi", "en", "zh", "ja", "ko"])
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        """Build settings from environment variables and the .env file."""
         # Load environment variables from .env file before reading them
-        self._load_env_file()
-
-        # Application Settings
-        self.app_name = os.getenv("APP_NAME", "Thunderbolts")
-        self.app_version = os.getenv("APP_VERSION", "1.0.0")
-        self.debug = os.getenv("DEBUG", "False").lower() == "true"
-        self.log_level = os.getenv("LOG_LEVEL", "INFO")
-        self.use_openai = os.getenv("USE_OPENAI", "True").lower() == "true"
-
-        # Azure OpenAI Configuration
-        self.azure_openai_api_key = os.getenv("AZURE_OPENAI_API_KEY")
-        self.azure_openai_endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
-        self.azure_openai_api_version = os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-15-preview")
-        self.azure_openai_deployment_name = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-4")
-        self.azure_openai_embedding_deployment = os.getenv("AZURE_OPENAI_EMBEDDING_DEPLOYMENT", "text-embedding-ada-002")
-
-        # OpenAI Configuration (and compatible providers)
-        self.openai_api_key = os.getenv("OPENAI_API_KEY")
-        self.openai_base_url = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
-        self.openai_chat_model = os.getenv("OPENAI_CHAT_MODEL")
-        self.openai_embedding_api_key = os.getenv("OPENAI_EMBEDDINGS_API_KEY")
-        self.openai_embedding_model = os.getenv("OPENAI_EMBEDDING_MODEL")
-        
-        # OpenAI Model Parameters
-        self.openai_temperature = float(os.getenv("OPENAI_TEMPERATURE", "0.7"))
-        self.openai_max_tokens = int(os.getenv("OPENAI_MAX_TOKENS", "2000"))
-        self.openai_top_p = float(os.getenv("OPENAI_TOP_P", "0.9"))
-        self.openai_frequency_penalty = float(os.getenv("OPENAI_FREQUENCY_PENALTY", "0.0"))
-        self.openai_presence_penalty = float(os.getenv("OPENAI_PRESENCE_PENALTY", "0.0"))
-
-        # Google Search API
-        self.google_api_key = os.getenv("GOOGLE_API_KEY")
-        self.google_cse_id = os.getenv("GOOGLE_CSE_ID")
-
-        # SerpAPI
-        self.serpapi_api_key = os.getenv("SERPAPI_API_KEY")
-
-        # File Processing Settings
-        self.max_file_size_mb = int(os.getenv("MAX_FILE_SIZE_MB", "500"))
-        self.supported_video_formats = ["mp4", "avi", "mov", "mkv", "webm"]
-        self.supported_audio_formats = ["mp3", "wav", "m4a", "flac", "ogg"]
-        self.supported_document_formats = ["pdf", "docx", "txt", "xlsx", "ppt", "pptx", "csv"]
-
-        # Document extraction performance/caching
-        self.enable_extract_cache = os.getenv("ENABLE_EXTRACT_CACHE", "True").lower() == "true"
-        # Consider PDFs larger than this size (MB) as large; prefer PyMuPDF when available
-        self.pdf_large_file_size_mb = int(os.getenv("PDF_LARGE_FILE_SIZE_MB", "15"))
-
-        # Vector Database Settings
-        self.vector_db_path = os.getenv("VECTOR_DB_PATH", "./data/vectordb")
-        # Local embedding model name (used only when not using OpenAI)
-        self.chunk_size = int(os.getenv("CHUNK_SIZE", "1000"))
-        self.chunk_overlap = int(os.getenv("CHUNK_OVERLAP", "200"))
-        self.max_chunks_per_query = int(os.getenv("MAX_CHUNKS_PER_QUERY", "10"))
-
-        # Search Settings
-        self.similarity_threshold = float(os.getenv("SIMILARITY_THRESHOLD", "0.7"))
-        self.max_web_search_results = int(os.getenv("MAX_WEB_SEARCH_RESULTS", "5"))
-        self.rerank_top_k = int(os.getenv("RERANK_TOP_K", "5"))
-        self.max_results = int(os.getenv("MAX_RESULTS", "10"))
-        self.enable_web_search = os.getenv("ENABLE_WEB_SEARCH", "False").lower() == "true"
-        self.enable_function_calling = os.getenv("ENABLE_FUNCTION_CALLING", "False").lower() == "true"
-
-        # Audio Processing Settings
-        self.audio_sample_rate = int(os.getenv("AUDIO_SAMPLE_RATE", "16000"))
-        self.noise_reduction_strength = float(os.getenv("NOISE_REDUCTION_STRENGTH", "0.8"))
-        self.vocal_separation_model = os.getenv("VOCAL_SEPARATION_MODEL", "spleeter:2stems-16kHz")
-        self.enable_tts = os.getenv("ENABLE_TTS", "True").lower() == "true"
-        self.tts_voice = os.getenv("TTS_VOICE", "alloy")
-        self.enable_vocal_separation = os.getenv("ENABLE_VOCAL_SEPARATION", "False").lower() == "true"
-
-        # Language Settings
-        self.default_language = os.getenv("DEFAULT_LANGUAGE", "vi")
-        self.supported_languages = ["vi", "en", "zh", "ja", "ko"]
-        
-        # Interface Settings
-        # Removed per reliance on Streamlit global theme
-        self.auto_save = os.getenv("AUTO_SAVE", "True").lower() == "true"
-        # Deprecated UI flags removed for simplicity:
-        # show_processing_time, show_confidence_score, enable_animations
-        
-        # Performance Settings
-        self.disable_nltk_downloads = os.getenv("DISABLE_NLTK_DOWNLOADS", "True").lower() == "true"
-        self.cache_enabled = os.getenv("CACHE_ENABLED", "True").lower() == "true"
-        self.enable_metrics = os.getenv("ENABLE_METRICS", "True").lower() == "true"
-        self.backup_enabled = os.getenv("BACKUP_ENABLED", "True").lower() == "true"
-
-    def _load_env_file(self):
-        """Load environment variables from .env file."""
+        cls._load_env_file()
+
+        getenv = os.environ.get
+        flags = Flag(0)
+        for flag, key, default in _FLAG_SCHEMA:
+            if _to_bool(getenv(key, default)):
+                flags |= flag
+
+        return cls(flags=flags, **{
+            attr: coerce(getenv(key, default))
+            for attr, key, coerce, default in _SCHEMA
+        })
+
+    enable_web_search = _flag_property(Flag.WEB_SEARCH, "Web search fallback enabled.")
+    enable_function_calling = _flag_property(Flag.FUNCTION_CALLING, "LLM function calling enabled.")
+    enable_tts = _flag_property(Flag.TTS, "Text-to-speech enabled.")
+    enable_vocal_separation = _flag_property(Flag.VOCAL_SEPARATION, "Vocal separation enabled.")
+    enable_extract_cache = _flag_property(Flag.EXTRACT_CACHE, "Document extraction cache enabled.")
+    cache_enabled = _flag_property(Flag.CACHE, "General caching enabled.")
+    enable_metrics = _flag_property(Flag.METRICS, "Metrics collection enabled.")
+
+    @classmethod
+    def _load_env_file(cls) -> None:
+        """Load environment variables from .env file.
+
+        The file is parsed natively and cached by path and mtime, so repeated
+        constructions skip it entirely. Existing environment variables win.
+        """
+        env_file = _PROJECT_ROOT / ".env"
         try:
-            from dotenv import load_dotenv
-            env_file = Path(__file__).parent.parent / ".env"
-            if env_file.exists():
-                load_dotenv(env_file)
-        except ImportError:
-            pass  # dotenv not available, skip
+            stat = env_file.stat()
+        except OSError:
+            return  # no .env file, skip
+
+        cache_key = (str(env_file), stat.st_mtime_ns)
+        if cache_key in cls._ENV_CACHE:
+            return
+
+        values = cls._parse_env_file(env_file)
+
+        cls._ENV_CACHE = {cache_key: values}
+        for key, value in values.items():
+            os.environ.setdefault(key, value)
+
+    @staticmethod
+    def _parse_env_file(env_file: Path) -> Dict[str, str]:
+        """Parse KEY=VALUE lines, skipping blanks and comments."""
+        values: Dict[str, str] = {}
+        for line in env_file.read_text(encoding="utf-8").splitlines():
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("export "):
+                line = line[7:].lstrip()
+
+            key, sep, value = line.partition("=")
+            if not sep:
+                continue
+            value = value.strip()
+            if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+                value = value[1:-1]
+            elif " #" in value:
+                value = value.split(" #", 1)[0].rstrip()
+            values[key.strip()] = value
+        return values
 
     @property
     def project_root(self) -> Path:
         """Get project root directory."""
-        return Path(__file__).parent.parent
+        return _PROJECT_ROOT
 
     @property
     def data_dir(self) -> Path:
         """Get data directory."""
-        return self.project_root / "data"
+        return _DATA_DIR
 
     @property
     def models_dir(self) -> Path:
         """Get models directory."""
-        return self.data_dir / "models"
+        return _MODELS_DIR
 
     @property
     def temp_dir(self) -> Path:
         """Get temporary files directory."""
-        return self.data_dir / "temp"
+        return _TEMP_DIR
 
     def ensure_directories(self) -> None:
         """Create necessary directories if they don't exist."""
         directories = [
-            self.data_dir,
-            self.models_dir,
-            self.temp_dir,
+            _DATA_DIR,
+            _MODELS_DIR,
+            _TEMP_DIR,
             Path(self.vector_db_path).parent
         ]
 
@@ -141,5 +288,20 @@ class Settings:
             directory.mkdir(parents=True, exist_ok=True)
 
 
+# (attribute, environment variable, coercion function, default), derived from the
+# field declarations with coercions resolved up front
+_SCHEMA = tuple(
+    (f.name, f.metadata["env"], f.metadata["coerce"], f.metadata["default"])
+    for f in fields(Settings)
+    if "env" in f.metadata
+)
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Get the process-wide settings instance, constructing it on first use."""
+    return Settings.from_env()
+
+
 # Global settings instance
-settings = Settings()
+settings = get_settings()
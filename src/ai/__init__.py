@@ -1,12 +1,20 @@
 """
 AI integration modules for Thunderbolts.
+
+Submodules are imported lazily on first attribute access (PEP 562), so
+importing ``src.ai`` does not pull in the OpenAI/LangChain stacks.
 """
 
-from .llm_client import LLMClient
-from .prompt_engineer import PromptEngineer
-from .function_calling import FunctionCaller
-from .summarizer import Summarizer
-from .multimodal import MultiModalAI
+import importlib
+from typing import Any
+
+_LAZY = {
+    "LLMClient": (".llm_client", "LLMClient"),
+    "PromptEngineer": (".prompt_engineer", "PromptEngineer"),
+    "FunctionCaller": (".function_calling", "FunctionCaller"),
+    "Summarizer": (".summarizer", "Summarizer"),
+    "MultiModalAI": (".multimodal", "MultiModalAI"),
+}
 
 __all__ = [
     "LLMClient",
@@ -15,3 +23,17 @@ __all__ = [
     "Summarizer",
     "MultiModalAI"
 ]
+
+
+def __getattr__(name: str) -> Any:
+    try:
+        module_name, attr = _LAZY[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    obj = getattr(importlib.import_module(module_name, __name__), attr)
+    globals()[name] = obj
+    return obj
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -3,53 +3,63 @@ Function calling module for Thunderbolts.
 Handles Azure OpenAI function calling capabilities.
 """
 import json
-from typing import List, Dict, Any, Optional, Callable, Union
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Callable, Union, FrozenSet, NamedTuple
 from datetime import datetime
 
-from config.settings import settings
+try:
+    import orjson
+    from orjson import loads as _loads  # raises a json.JSONDecodeError subclass
+
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+except ImportError:
+    from json import loads as _loads
+
+    def _dumps(obj: Any) -> str:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
 from src.utils.logger import logger
 from src.utils.exceptions import LLMError
 
 
-@dataclass
-class FunctionDefinition:
+# Upper bound of function calls from one response executed concurrently
+_MAX_PARALLEL_CALLS = 8
+
+
+def _format_readable(now: datetime) -> str:
+    """Format as YYYY-MM-DD HH:MM:SS without going through strftime."""
+    return (f"{now.year:04d}-{now.month:02d}-{now.day:02d} "
+            f"{now.hour:02d}:{now.minute:02d}:{now.second:02d}")
+
+
+# Formatters for get_current_time; unknown formats fall back to readable
+_TIME_FORMATTERS: Dict[str, Callable[[datetime], str]] = {
+    "iso": datetime.isoformat,
+    "timestamp": lambda now: str(int(now.timestamp())),
+    "readable": _format_readable,
+}
+
+
+class FunctionDefinition(NamedTuple):
     """Definition of a callable function."""
     name: str
     description: str
     parameters: Dict[str, Any]
     function: Callable
-    required_params: List[str]
+    required_params: FrozenSet[str]
 
 
 class FunctionCaller:
     """Handles function calling for LLM interactions."""
     
-    def __init__(self, config: Optional[Dict[str, Any]] = None):
-        """
-        Initialize the function caller.
-        
-        Args:
-            config: Optional configuration dictionary
-        """
-        self.config = config or {}
-        self.settings = settings
-        self.logger = logger
-        
-        # Registry of available functions
-        self.functions: Dict[str, FunctionDefinition] = {}
-        
-        # Register built-in functions
-        self._register_builtin_functions()
-    
-    def _register_builtin_functions(self) -> None:
-        """Register built-in functions."""
-        
-        # Search function
-        self.register_function(
-            name="search_documents",
-            description="Search through the document database for relevant information",
-            parameters={
+    # Built-in functions: (name, description, parameter schema, method name).
+    # Built once at class definition and shared by all instances.
+    _BUILTIN_SCHEMAS = (
+        (
+            "search_documents",
+            "Search through the document database for relevant information",
+            {
                 "type": "object",
                 "properties": {
                     "query": {
@@ -69,14 +79,12 @@ class FunctionCaller:
                 },
                 "required": ["query"]
             },
-            function=self._search_documents
-        )
-        
-        # Get document info function
-        self.register_function(
-            name="get_document_info",
-            description="Get detailed information about a specific document",
-            parameters={
+            "_search_documents",
+        ),
+        (
+            "get_document_info",
+            "Get detailed information about a specific document",
+            {
                 "type": "object",
                 "properties": {
                     "document_id": {
@@ -86,14 +94,12 @@ class FunctionCaller:
                 },
                 "required": ["document_id"]
             },
-            function=self._get_document_info
-        )
-        
-        # Calculate statistics function
-        self.register_function(
-            name="calculate_statistics",
-            description="Calculate basic statistics for a list of numbers",
-            parameters={
+            "_get_document_info",
+        ),
+        (
+            "calculate_statistics",
+            "Calculate basic statistics for a list of numbers",
+            {
                 "type": "object",
                 "properties": {
                     "numbers": {
@@ -109,14 +115,12 @@ class FunctionCaller:
                 },
                 "required": ["numbers"]
             },
-            function=self._calculate_statistics
-        )
-        
-        # Get current time function
-        self.register_function(
-            name="get_current_time",
-            description="Get the current date and time",
-            parameters={
+            "_calculate_statistics",
+        ),
+        (
+            "get_current_time",
+            "Get the current date and time",
+            {
                 "type": "object",
                 "properties": {
                     "format": {
@@ -127,8 +131,39 @@ class FunctionCaller:
                 },
                 "required": []
             },
-            function=self._get_current_time
-        )
+            "_get_current_time",
+        ),
+    )
+    
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the function caller.
+        
+        Args:
+            config: Optional configuration dictionary
+        """
+        self.config = config or {}
+        
+        # Registry of available functions
+        self.functions: Dict[str, FunctionDefinition] = {}
+        # Prebuilt validate-and-call closures, keyed by function name
+        self._dispatch: Dict[str, Callable[[Dict[str, Any]], Any]] = {}
+        # OpenAI-format definitions, rebuilt only after a registration
+        self._defs_cache: Optional[List[Dict[str, Any]]] = None
+        self._tools_cache: Optional[List[Dict[str, Any]]] = None
+        
+        # Register built-in functions
+        self._register_builtin_functions()
+    
+    def _register_builtin_functions(self) -> None:
+        """Register built-in functions."""
+        for name, description, parameters, method_name in self._BUILTIN_SCHEMAS:
+            self.register_function(
+                name=name,
+                description=description,
+                parameters=parameters,
+                function=getattr(self, method_name)
+            )
     
     def register_function(self, name: str, description: str, parameters: Dict[str, Any], 
                          function: Callable) -> None:
@@ -141,37 +176,69 @@ class FunctionCaller:
             parameters: JSON schema for parameters
             function: Callable function
         """
-        required_params = parameters.get("required", [])
-        
         func_def = FunctionDefinition(
-            name=name,
-            description=description,
-            parameters=parameters,
-            function=function,
-            required_params=required_params
+            name,
+            description,
+            parameters,
+            function,
+            frozenset(parameters.get("required", ()))
         )
         
         self.functions[name] = func_def
-        self.logger.info(f"Registered function: {name}")
+        self._dispatch[name] = self._build_dispatch(function, func_def.required_params)
+        self._defs_cache = None
+        self._tools_cache = None
+        logger.info("Registered function: %s", name)
     
+    @staticmethod
+    def _build_dispatch(function: Callable, required: FrozenSet[str]) -> Callable[[Dict[str, Any]], Any]:
+        """Build a closure that validates required parameters and calls the function."""
+        def _dispatch(args: Dict[str, Any]) -> Any:
+            missing = required - args.keys()
+            if missing:
+                raise LLMError(f"Missing required parameter: {', '.join(sorted(missing))}")
+            return function(**args)
+
+        return _dispatch
+
     def get_function_definitions(self) -> List[Dict[str, Any]]:
         """
         Get function definitions in OpenAI format.
         
+        The list is cached until the next registration and shared between
+        callers, so treat it as read-only.
+        
         Returns:
             List of function definitions
         """
-        definitions = []
+        if self._defs_cache is None:
+            self._defs_cache = [
+                {
+                    "name": func_def.name,
+                    "description": func_def.description,
+                    "parameters": func_def.parameters
+                }
+                for func_def in self.functions.values()
+            ]
         
-        for func_def in self.functions.values():
-            definition = {
-                "name": func_def.name,
-                "description": func_def.description,
-                "parameters": func_def.parameters
-            }
-            definitions.append(definition)
+        return self._defs_cache
+    
+    def get_tool_definitions(self) -> List[Dict[str, Any]]:
+        """
+        Get function definitions in the OpenAI ``tools`` format.
+        
+        Cached like get_function_definitions; treat it as read-only.
         
-        return definitions
+        Returns:
+            List of tool definitions
+        """
+        if self._tools_cache is None:
+            self._tools_cache = [
+                {"type": "function", "function": definition}
+                for definition in self.get_function_definitions()
+            ]
+        
+        return self._tools_cache
     
     def call_function(self, function_name: str, arguments: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -187,37 +254,26 @@ class FunctionCaller:
         Raises:
             LLMError: If function call fails
         """
-        if function_name not in self.functions:
+        dispatch = self._dispatch.get(function_name)
+        if dispatch is None:
             raise LLMError(f"Unknown function: {function_name}")
         
-        func_def = self.functions[function_name]
-        
         try:
             # Parse arguments if string
-            if isinstance(arguments, str):
-                args = json.loads(arguments)
-            else:
-                args = arguments
-            
-            # Validate required parameters
-            for param in func_def.required_params:
-                if param not in args:
-                    raise LLMError(f"Missing required parameter: {param}")
-            
-            # Call function
-            self.logger.info(f"Calling function: {function_name} with args: {args}")
-            result = func_def.function(**args)
+            args = _loads(arguments) if isinstance(arguments, str) else arguments
             
+            # Validate required parameters and call function
+            logger.info("Calling function: %s with args: %s", function_name, args)
             return {
                 "success": True,
-                "result": result,
+                "result": dispatch(args),
                 "function_name": function_name
             }
             
         except json.JSONDecodeError as e:
             raise LLMError(f"Invalid JSON arguments: {e}")
         except Exception as e:
-            self.logger.error(f"Function call failed: {e}")
+            logger.error("Function call failed: %s", e)
             return {
                 "success": False,
                 "error": str(e),
@@ -228,29 +284,31 @@ class FunctionCaller:
         """
         Process multiple function calls.
         
+        Calls are independent, so several are run concurrently in threads;
+        results keep the order of ``function_calls``.
+        
         Args:
             function_calls: List of function calls
             
         Returns:
             List of function results
         """
-        results = []
+        if len(function_calls) <= 1:
+            return [self._process_one(call) for call in function_calls]
         
-        for call in function_calls:
-            function_name = call.get('name')
-            arguments = call.get('arguments')
-            
-            if not function_name:
-                results.append({
-                    "success": False,
-                    "error": "Missing function name"
-                })
-                continue
-            
-            result = self.call_function(function_name, arguments)
-            results.append(result)
+        with ThreadPoolExecutor(max_workers=min(_MAX_PARALLEL_CALLS, len(function_calls))) as executor:
+            return list(executor.map(self._process_one, function_calls))
+    
+    def _process_one(self, call: Dict[str, Any]) -> Dict[str, Any]:
+        """Process a single function call entry."""
+        function_name = call.get('name')
+        if not function_name:
+            return {
+                "success": False,
+                "error": "Missing function name"
+            }
         
-        return results
+        return self.call_function(function_name, call.get('arguments'))
     
     # Built-in function implementations
     
@@ -297,21 +355,24 @@ class FunctionCaller:
             if not numbers:
                 return {"error": "Empty number list"}
             
-            import statistics
+            import numpy as np
+            
+            # Single conversion, then vectorized reductions
+            arr = np.asarray(numbers, dtype=np.float64)
             
             stats = {
-                "count": len(numbers),
-                "sum": sum(numbers),
-                "mean": statistics.mean(numbers),
-                "min": min(numbers),
-                "max": max(numbers)
+                "count": int(arr.size),
+                "sum": float(arr.sum()),
+                "mean": float(arr.mean()),
+                "min": float(arr.min()),
+                "max": float(arr.max())
             }
             
-            if len(numbers) > 1:
-                stats["stdev"] = statistics.stdev(numbers)
+            if arr.size > 1:
+                stats["stdev"] = float(arr.std(ddof=1))
             
             if include_median:
-                stats["median"] = statistics.median(numbers)
+                stats["median"] = float(np.median(arr))
             
             return stats
             
@@ -322,13 +383,7 @@ class FunctionCaller:
         """Get current time function implementation."""
         try:
             now = datetime.now()
-            
-            if format == "iso":
-                time_str = now.isoformat()
-            elif format == "timestamp":
-                time_str = str(int(now.timestamp()))
-            else:  # readable
-                time_str = now.strftime("%Y-%m-%d %H:%M:%S")
+            time_str = _TIME_FORMATTERS.get(format, _format_readable)(now)
             
             return {
                 "current_time": time_str,
@@ -349,23 +404,49 @@ class FunctionCaller:
         Returns:
             Message dictionary
         """
-        results_text = []
-        
-        for result in function_results:
-            if result.get("success"):
-                function_name = result.get("function_name", "unknown")
-                function_result = result.get("result", {})
-                results_text.append(f"Function '{function_name}' returned: {json.dumps(function_result, indent=2)}")
-            else:
-                function_name = result.get("function_name", "unknown")
-                error = result.get("error", "Unknown error")
-                results_text.append(f"Function '{function_name}' failed: {error}")
-        
         return {
             "role": "function",
-            "content": "\n\n".join(results_text)
+            "content": "\n\n".join(self._result_text(result) for result in function_results)
         }
     
+    def create_tool_messages(self, function_calls: List[Dict[str, Any]],
+                             function_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Create the assistant tool-call message and one tool message per result.
+        
+        Args:
+            function_calls: Tool calls requested by the model (with ``id``)
+            function_results: Results from process_function_calls, in the same order
+            
+        Returns:
+            Messages to append to the conversation
+        """
+        messages: List[Dict[str, Any]] = [{
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [
+                {
+                    "id": call["id"],
+                    "type": "function",
+                    "function": {"name": call.get("name"), "arguments": call.get("arguments") or "{}"}
+                }
+                for call in function_calls
+            ]
+        }]
+        messages.extend(
+            {"role": "tool", "tool_call_id": call["id"], "content": self._result_text(result)}
+            for call, result in zip(function_calls, function_results)
+        )
+        return messages
+    
+    @staticmethod
+    def _result_text(result: Dict[str, Any]) -> str:
+        """Describe one function result for the model."""
+        function_name = result.get("function_name", "unknown")
+        if result.get("success"):
+            return f"Function '{function_name}' returned: {_dumps(result.get('result', {}))}"
+        return f"Function '{function_name}' failed: {result.get('error', 'Unknown error')}"
+    
     def get_available_functions(self) -> List[str]:
         """
         Get list of available function names.
@@ -394,5 +475,5 @@ class FunctionCaller:
             "name": func_def.name,
             "description": func_def.description,
             "parameters": func_def.parameters,
-            "required_parameters": func_def.required_params
+            "required_parameters": list(func_def.parameters.get("required", []))
         }
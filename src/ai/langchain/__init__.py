@@ -1,11 +1,18 @@
 """
 LangChain integration components (opt-in via feature flags).
+
+Components are imported lazily on first attribute access (PEP 562).
 """
 
-from .prompt_manager import LangchainPromptManager
-from .llm_client import LangchainLLMClient
-from .memory_manager import LangchainMemoryManager
-from .output_parsers import LangchainOutputParser
+import importlib
+from typing import Any
+
+_LAZY = {
+    "LangchainPromptManager": (".prompt_manager", "LangchainPromptManager"),
+    "LangchainLLMClient": (".llm_client", "LangchainLLMClient"),
+    "LangchainMemoryManager": (".memory_manager", "LangchainMemoryManager"),
+    "LangchainOutputParser": (".output_parsers", "LangchainOutputParser"),
+}
 
 __all__ = [
     "LangchainPromptManager",
@@ -15,3 +22,15 @@ __all__ = [
 ]
 
 
+def __getattr__(name: str) -> Any:
+    try:
+        module_name, attr = _LAZY[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    obj = getattr(importlib.import_module(module_name, __name__), attr)
+    globals()[name] = obj
+    return obj
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -1,15 +1,225 @@
-from typing import List, Dict, Any, Optional
-
-try:
-    from langchain_openai import ChatOpenAI
-    from langchain.schema import SystemMessage, HumanMessage, AIMessage
-except Exception:  # pragma: no cover
-    ChatOpenAI = None  # type: ignore
-    SystemMessage = None  # type: ignore
-    HumanMessage = None  # type: ignore
-    AIMessage = None  # type: ignore
+import asyncio
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, AsyncIterator, Callable, Generator, Set
 
 from config.settings import settings
+from src.utils.cache import SemanticCache, load_local_embedder
+
+# Responses are only cached for (near-)deterministic generations
+_CACHE_MAX_TEMPERATURE = 0.3
+_OVERRIDE_KEYS = {"model_name", "temperature", "max_tokens", "top_p", "frequency_penalty", "presence_penalty"}
+# Per-call override shapes are few (e.g. a "fast mode" max_tokens); keep a small pool
+_OVERRIDE_CACHE_SIZE = 16
+
+
+_DEFAULT_BASE_URL = "https://api.openai.com/v1"
+# (config key, settings attribute, default) resolved once per config change
+_CONFIG_FALLBACKS = (
+    ("model_name", "openai_chat_model", "gpt-4o-mini"),
+    ("temperature", "openai_temperature", 0.7),
+    ("max_tokens", "openai_max_tokens", 2000),
+    ("top_p", "openai_top_p", 0.9),
+    ("frequency_penalty", "openai_frequency_penalty", 0.0),
+    ("presence_penalty", "openai_presence_penalty", 0.0),
+)
+
+
+@dataclass(frozen=True, slots=True)
+class _EffectiveCfg:
+    """Generation parameters after config -> settings -> default resolution."""
+
+    model_name: str
+    temperature: float
+    max_tokens: int
+    top_p: float
+    frequency_penalty: float
+    presence_penalty: float
+
+    @classmethod
+    def resolve(cls, config: Dict[str, Any]) -> "_EffectiveCfg":
+        resolved = {}
+        for key, attr, default in _CONFIG_FALLBACKS:
+            value = config.get(key)
+            if value is None:
+                value = getattr(settings, attr, None)
+            resolved[key] = default if value is None else value
+        return cls(**resolved)
+
+    def llm_params(self, http_async_client: Any = None, **overrides: Any) -> Dict[str, Any]:
+        """Keyword arguments for ChatOpenAI, with optional per-call overrides.
+
+        Pass ``http_async_client`` (from `_loop_http_client`) for models used
+        on an event loop.
+        """
+        params = {
+            "model": overrides.get("model_name", self.model_name),
+            "temperature": overrides.get("temperature", self.temperature),
+            "max_tokens": overrides.get("max_tokens", self.max_tokens),
+            "top_p": overrides.get("top_p", self.top_p),
+            "frequency_penalty": overrides.get("frequency_penalty", self.frequency_penalty),
+            "presence_penalty": overrides.get("presence_penalty", self.presence_penalty),
+            "openai_api_key": settings.openai_api_key,
+        }
+        params["http_client"] = _shared_http_client()
+        if http_async_client is not None:
+            params["http_async_client"] = http_async_client
+        # Custom base URL for compatible providers like Ollama, LM Studio, etc.
+        if settings.openai_base_url and settings.openai_base_url != _DEFAULT_BASE_URL:
+            params["openai_api_base"] = settings.openai_base_url
+        return params
+
+
+_LANGCHAIN = None
+# Marks a lazily constructed attribute that has not been built yet
+_UNSET = object()
+
+
+def _lazy_import():
+    """Import LangChain chat classes on first use.
+
+    Returns ``(ChatOpenAI, SystemMessage, HumanMessage, AIMessage)``, all None
+    when LangChain is not installed.
+    """
+    global _LANGCHAIN
+    if _LANGCHAIN is None:
+        try:
+            from langchain_openai import ChatOpenAI
+            from langchain.schema import SystemMessage, HumanMessage, AIMessage
+            _LANGCHAIN = (ChatOpenAI, SystemMessage, HumanMessage, AIMessage)
+        except Exception:  # pragma: no cover
+            _LANGCHAIN = (None, None, None, None)
+    return _LANGCHAIN
+
+
+_SYNC_HTTPX = None
+# Async connections are bound to the event loop that opened them, so each
+# running loop gets its own pool; the sync pool is shared process-wide
+_ASYNC_HTTPX: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+_HTTPX_LOCK = threading.Lock()
+
+
+def _httpx_options() -> Dict[str, Any]:
+    import httpx
+
+    try:
+        import h2  # noqa: F401
+        http2 = True
+    except ImportError:
+        http2 = False
+    limits = httpx.Limits(max_keepalive_connections=32, max_connections=64)
+    return {"limits": limits, "timeout": 60.0, "http2": http2}
+
+
+def _drop_closed_loops(per_loop: "weakref.WeakKeyDictionary") -> None:
+    """Forget closed loops; their pooled connections keep them referenced."""
+    for loop in [loop for loop in per_loop.keys() if loop.is_closed()]:
+        per_loop.pop(loop, None)
+
+
+def _shared_http_client() -> Any:
+    """Process-wide sync httpx client shared by every ChatOpenAI.
+
+    Sharing one connection pool keeps TCP/TLS connections alive across config
+    updates and per-call override clients.
+    """
+    global _SYNC_HTTPX
+    with _HTTPX_LOCK:
+        if _SYNC_HTTPX is None:
+            import atexit
+            import httpx
+
+            _SYNC_HTTPX = httpx.Client(**_httpx_options())
+            atexit.register(_SYNC_HTTPX.close)
+        return _SYNC_HTTPX
+
+
+def _loop_http_client() -> Any:
+    """Async httpx client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _HTTPX_LOCK:
+        client = _ASYNC_HTTPX.get(loop)
+        if client is None:
+            import httpx
+
+            _drop_closed_loops(_ASYNC_HTTPX)
+            client = _ASYNC_HTTPX[loop] = httpx.AsyncClient(**_httpx_options())
+        return client
+
+
+def _message_text(content: Any) -> str:
+    """Plain text of a message whose content may be a list of content blocks."""
+    if isinstance(content, str):
+        return content
+    return "".join(part.get("text", "") for part in content if isinstance(part, dict))
+
+
+class _MicroBatcher:
+    """Coalesce concurrent async LLM calls into small homogeneous batches.
+
+    Requests arriving within ``max_wait`` seconds of each other (up to
+    ``max_batch``) are grouped by LLM instance -- and therefore by model,
+    temperature and max_tokens, since override clients are memoized -- and
+    dispatched with a single ``abatch`` call.
+    """
+
+    def __init__(self, max_batch: int = 8, max_wait: float = 0.01) -> None:
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._dispatches: Set[asyncio.Task] = set()
+
+    async def submit(self, llm: Any, lc_messages: List[Any]) -> Any:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Queues are bound to the loop they are used on
+            self._loop, self._queue, self._worker = loop, asyncio.Queue(), None
+        future = loop.create_future()
+        self._queue.put_nowait((llm, lc_messages, future))
+        if self._worker is None:
+            self._worker = loop.create_task(self._drain())
+        return await future
+
+    async def _drain(self) -> None:
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+        while not queue.empty():
+            batch = [queue.get_nowait()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            groups: Dict[int, List[Any]] = {}
+            for item in batch:
+                groups.setdefault(id(item[0]), []).append(item)
+            for items in groups.values():
+                task = loop.create_task(self._dispatch(items))
+                self._dispatches.add(task)
+                task.add_done_callback(self._dispatches.discard)
+        self._worker = None
+
+    @staticmethod
+    async def _dispatch(items: List[Any]) -> None:
+        llm = items[0][0]
+        try:
+            results = await llm.abatch([messages for _, messages, _ in items], return_exceptions=True)
+        except Exception as e:
+            results = [e] * len(items)
+        for (_, _, future), result in zip(items, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
 
 
 class LangchainLLMClient:
@@ -19,18 +229,50 @@ class LangchainLLMClient:
     call sites by returning a dict-like structure.
     """
 
-    def __init__(self, config: Optional[Dict[str, Any]] = None) -> None:
+    __slots__ = (
+        "config", "response_cache", "_eff", "_llm", "_dict_messages",
+        "_override_llms", "_loop_llms", "_inflight", "_batcher",
+    )
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None, embed_fn: Optional[Callable[[str], Any]] = None) -> None:
         # Initialize with settings from settings.py as defaults
         self.config = self._get_default_config()
         # Update with any provided config
         if config:
             self.config.update(config)
-        self._init_llm()
+        self._override_llms: Dict[tuple, Any] = {}
+        # Per event loop ChatOpenAI instances for async calls; None unless
+        # `llm` was built by this client
+        self._loop_llms: Optional["weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[tuple, Any]]"] = None
+        self._eff = _EffectiveCfg.resolve(self.config)
+        # ChatOpenAI is built on first access of `llm`
+        self._llm = _UNSET
+        self._dict_messages = False
+        # Exact-match response cache; the semantic tier is enabled by passing an
+        # embed_fn or configuring a local sentence-transformers model
+        if embed_fn is None and self.config.get("semantic_cache_model"):
+            embed_fn = load_local_embedder(self.config["semantic_cache_model"])
+        self.response_cache = SemanticCache(
+            max_entries=int(self.config.get("response_cache_size", 1024)),
+            ttl=int(self.config.get("response_cache_ttl", 3600)),
+            embed_fn=embed_fn,
+            similarity_threshold=float(self.config.get("semantic_cache_threshold", 0.95)),
+        )
+        # Identical cacheable requests currently awaiting the provider
+        self._inflight: Dict[tuple, asyncio.Future] = {}
+        self._batcher = _MicroBatcher(
+            max_batch=int(self.config.get("batch_max_size", 8)),
+            max_wait=float(self.config.get("batch_max_wait_ms", 10)) / 1000.0,
+        )
 
     def update_config(self, new_config: Dict[str, Any]) -> None:
         """Update configuration and reinitialize LLM client."""
         self.config.update(new_config)
-        self._init_llm()
+        self._override_llms.clear()
+        self._loop_llms = None
+        self._eff = _EffectiveCfg.resolve(self.config)
+        self._llm = _UNSET
+        self._dict_messages = False
 
     def _get_default_config(self) -> Dict[str, Any]:
         """Get default configuration from settings.py."""
@@ -43,86 +285,93 @@ class LangchainLLMClient:
             "presence_penalty": getattr(settings, 'openai_presence_penalty', 0.0),
         }
 
+    @property
+    def llm(self):
+        """The default ChatOpenAI instance, constructed on first access."""
+        if self._llm is _UNSET:
+            self._init_llm()
+        return self._llm
+
+    @llm.setter
+    def llm(self, value) -> None:
+        self._llm = value
+        # Externally supplied models get converted messages and are used as-is
+        # on every event loop
+        self._dict_messages = False
+        self._loop_llms = None
+
     def _init_llm(self) -> None:
-        if ChatOpenAI is None:
+        ChatOpenAI = _lazy_import()[0]
+        if ChatOpenAI is None or not settings.openai_api_key:
+            # LangChain missing or no API key configured
             self.llm = None
             return
-        
-        # Get configuration from settings with fallback to config, then defaults
-        model_name = (self.config.get("model_name") or 
-                     settings.openai_chat_model or 
-                     "gpt-4o-mini")
-        
-        temperature = (self.config.get("temperature") or 
-                     getattr(settings, 'openai_temperature', None) or 
-                     0.7)
-        
-        max_tokens = (self.config.get("max_tokens") or 
-                     getattr(settings, 'openai_max_tokens', None) or 
-                     2000)
-        
-        top_p = (self.config.get("top_p") or 
-                getattr(settings, 'openai_top_p', None) or 
-                0.9)
-        
-        frequency_penalty = (self.config.get("frequency_penalty") or 
-                           getattr(settings, 'openai_frequency_penalty', None) or 
-                           0.0)
-        
-        presence_penalty = (self.config.get("presence_penalty") or 
-                          getattr(settings, 'openai_presence_penalty', None) or 
-                          0.0)
-        
-        # Initialize ChatOpenAI with custom base URL if available
-        if settings.openai_api_key:
-            # Use custom base URL from settings (for compatible providers like Ollama, LM Studio, etc.)
-            if settings.openai_base_url and settings.openai_base_url != "https://api.openai.com/v1":
-                self.llm = ChatOpenAI(
-                    model=model_name,
-                    temperature=temperature,
-                    max_tokens=max_tokens,
-                    top_p=top_p,
-                    frequency_penalty=frequency_penalty,
-                    presence_penalty=presence_penalty,
-                    openai_api_key=settings.openai_api_key,
-                    openai_api_base=settings.openai_base_url
-                )
-            else:
-                # Use standard OpenAI
-                self.llm = ChatOpenAI(
-                    model=model_name,
-                    temperature=temperature,
-                    max_tokens=max_tokens,
-                    top_p=top_p,
-                    frequency_penalty=frequency_penalty,
-                    presence_penalty=presence_penalty,
-                    openai_api_key=settings.openai_api_key
-                )
-        else:
-            # No API key configured
-            self.llm = None
+        self.llm = ChatOpenAI(**self._eff.llm_params())
+        # ChatOpenAI (and its override clones) accept OpenAI-style role dicts
+        # directly, so the message-object round trip can be skipped
+        self._dict_messages = True
+        self._loop_llms = weakref.WeakKeyDictionary()
 
     def _build_llm_with_overrides(self, overrides: Dict[str, Any]):
-        """Create a temporary LLM client with per-call overrides (e.g., max_tokens)."""
-        if ChatOpenAI is None:
+        """Return an LLM client with per-call overrides (e.g., max_tokens).
+
+        Clients are memoized on the override signature so repeated calls with the
+        same overrides skip ChatOpenAI construction and validation.
+        """
+        if _lazy_import()[0] is None:
             return None
-        params = {
-            "model": (overrides.get("model_name") or self.config.get("model_name") or settings.openai_chat_model or "gpt-4o-mini"),
-            "temperature": overrides.get("temperature", self.config.get("temperature", getattr(settings, 'openai_temperature', 0.7))),
-            "max_tokens": overrides.get("max_tokens", self.config.get("max_tokens", getattr(settings, 'openai_max_tokens', 2000))),
-            "top_p": overrides.get("top_p", self.config.get("top_p", getattr(settings, 'openai_top_p', 0.9))),
-            "frequency_penalty": overrides.get("frequency_penalty", self.config.get("frequency_penalty", getattr(settings, 'openai_frequency_penalty', 0.0))),
-            "presence_penalty": overrides.get("presence_penalty", self.config.get("presence_penalty", getattr(settings, 'openai_presence_penalty', 0.0))),
-            "openai_api_key": settings.openai_api_key,
-        }
-        if settings.openai_base_url and settings.openai_base_url != "https://api.openai.com/v1":
-            params["openai_api_base"] = settings.openai_base_url
+        key = tuple(sorted(overrides.items()))
+        llm = self._override_llms.get(key)
+        if llm is None:
+            llm = self._create_llm_with_overrides(overrides)
+            if llm is not self.llm:
+                if len(self._override_llms) >= _OVERRIDE_CACHE_SIZE:
+                    self._override_llms.pop(next(iter(self._override_llms)))
+                self._override_llms[key] = llm
+        return llm
+
+    def _async_llm(self, overrides: Dict[str, Any]):
+        """LLM for an async call on the running event loop.
+
+        Models built by this client are re-created per loop around that loop's
+        httpx pool, memoized like `_build_llm_with_overrides`.
+        """
+        default = self.llm  # builds the model (and _loop_llms) on first use
+        if self._loop_llms is None:
+            return self._build_llm_with_overrides(overrides) if overrides else default
+        loop = asyncio.get_running_loop()
+        llms = self._loop_llms.get(loop)
+        if llms is None:
+            _drop_closed_loops(self._loop_llms)
+            llms = self._loop_llms[loop] = {}
+        key = tuple(sorted(overrides.items()))
+        llm = llms.get(key)
+        if llm is None:
+            ChatOpenAI = _lazy_import()[0]
+            try:
+                llm = ChatOpenAI(**self._eff.llm_params(http_async_client=_loop_http_client(), **overrides))
+            except Exception:
+                return default
+            if len(llms) >= _OVERRIDE_CACHE_SIZE:
+                llms.pop(next(iter(llms)))
+            llms[key] = llm
+        return llm
+
+    def _create_llm_with_overrides(self, overrides: Dict[str, Any]):
+        ChatOpenAI = _lazy_import()[0]
         try:
-            return ChatOpenAI(**params)
+            return ChatOpenAI(**self._eff.llm_params(**overrides))
         except Exception:
             return self.llm
 
+    def _prepare_messages(self, messages: List[Dict[str, str]]):
+        """Messages in the form the configured LLM's invoke/stream expects."""
+        if self._dict_messages:
+            return messages
+        return self._to_langchain_messages(messages)
+
     def _to_langchain_messages(self, messages: List[Dict[str, str]]):
+        _, SystemMessage, HumanMessage, AIMessage = _lazy_import()
         if SystemMessage is None:
             return []
         result = []
@@ -137,104 +386,284 @@ class LangchainLLMClient:
                 result.append(AIMessage(content=content))
         return result
 
+    def _unavailable_response(self) -> Dict[str, Any]:
+        # Check why LLM is not available
+        if not settings.openai_api_key:
+            return {
+                "content": "OpenAI API key not configured. Please set OPENAI_API_KEY in your environment.",
+                "model": self.config.get("model_name", "unknown"),
+                "usage": {},
+                "finish_reason": "no_api_key",
+            }
+        return {
+            "content": "LangChain is not available. Please install langchain and langchain-openai to enable this path.",
+            "model": self.config.get("model_name", "unknown"),
+            "usage": {},
+            "finish_reason": "fallback",
+        }
+
+    def _prepare_call(self, messages: List[Dict[str, Any]], kwargs: Dict[str, Any]):
+        """Resolve per-call overrides and look up the response cache.
+
+        Returns ``(overrides, cache_key, cache_text, cache_scope, cached)``;
+        ``cache_key`` is None when caching is skipped for this call. Semantic
+        hits on ``cache_text`` (the last user message) are limited to
+        ``cache_scope``: the same model, parameters and surrounding messages.
+        """
+        # Support per-call overrides (e.g., max_tokens for fast mode)
+        overrides = {k: v for k, v in kwargs.items() if k in _OVERRIDE_KEYS and v is not None}
+
+        # Response cache (skipped for creative sampling or when no_cache=True)
+        eff = self._eff
+        temperature = overrides.get("temperature", eff.temperature)
+        if kwargs.get("no_cache") or temperature > _CACHE_MAX_TEMPERATURE:
+            return overrides, None, None, None, None
+        query = next((i for i in range(len(messages) - 1, -1, -1) if messages[i].get("role") in ("user", "human")), None)
+        cache_text = _message_text(messages[query].get("content", "")) if query is not None else None
+        # System prompt, retrieved context and history around the query
+        surrounding = messages if query is None else [*messages[:query], *messages[query + 1:]]
+        cache_scope = SemanticCache.make_key(
+            overrides.get("model_name", eff.model_name), temperature,
+            overrides.get("top_p", eff.top_p), overrides.get("max_tokens", eff.max_tokens),
+            sorted(overrides.items()), surrounding,
+        )
+        cache_key = SemanticCache.make_key(cache_scope, messages)
+        cached = self.response_cache.get(cache_key, cache_text, scope=cache_scope)
+        return overrides, cache_key, cache_text, cache_scope, cached
+
+    def _finish(self, response: Any, cache_key: Optional[str], cache_text: Optional[str],
+                cache_scope: Optional[str]) -> Dict[str, Any]:
+        # Get actual model name from response if available
+        actual_model = getattr(response, "model", None) or self.config.get("model_name", "unknown")
+
+        result = {
+            "content": response.content,
+            "model": actual_model,
+            "usage": getattr(response, "usage", {}),
+            "finish_reason": getattr(response, "finish_reason", "stop"),
+        }
+        if cache_key is not None and result["finish_reason"] in ("stop", "length"):
+            # Cache a copy so callers mutating the result can't corrupt it
+            self.response_cache.set(cache_key, dict(result), cache_text, scope=cache_scope)
+        return result
+
+    def _error_response(self, error: Exception) -> Dict[str, Any]:
+        return {
+            "content": f"LLM generation failed: {error}",
+            "model": self.config.get("model_name", "unknown"),
+            "usage": {},
+            "finish_reason": "error",
+        }
+
     def generate_response(self, messages: List[Dict[str, str]], **kwargs) -> Dict[str, Any]:
         if self.llm is None:
-            # Check why LLM is not available
-            if not settings.openai_api_key:
-                return {
-                    "content": "OpenAI API key not configured. Please set OPENAI_API_KEY in your environment.",
-                    "model": self.config.get("model_name", "unknown"),
-                    "usage": {},
-                    "finish_reason": "no_api_key",
-                }
-            else:
-                return {
-                    "content": "LangChain is not available. Please install langchain and langchain-openai to enable this path.",
-                    "model": self.config.get("model_name", "unknown"),
-                    "usage": {},
-                    "finish_reason": "fallback",
-                }
-        
+            return self._unavailable_response()
+
+        overrides, cache_key, cache_text, cache_scope, cached = self._prepare_call(messages, kwargs)
+        if cached is not None:
+            return dict(cached)
+
         try:
-            lc_messages = self._to_langchain_messages(messages)
-            # Support per-call overrides (e.g., max_tokens for fast mode)
-            overrides = {k: v for k, v in kwargs.items() if k in {"model_name", "temperature", "max_tokens", "top_p", "frequency_penalty", "presence_penalty"} and v is not None}
+            lc_messages = self._prepare_messages(messages)
             llm_to_use = self._build_llm_with_overrides(overrides) if overrides else self.llm
             response = llm_to_use.invoke(lc_messages)
-            
-            # Get actual model name from response if available
-            actual_model = getattr(response, "model", None) or self.config.get("model_name", "unknown")
-            
-            return {
-                "content": response.content,
-                "model": actual_model,
-                "usage": getattr(response, "usage", {}),
-                "finish_reason": getattr(response, "finish_reason", "stop"),
-            }
+            return self._finish(response, cache_key, cache_text, cache_scope)
         except Exception as e:  # pragma: no cover
-            return {
-                "content": f"LLM generation failed: {e}",
-                "model": self.config.get("model_name", "unknown"),
-                "usage": {},
-                "finish_reason": "error",
-            }
+            return self._error_response(e)
+
+    def stream_response(self, messages: List[Dict[str, str]], **kwargs) -> Generator[str, None, Dict[str, Any]]:
+        """Yield response text chunks as they are generated.
+
+        Accepts the same arguments as `generate_response`. The generator's return
+        value is the aggregated response dict (content, model, usage,
+        finish_reason), which is also stored in the response cache; callers
+        wanting the old contract can ``"".join(stream_response(...))``.
+        """
+        if self.llm is None:
+            result = self._unavailable_response()
+            yield result["content"]
+            return result
+
+        overrides, cache_key, cache_text, cache_scope, cached = self._prepare_call(messages, kwargs)
+        if cached is not None:
+            yield cached["content"]
+            return dict(cached)
+
+        try:
+            lc_messages = self._prepare_messages(messages)
+            llm_to_use = self._build_llm_with_overrides(overrides) if overrides else self.llm
+            aggregate = None
+            for chunk in llm_to_use.stream(lc_messages):
+                aggregate = chunk if aggregate is None else aggregate + chunk
+                if chunk.content:
+                    yield chunk.content
+            if aggregate is None:
+                return self._error_response(RuntimeError("empty stream"))
+            return self._finish(aggregate, cache_key, cache_text, cache_scope)
+        except Exception as e:  # pragma: no cover
+            result = self._error_response(e)
+            yield result["content"]
+            return result
+
+    async def agenerate_response(self, messages: List[Dict[str, str]], **kwargs) -> Dict[str, Any]:
+        """Async variant of `generate_response`.
+
+        Concurrent calls are coalesced by a micro-batcher and dispatched together
+        over the shared async connection pool. Identical cacheable requests that
+        are already in flight share a single provider call.
+        """
+        if self.llm is None:
+            return self._unavailable_response()
+
+        overrides, cache_key, cache_text, cache_scope, cached = self._prepare_call(messages, kwargs)
+        if cached is not None:
+            return dict(cached)
+        if cache_key is None:
+            return await self._agenerate(messages, overrides, None, None, None)
+
+        loop = asyncio.get_running_loop()
+        inflight_key = (id(loop), cache_key)
+        inflight = self._inflight.get(inflight_key)
+        if inflight is not None:
+            try:
+                return dict(await asyncio.shield(inflight))
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise  # this caller was cancelled
+                # The leading request was cancelled, not this one: retry on our own
+                return await self.agenerate_response(messages, **kwargs)
+
+        future = loop.create_future()
+        self._inflight[inflight_key] = future
+        try:
+            result = await self._agenerate(messages, overrides, cache_key, cache_text, cache_scope)
+            future.set_result(result)
+            return result
+        finally:
+            del self._inflight[inflight_key]
+            if not future.done():
+                future.cancel()
+
+    async def _agenerate(self, messages: List[Dict[str, str]], overrides: Dict[str, Any],
+                         cache_key: Optional[str], cache_text: Optional[str],
+                         cache_scope: Optional[str]) -> Dict[str, Any]:
+        try:
+            lc_messages = self._prepare_messages(messages)
+            response = await self._batcher.submit(self._async_llm(overrides), lc_messages)
+            return self._finish(response, cache_key, cache_text, cache_scope)
+        except Exception as e:  # pragma: no cover
+            return self._error_response(e)
+
+    async def astream_response(self, messages: List[Dict[str, str]], **kwargs) -> AsyncIterator[str]:
+        """Async variant of `stream_response` over the shared async connection pool.
+
+        The aggregated response is stored in the response cache at end of stream.
+        """
+        if self.llm is None:
+            yield self._unavailable_response()["content"]
+            return
+
+        overrides, cache_key, cache_text, cache_scope, cached = self._prepare_call(messages, kwargs)
+        if cached is not None:
+            yield cached["content"]
+            return
+
+        try:
+            lc_messages = self._prepare_messages(messages)
+            aggregate = None
+            async for chunk in self._async_llm(overrides).astream(lc_messages):
+                aggregate = chunk if aggregate is None else aggregate + chunk
+                if chunk.content:
+                    yield chunk.content
+            if aggregate is not None:
+                self._finish(aggregate, cache_key, cache_text, cache_scope)
+        except Exception as e:  # pragma: no cover
+            yield self._error_response(e)["content"]
+
+    async def speculative_generate(self, messages: List[Dict[str, str]], providers: Optional[List[Any]] = None, **kwargs) -> Dict[str, Any]:
+        """Send the request to several providers at once and keep the first answer.
+
+        Only active when ``config["speculative_execution"]`` is set, since it
+        multiplies spend; otherwise this is `agenerate_response`. ``providers``
+        defaults to the primary LLM plus ``config["speculative_providers"]``.
+        Per-call overrides are applied to the primary LLM only, so the answer
+        is cached only when every provider honors them.
+        """
+        if not self.config.get("speculative_execution"):
+            return await self.agenerate_response(messages, **kwargs)
+
+        overrides, cache_key, cache_text, cache_scope, cached = self._prepare_call(messages, kwargs)
+        if cached is not None:
+            return dict(cached)
+
+        tuned = None
+        if providers is None:
+            default = self.llm
+            primary = (self._async_llm(overrides) or default) if default is not None else None
+            if primary is not default:
+                tuned = primary
+            providers = [llm for llm in (primary, *self.config.get("speculative_providers", ())) if llm is not None]
+        if not providers:
+            return self._unavailable_response()
+        if overrides and providers != [tuned]:
+            # Another provider may answer without the overrides, which would
+            # poison the override-specific cache key
+            cache_key = None
+
+        lc_messages = self._to_langchain_messages(messages)
+        pending = {asyncio.ensure_future(llm.ainvoke(lc_messages)) for llm in providers}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return self._finish(task.result(), cache_key, cache_text, cache_scope)
+                    error = task.exception()
+        finally:
+            # Cancel the slower providers
+            for task in pending:
+                task.cancel()
+        return self._error_response(error)
 
     def get_client_info(self) -> Dict[str, Any]:
         """Get information about the LLM client configuration."""
         return {
-            "model_name": (self.config.get("model_name") or 
-                          settings.openai_chat_model or 
-                          "gpt-4o-mini"),
-            "temperature": (self.config.get("temperature") or 
-                          getattr(settings, 'openai_temperature', None) or 
-                          0.7),
-            "max_tokens": (self.config.get("max_tokens") or 
-                          getattr(settings, 'openai_max_tokens', None) or 
-                          2000),
-            "top_p": (self.config.get("top_p") or 
-                     getattr(settings, 'openai_top_p', None) or 
-                     0.9),
-            "frequency_penalty": (self.config.get("frequency_penalty") or 
-                                getattr(settings, 'openai_frequency_penalty', None) or 
-                                0.0),
-            "presence_penalty": (self.config.get("presence_penalty") or 
-                               getattr(settings, 'openai_presence_penalty', None) or 
-                               0.0),
+            "model_name": self._eff.model_name,
+            "temperature": self._eff.temperature,
+            "max_tokens": self._eff.max_tokens,
+            "top_p": self._eff.top_p,
+            "frequency_penalty": self._eff.frequency_penalty,
+            "presence_penalty": self._eff.presence_penalty,
             "api_key_configured": bool(settings.openai_api_key),
             "base_url": settings.openai_base_url,
-            "is_custom_provider": settings.openai_base_url != "https://api.openai.com/v1",
-            "langchain_available": ChatOpenAI is not None,
+            "is_custom_provider": settings.openai_base_url != _DEFAULT_BASE_URL,
+            "langchain_available": _lazy_import()[0] is not None,
             "llm_initialized": self.llm is not None
         }
 
+    # Simple test message; never answered from the response cache
+    _TEST_MESSAGE = [{"role": "user", "content": "Hello"}]
+
     def test_connection(self) -> Dict[str, Any]:
         """Test the connection to the LLM service."""
         if not self.llm:
+            return self._not_initialized()
+        try:
+            return self._connection_result(self.generate_response(self._TEST_MESSAGE, no_cache=True))
+        except Exception as e:
             return {
                 "success": False,
-                "error": "LLM client not initialized",
+                "error": str(e),
                 "details": self.get_client_info()
             }
-        
+
+    async def atest_connection(self) -> Dict[str, Any]:
+        """Async variant of `test_connection`."""
+        if not self.llm:
+            return self._not_initialized()
         try:
-            # Simple test message
-            test_message = [{"role": "user", "content": "Hello"}]
-            response = self.generate_response(test_message)
-            
-            if response.get("finish_reason") in ["stop", "length"]:
-                return {
-                    "success": True,
-                    "response": response["content"][:100] + "..." if len(response["content"]) > 100 else response["content"],
-                    "model": response["model"],
-                    "details": self.get_client_info()
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": f"Unexpected finish reason: {response.get('finish_reason')}",
-                    "details": response
-                }
-                
+            return self._connection_result(await self.agenerate_response(self._TEST_MESSAGE, no_cache=True))
         except Exception as e:
             return {
                 "success": False,
@@ -242,6 +671,27 @@ class LangchainLLMClient:
                 "details": self.get_client_info()
             }
 
+    def _not_initialized(self) -> Dict[str, Any]:
+        return {
+            "success": False,
+            "error": "LLM client not initialized",
+            "details": self.get_client_info()
+        }
+
+    def _connection_result(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        if response.get("finish_reason") in ["stop", "length"]:
+            return {
+                "success": True,
+                "response": response["content"][:100] + "..." if len(response["content"]) > 100 else response["content"],
+                "model": response["model"],
+                "details": self.get_client_info()
+            }
+        return {
+            "success": False,
+            "error": f"Unexpected finish reason: {response.get('finish_reason')}",
+            "details": response
+        }
+
     def check_settings_applied(self) -> Dict[str, Any]:
         """Check if the current settings match the expected configuration."""
         current_config = self.config
@@ -9,10 +9,14 @@ except Exception:  # pragma: no cover
     HumanMessage = None  # type: ignore
     AIMessage = None  # type: ignore
 
+from src.utils.tokens import count_tokens
+
 
 class LangchainMemoryManager:
     """Conversation memory using LangChain (optional dependency)."""
 
+    __slots__ = ("config", "llm", "window_memory", "summary_memory")
+
     def __init__(self, config: Optional[Dict[str, Any]] = None, llm: Optional[Any] = None) -> None:
         self.config = config or {}
         # Accept an external LLM (e.g., ChatOpenAI) for summary memory
@@ -39,6 +43,10 @@ class LangchainMemoryManager:
         else:
             self.summary_memory = None
 
+    def count_tokens(self, text: str) -> int:
+        """Count tokens with the memory LLM's encoding, loaded once per model."""
+        return count_tokens(text, getattr(self.llm, "model_name", None))
+
     def add_message(self, role: str, content: str) -> None:
         if self.window_memory is None or HumanMessage is None:
             return
@@ -50,13 +58,18 @@ class LangchainMemoryManager:
     def get_recent_context(self, max_messages: int = 3) -> List[Dict[str, str]]:
         if self.window_memory is None:
             return []
-        messages = self.window_memory.load_memory_variables({}).get("chat_history", [])
-        last_msgs = messages[-max_messages:]
-        result: List[Dict[str, str]] = []
-        for m in last_msgs:
-            role = "user" if isinstance(m, HumanMessage) else "assistant"
-            result.append({"role": role, "content": m.content})
-        return result
+        # Slice the stored history directly instead of copying the whole window
+        # through load_memory_variables; the window holds k exchanges
+        limit = 2 * self.window_memory.k
+        if 0 < max_messages < limit:
+            limit = max_messages
+        if limit <= 0:
+            return []
+        human = HumanMessage
+        return [
+            {"role": "user" if type(m) is human else "assistant", "content": m.content}
+            for m in self.window_memory.chat_memory.messages[-limit:]
+        ]
 
     def clear(self) -> None:
         if self.window_memory:
@@ -1,16 +1,26 @@
+import re
+from functools import lru_cache
 from typing import List, Dict, Any
 
 try:
-    from langchain.output_parsers import PydanticOutputParser
-    from pydantic import BaseModel, Field
+    from pydantic import BaseModel, ConfigDict, Field, ValidationError
 except Exception:  # pragma: no cover
-    PydanticOutputParser = None  # type: ignore
     BaseModel = object  # type: ignore
+    ConfigDict = dict  # type: ignore
+    ValidationError = ValueError  # type: ignore
     def Field(*args, **kwargs):  # type: ignore
         return None
 
+try:
+    from pydantic import TypeAdapter
+except Exception:  # pragma: no cover - pydantic v1 or not installed
+    TypeAdapter = None  # type: ignore
+
 
 class SummaryOutput(BaseModel):  # type: ignore[misc]
+    # Parsed outputs are immutable; use model_copy(update=...) to derive variants
+    model_config = ConfigDict(frozen=True)
+
     summary: str = Field(description="Main summary of the content")  # type: ignore[assignment]
     key_points: List[str] = Field(default_factory=list, description="Key points extracted")  # type: ignore[assignment]
     confidence: float = Field(default=0.8, description="Confidence 0-1")  # type: ignore[assignment]
@@ -18,6 +28,8 @@ class SummaryOutput(BaseModel):  # type: ignore[misc]
 
 
 class QAOutput(BaseModel):  # type: ignore[misc]
+    model_config = ConfigDict(frozen=True)
+
     answer: str = Field(description="Direct answer")  # type: ignore[assignment]
     confidence: float = Field(default=0.8, description="Confidence 0-1")  # type: ignore[assignment]
     sources: List[str] = Field(default_factory=list, description="Sources used")  # type: ignore[assignment]
@@ -25,45 +37,99 @@ class QAOutput(BaseModel):  # type: ignore[misc]
     citations: List[Dict[str, str]] = Field(default_factory=list, description="Specific citations with page/line info")  # type: ignore[assignment]
 
 
+# Validators for well-formed JSON output, built once per process
+_SUMMARY_ADAPTER = TypeAdapter(SummaryOutput) if TypeAdapter is not None else None
+_QA_ADAPTER = TypeAdapter(QAOutput) if TypeAdapter is not None else None
+
+
+@lru_cache(maxsize=None)
+def _parser_for(pydantic_object):
+    """Shared PydanticOutputParser per model, importing LangChain on first use."""
+    try:
+        from langchain.output_parsers import PydanticOutputParser
+    except Exception:  # pragma: no cover
+        return None
+    return PydanticOutputParser(pydantic_object=pydantic_object)
+
+
+@lru_cache(maxsize=None)
+def _format_instructions(pydantic_object) -> str:
+    parser = _parser_for(pydantic_object)
+    return parser.get_format_instructions() if parser is not None else ""
+
+
 class LangchainOutputParser:
     """Structured output parsing helpers (optional dependency)."""
 
-    def __init__(self) -> None:
-        if PydanticOutputParser is None:
-            self.summary_parser = None
-            self.qa_parser = None
-        else:
-            self.summary_parser = PydanticOutputParser(pydantic_object=SummaryOutput)
-            self.qa_parser = PydanticOutputParser(pydantic_object=QAOutput)
+    __slots__ = ()
 
-    def parse_summary(self, response_text: str) -> SummaryOutput:
-        if self.summary_parser is None:
-            # Fallback to minimal structure
-            return SummaryOutput(summary=response_text)  # type: ignore[call-arg]
+    @property
+    def summary_parser(self):
+        return _parser_for(SummaryOutput)
+
+    @property
+    def qa_parser(self):
+        return _parser_for(QAOutput)
+
+    @property
+    def summary_format_instructions(self) -> str:
+        return _format_instructions(SummaryOutput)
+
+    @property
+    def qa_format_instructions(self) -> str:
+        return _format_instructions(QAOutput)
+
+    @staticmethod
+    def _parse(response_text: str, adapter, parser, fallback):
+        # Fast path: the response is already plain JSON for the model
+        if adapter is not None:
+            try:
+                return adapter.validate_json(response_text)
+            except ValidationError:
+                pass
+        if parser is None:
+            return fallback(response_text)
         try:
-            return self.summary_parser.parse(response_text)
+            return parser.parse(response_text)
         except Exception:
-            return SummaryOutput(summary=response_text)  # type: ignore[call-arg]
+            return fallback(response_text)
+
+    def parse_summary(self, response_text: str) -> SummaryOutput:
+        # Fallback to minimal structure
+        return self._parse(
+            response_text, _SUMMARY_ADAPTER, self.summary_parser,
+            lambda text: SummaryOutput(summary=text),  # type: ignore[call-arg]
+        )
 
     def parse_qa(self, response_text: str) -> QAOutput:
-        if self.qa_parser is None:
-            return QAOutput(answer=response_text)  # type: ignore[call-arg]
-        try:
-            return self.qa_parser.parse(response_text)
-        except Exception:
-            return QAOutput(answer=response_text)  # type: ignore[call-arg]
+        return self._parse(
+            response_text, _QA_ADAPTER, self.qa_parser,
+            lambda text: QAOutput(answer=text),  # type: ignore[call-arg]
+        )
 
     def extract_citations(self, answer: str, sources: List[str]) -> List[Dict[str, str]]:
         """Extract citations from answer text and map to sources."""
-        citations = []
+        if not sources or "[" not in answer:
+            return []
+        indices_by_source: Dict[str, List[int]] = {}
         for i, source in enumerate(sources, 1):
-            # Look for citation patterns like [1], [source], etc.
-            if f"[{i}]" in answer or f"[{source}]" in answer:
-                citations.append({
-                    "source": source,
-                    "reference": f"[{i}]",
-                    "type": "explicit"
-                })
-        return citations
+            indices_by_source.setdefault(source, []).append(i)
+
+        # Look for citation patterns like [1], [source], etc. in a single pass
+        cited = set()
+        for match in _citation_pattern(tuple(indices_by_source)).finditer(answer):
+            token = match.group(1)
+            if token.isdigit() and 0 < int(token) <= len(sources) and str(int(token)) == token:
+                cited.add(int(token))
+            cited.update(indices_by_source.get(token, ()))
+        return [
+            {"source": sources[i - 1], "reference": f"[{i}]", "type": "explicit"}
+            for i in sorted(cited)
+        ]
 
 
+@lru_cache(maxsize=128)
+def _citation_pattern(sources: tuple) -> "re.Pattern[str]":
+    """Regex matching ``[<number>]`` or ``[<known source>]``."""
+    names = "|".join(map(re.escape, sorted(sources, key=len, reverse=True)))
+    return re.compile(r"\[([0-9]+" + ("|" + names if names else "") + r")\]")
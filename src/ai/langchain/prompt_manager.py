@@ -1,98 +1,127 @@
+from string import Template
 from typing import List, Dict, Any, Optional
 
-try:
-    from langchain.prompts import ChatPromptTemplate
-    from langchain.schema import HumanMessage, SystemMessage, AIMessage
-except Exception:  # pragma: no cover
-    ChatPromptTemplate = None  # type: ignore
-    HumanMessage = None  # type: ignore
-    SystemMessage = None  # type: ignore
-    AIMessage = None  # type: ignore
+# Fixed prompt templates, parsed once at import. They mirror the LangChain
+# ChatPromptTemplate definitions but skip its per-call template engine and the
+# message object -> dict round trip.
+_QA_SYSTEM = "You are a knowledgeable assistant that provides accurate, helpful answers based on the given context."
+_QA_HUMAN = Template("Context:\n$context\n\nQuestion: $question\n\nAnswer:")
+_DIRECT_SYSTEM = "You are a knowledgeable assistant. Answer the user's question directly and clearly."
+_DIRECT_HUMAN = Template("Question: $question\n\nAnswer:")
+_COT_SYSTEM = "Please think through this step by step before providing your final answer."
+
+_SUMMARY_SYSTEM = "You are an expert content summarizer. Create comprehensive, accurate, and well-structured summaries."
+_SUMMARY_HUMAN = Template("Please summarize the following content:\n\n$content\n\n$additional_instructions\n\nSummary:")
+
+_REDUCE_HUMAN = Template("Combine the following partial summaries of one document into a single coherent summary:\n\n$partials\n\n$additional_instructions\n\nSummary:")
+
+_ANALYSIS_SYSTEM = "You are an expert content analyst. Analyze the provided content and extract key insights."
+_ANALYSIS_HUMAN = Template("Analyze the following content:\n\n$content\n\nAnalysis:")
+
+# Shared by every cached QA prompt, with or without context, so providers can
+# reuse the prefix across requests
+_QA_STATIC_SYSTEM = (
+    "You are a knowledgeable assistant that provides accurate, helpful answers. "
+    "When context is provided inside <context> tags, base your answer on that context. "
+    "Otherwise, answer the user's question directly and clearly."
+)
+
+# Marks the end of a provider-cacheable prompt prefix (Anthropic / OpenRouter)
+_CACHE_CONTROL = {"type": "ephemeral"}
+
+# Static system messages, built once and shared by every prompt; never mutate
+_QA_SYSTEM_MSG = {"role": "system", "content": _QA_SYSTEM}
+_DIRECT_SYSTEM_MSG = {"role": "system", "content": _DIRECT_SYSTEM}
+_COT_SYSTEM_MSG = {"role": "system", "content": _COT_SYSTEM}
+_SUMMARY_SYSTEM_MSG = {"role": "system", "content": _SUMMARY_SYSTEM}
+_ANALYSIS_SYSTEM_MSG = {"role": "system", "content": _ANALYSIS_SYSTEM}
+_QA_STATIC_SYSTEM_MSG = {"role": "system", "content": _QA_STATIC_SYSTEM}
+_QA_STATIC_CACHED_SYSTEM_MSG = {
+    "role": "system",
+    "content": [{"type": "text", "text": _QA_STATIC_SYSTEM, "cache_control": _CACHE_CONTROL}],
+}
 
 
 class LangchainPromptManager:
-    """Prompt management using LangChain templates (optional dependency)."""
+    """Prompt management for the LangChain pipeline.
+
+    Set ``config["prompt_caching"]`` to split QA prompts into a cacheable
+    context block and a small trailing question block.
+    """
+
+    __slots__ = ("config", "prompt_caching")
 
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         self.config = config or {}
-        self._init_templates()
-
-    def _init_templates(self) -> None:
-        if ChatPromptTemplate is None:
-            # Graceful no-op init when LangChain isn't installed
-            self.qa_template = None
-            self.summary_template = None
-            self.analysis_template = None
-            return
-
-        self.qa_template = ChatPromptTemplate.from_messages([
-            ("system", "You are a knowledgeable assistant that provides accurate, helpful answers based on the given context."),
-            ("human", "Context:\n{context}\n\nQuestion: {question}\n\nAnswer:")
-        ])
-
-        self.summary_template = ChatPromptTemplate.from_messages([
-            ("system", "You are an expert content summarizer. Create comprehensive, accurate, and well-structured summaries."),
-            ("human", "Please summarize the following content:\n\n{content}\n\n{additional_instructions}\n\nSummary:")
-        ])
-
-        self.analysis_template = ChatPromptTemplate.from_messages([
-            ("system", "You are an expert content analyst. Analyze the provided content and extract key insights."),
-            ("human", "Analyze the following content:\n\n{content}\n\nAnalysis:")
-        ])
-
-    def build_qa_prompt(self, *, context: str, question: str, use_chain_of_thought: bool = False) -> List[Dict[str, str]]:
-        if self.qa_template is None:
-            # Fallback to legacy-compatible format
-            if not context or context.strip() == "":
-                # No context available
-                messages = [
-                    {"role": "system", "content": "You are a knowledgeable assistant. Answer the user's question directly and clearly."},
-                    {"role": "user", "content": f"Question: {question}\n\nAnswer:"},
-                ]
-            else:
-                # With context
-                messages = [
-                    {"role": "system", "content": "You are a knowledgeable assistant that provides accurate, helpful answers based on the given context."},
-                    {"role": "user", "content": f"Context:\n{context}\n\nQuestion: {question}\n\nAnswer:"},
-                ]
-            
-            if use_chain_of_thought:
-                messages.insert(1, {"role": "system", "content": "Please think through this step by step before providing your final answer."})
-            return messages
-
-        # Handle empty context case for LangChain templates
-        if not context or context.strip() == "":
-            # Create a direct question prompt
+        self.prompt_caching = bool(self.config.get("prompt_caching", False))
+
+    def build_qa_prompt(self, *, context: str, question: str, use_chain_of_thought: bool = False) -> List[Dict[str, Any]]:
+        if not context or context.isspace():
+            # No context available: create a direct question prompt
             messages = [
-                SystemMessage(content="You are a knowledgeable assistant. Answer the user's question directly and clearly."),
-                HumanMessage(content=f"Question: {question}\n\nAnswer:")
+                _DIRECT_SYSTEM_MSG,
+                {"role": "user", "content": _DIRECT_HUMAN.substitute(question=question)},
             ]
+        elif self.prompt_caching:
+            return self._build_cached_qa_prompt(context, question, use_chain_of_thought)
         else:
-            # Use normal template with context
-            messages = self.qa_template.format_messages(context=context, question=question)
-        
+            messages = [
+                _QA_SYSTEM_MSG,
+                {"role": "user", "content": _QA_HUMAN.substitute(context=context, question=question)},
+            ]
+
         if use_chain_of_thought:
-            messages.insert(1, SystemMessage(content="Please think through this step by step before providing your final answer."))
-        
-        # Convert to dict for compatibility with existing llm_client
-        return [{"role": msg.type, "content": msg.content} for msg in messages]
+            messages.insert(1, _COT_SYSTEM_MSG)
+        return messages
 
-    def build_summary_prompt(self, *, content: str, additional_instructions: str = "") -> List[Dict[str, str]]:
-        if self.summary_template is None:
-            return [
-                {"role": "system", "content": "You are an expert content summarizer. Create comprehensive, accurate, and well-structured summaries."},
-                {"role": "user", "content": f"Please summarize the following content:\n\n{content}\n\n{additional_instructions}\n\nSummary:"},
-            ]
-        messages = self.summary_template.format_messages(content=content, additional_instructions=additional_instructions)
-        return [{"role": msg.type, "content": msg.content} for msg in messages]
+    def _build_cached_qa_prompt(self, context: str, question: str, use_chain_of_thought: bool) -> List[Dict[str, Any]]:
+        """QA prompt ordered system -> cached context -> question.
 
-    def build_analysis_prompt(self, *, content: str) -> List[Dict[str, str]]:
-        if self.analysis_template is None:
-            return [
-                {"role": "system", "content": "You are an expert content analyst. Analyze the provided content and extract key insights."},
-                {"role": "user", "content": f"Analyze the following content:\n\n{content}\n\nAnalysis:"},
-            ]
-        messages = self.analysis_template.format_messages(content=content)
-        return [{"role": msg.type, "content": msg.content} for msg in messages]
+        The context block carries a cache breakpoint so providers with prompt
+        caching reuse the prefix across turns; only the question is re-processed.
+        """
+        messages: List[Dict[str, Any]] = [_QA_SYSTEM_MSG]
+        if use_chain_of_thought:
+            messages.append(_COT_SYSTEM_MSG)
+        messages.append({
+            "role": "user",
+            "content": [
+                {"type": "text", "text": f"Context:\n{context}\n\n", "cache_control": _CACHE_CONTROL},
+                {"type": "text", "text": _DIRECT_HUMAN.substitute(question=question)},
+            ],
+        })
+        return messages
 
+    def build_qa_prompt_cached(self, context: str, question: str) -> List[Dict[str, Any]]:
+        """QA prompt with one static system prefix shared by all requests.
 
+        Only the user message varies, so server-side prefix caching applies to
+        the system block on every call. With prompt caching enabled the system
+        block is also marked as an explicit cache breakpoint.
+        """
+        system = _QA_STATIC_CACHED_SYSTEM_MSG if self.prompt_caching else _QA_STATIC_SYSTEM_MSG
+        if context and not context.isspace():
+            user = f"<context>\n{context}\n</context>\n\nQuestion: {question}"
+        else:
+            user = f"Question: {question}"
+        return [system, {"role": "user", "content": user}]
+
+    def build_summary_prompt(self, *, content: str, additional_instructions: str = "") -> List[Dict[str, str]]:
+        return [
+            _SUMMARY_SYSTEM_MSG,
+            {"role": "user", "content": _SUMMARY_HUMAN.substitute(content=content, additional_instructions=additional_instructions)},
+        ]
+
+    def build_reduce_prompt(self, partials: List[str], additional_instructions: str = "") -> List[Dict[str, str]]:
+        """Prompt merging per-chunk summaries into one (map-reduce summarization)."""
+        numbered = "\n\n".join(f"[Part {i}]\n{p}" for i, p in enumerate(partials, 1))
+        return [
+            _SUMMARY_SYSTEM_MSG,
+            {"role": "user", "content": _REDUCE_HUMAN.substitute(partials=numbered, additional_instructions=additional_instructions)},
+        ]
+
+    def build_analysis_prompt(self, *, content: str) -> List[Dict[str, str]]:
+        return [
+            _ANALYSIS_SYSTEM_MSG,
+            {"role": "user", "content": _ANALYSIS_HUMAN.substitute(content=content)},
+        ]
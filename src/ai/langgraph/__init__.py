@@ -2,12 +2,17 @@
 LangGraph integrations (opt-in via feature flags).
 """
 
-from .workflows.qa_workflow import create_qa_workflow
-from .workflows.summarization_workflow import create_summarization_workflow
+from .workflows.qa_workflow import create_qa_workflow, create_qa_workflow_async
+from .workflows.summarization_workflow import (
+    create_summarization_workflow,
+    create_summarization_workflow_async,
+)
 
 __all__ = [
     "create_qa_workflow",
+    "create_qa_workflow_async",
     "create_summarization_workflow",
+    "create_summarization_workflow_async",
 ]
 
 
@@ -1,4 +1,9 @@
-from typing import TypedDict, List, Dict, Any
+import asyncio
+import re
+import threading
+from typing import TypedDict, FrozenSet, List, Dict, Any, Tuple
+
+from src.utils.cache import SemanticCache
 
 try:
     from langgraph.graph import StateGraph, END
@@ -6,7 +11,37 @@ except Exception:  # pragma: no cover
     StateGraph = None  # type: ignore
     END = "__END__"  # type: ignore
 
+_WORD = re.compile(r"\w+")
+
+# Pre-LLM gate: greetings get a canned answer (echoing the greeting so
+# validation accepts it) and questions without any word character are rejected
+_CANNED = {
+    "hi": "Hi! Ask me a question about your documents.",
+    "hello": "Hello! Ask me a question about your documents.",
+    "hey": "Hey! Ask me a question about your documents.",
+    "test": "Test received. Ask me a question about your documents.",
+}
+_HAS_WORD = re.compile(r"\w")
+
+# Answers keyed on (question, context); the semantic tier matches paraphrased
+# questions, embedded with the search engine's own embedder (stored as
+# float16), among entries of the same engine and context only
+_QA_CACHE = SemanticCache(max_entries=4096, ttl=3600, similarity_threshold=0.95, vector_dtype="float16")
+
+# Only completed generations are cached; clients report failures as regular
+# responses with finish_reason "error" / "no_api_key"
+_CACHEABLE_FINISH = frozenset({"stop", "length"})
+
+_SEARCH_K = 8
+_SEARCH_THRESHOLD = 0.2
 
+# Shared system message for no-context prompts; never mutate
+_NO_CTX_SYS = {"role": "system", "content": "You are a knowledgeable assistant. Answer the user's question directly and clearly."}
+
+
+# Fields are plain overwrites, so no Annotated reducers: LangGraph stores
+# un-annotated keys in last-value channels, its cheapest update path. Nodes
+# return only the keys they change to keep per-step writes small.
 class QAState(TypedDict, total=False):
     question: str
     search_results: List[Dict[str, Any]]
@@ -16,6 +51,49 @@ class QAState(TypedDict, total=False):
     sources: List[str]
     error: str
     max_retries: int
+    remaining_loops: int
+    prefetched_answer: Any
+    q_tokens: FrozenSet[str]
+    answer_stream: Any
+
+
+def _format_search_results(results: List[Any]) -> QAState:
+    if not results:
+        # No search results found
+        return {
+            "search_results": [],
+            "context": "",
+            "error": "no_relevant_content_found"
+        }
+
+    formatted = [{"text": r.text or r.metadata.get("text", ""), "score": r.score, "metadata": r.metadata} for r in results]
+
+    # Filter out empty or very short texts
+    valid_texts = [r["text"] for r in formatted[:5] if r["text"] and len(r["text"].strip()) > 10]
+
+    if not valid_texts:
+        # No valid content found
+        return {
+            "search_results": formatted,
+            "context": "",
+            "error": "no_valid_content_found"
+        }
+
+    context = "\n\n".join(valid_texts)
+
+    return {
+        "search_results": formatted,
+        "context": context,
+        "search_success": True
+    }
+
+
+def _search_failed(e: Exception) -> QAState:
+    return {
+        "error": f"search failed: {str(e)}",
+        "search_results": [],
+        "context": ""
+    }
 
 
 def _search_agent(state: QAState) -> QAState:
@@ -26,93 +104,302 @@ def _search_agent(state: QAState) -> QAState:
         return {"error": "missing question or search_engine"}
     
     try:
-        results = search_engine.search(question, k=8, threshold=0.2)
-        
-        if not results:
-            # No search results found
-            return {
-                "search_results": [],
-                "context": "",
-                "error": "no_relevant_content_found"
-            }
-        
-        formatted = [{"text": r.text or r.metadata.get("text", ""), "score": r.score, "metadata": r.metadata} for r in results]
-        
-        # Filter out empty or very short texts
-        valid_texts = [r["text"] for r in formatted[:5] if r["text"] and len(r["text"].strip()) > 10]
-        
-        if not valid_texts:
-            # No valid content found
-            return {
-                "search_results": formatted,
-                "context": "",
-                "error": "no_valid_content_found"
-            }
-        
-        context = "\n\n".join(valid_texts)
-        
-        return {
-            "search_results": formatted,
-            "context": context,
-            "search_success": True
-        }
-        
+        results = search_engine.search(question, k=_SEARCH_K, threshold=_SEARCH_THRESHOLD)
+        return _format_search_results(results)
     except Exception as e:
-        return {
-            "error": f"search failed: {str(e)}",
-            "search_results": [],
-            "context": ""
-        }
+        return _search_failed(e)
 
 
-def _synthesis_agent(state: QAState) -> QAState:
+async def _asearch(search_engine: Any, question: str) -> List[Any]:
+    """Native async search when the engine provides it, else a worker thread."""
+    asearch = getattr(search_engine, "asearch", None)
+    if asearch is not None:
+        return await asearch(question, k=_SEARCH_K, threshold=_SEARCH_THRESHOLD)
+    return await asyncio.to_thread(search_engine.search, question, k=_SEARCH_K, threshold=_SEARCH_THRESHOLD)
+
+
+async def _agenerate(llm_client: Any, messages: List[Dict[str, Any]], **kwargs) -> Any:
+    """Native async generation when the client provides it, else a worker thread."""
+    agenerate = getattr(llm_client, "agenerate_response", None)
+    if agenerate is not None:
+        return await agenerate(messages, **kwargs)
+    return await asyncio.to_thread(llm_client.generate_response, messages, **kwargs)
+
+
+def _direct_messages(question: str) -> List[Dict[str, str]]:
+    # If no context, create a more direct prompt
+    return [_NO_CTX_SYS, {"role": "user", "content": f"Question: {question}\n\nAnswer:"}]
+
+
+async def _asearch_agent(state: QAState) -> QAState:
+    """Async search node; optionally prefetches a no-context answer meanwhile.
+
+    With ``speculative_prefetch`` set in the state, a direct (no-context) answer
+    is requested concurrently with the search. It is cancelled as soon as the
+    search yields usable context, and handed to synthesis otherwise.
+    """
+    question = state.get("question", "")
+    search_engine = state.get("search_engine")
+
+    if not question or search_engine is None:
+        return {"error": "missing question or search_engine"}
+
+    llm_client = state.get("llm_client")
+    speculative = None
+    # Questions the gate answers itself never reach the LLM
+    if state.get("speculative_prefetch") and llm_client is not None and _gate(state) is None:
+        speculative = asyncio.ensure_future(_agenerate(llm_client, _direct_messages(question)))
+
+    try:
+        result = _format_search_results(await _asearch(search_engine, question))
+    except Exception as e:
+        result = _search_failed(e)
+
+    if speculative is not None:
+        if result.get("context"):
+            speculative.cancel()
+        else:
+            try:
+                result["prefetched_answer"] = await speculative
+            except Exception:
+                pass
+    return result
+
+
+def _default_gate(question: str) -> Any:
+    normalized = question.strip().strip("!.?").lower()
+    canned = _CANNED.get(normalized)
+    if canned is not None:
+        return {"answer": canned, "confidence": 0.9}
+    if question and not _HAS_WORD.search(question):
+        return {"error": "malformed_question", "confidence": 0.0}
+    return None
+
+
+def _gate(state: QAState) -> Any:
+    return (state.get("mfee_gate") or _default_gate)(state.get("question", ""))
+
+
+def _synthesis_inputs(state: QAState):
+    """Return (llm_client, messages, per_call kwargs) or a final state.
+
+    The gate (``state["mfee_gate"]`` or the default greeting/malformed check)
+    runs first; a non-None result is returned without calling the LLM.
+    """
     llm_client = state.get("llm_client")
     prompt_mgr = state.get("prompt_manager")
     context = state.get("context", "")
     question = state.get("question", "")
+
+    gated = _gate(state)
+    if gated is not None:
+        return gated
     
     if not llm_client or not prompt_mgr or not question:
         return {"error": "missing llm_client/prompt_manager/question"}
     
-    # Handle empty context case
-    if not context or context.strip() == "":
-        # If no context, create a more direct prompt
-        messages = [
-            {"role": "system", "content": "You are a knowledgeable assistant. Answer the user's question directly and clearly."},
-            {"role": "user", "content": f"Question: {question}\n\nAnswer:"}
-        ]
+    build_cached = getattr(prompt_mgr, "build_qa_prompt_cached", None)
+    if build_cached is not None:
+        # Same static system prefix with or without context (prompt-cache friendly)
+        messages = build_cached(context, question)
+    elif not context or context.isspace():
+        # Handle empty context case
+        messages = _direct_messages(question)
     else:
         # Use normal QA prompt with context
         messages = prompt_mgr.build_qa_prompt(context=context, question=question)
-    
+
+    # Reduce max_tokens slightly when remaining loop budget is small to cut latency
+    per_call = {"max_tokens": 600 if int(state.get("remaining_loops", 2)) <= 1 else None}
+    return llm_client, messages, per_call
+
+
+def _question_embedder(search_engine: Any):
+    generator = getattr(getattr(search_engine, "vector_db", None), "embedding_generator", None)
+    return getattr(generator, "generate_embedding", None)
+
+
+def _embed_question(search_engine: Any, question: str) -> Any:
+    embed = _question_embedder(search_engine)
+    if embed is None:
+        return None
     try:
-        # Reduce max_tokens slightly when remaining loop budget is small to cut latency
-        per_call = {"max_tokens": 600 if int(state.get("remaining_loops", 2)) <= 1 else None}
-        resp = llm_client.generate_response(messages, **per_call)
-        answer_content = resp.get("content", "") if isinstance(resp, dict) else getattr(resp, "content", "")
-        
-        # Calculate confidence based on answer quality
-        if answer_content and len(answer_content.strip()) > 10:
-            confidence = 0.8
-        else:
-            confidence = 0.5
-            
-        return {"answer": answer_content, "confidence": confidence}
-        
+        return embed(question)
+    except Exception:
+        # Embedding failures only disable the semantic tier for this call
+        return None
+
+
+def _cache_lookup(state: QAState):
+    """Return (cache_ref, cached answer state or None).
+
+    ``cache_ref`` is (key, scope, question vector) for ``_cache_store``; the
+    question is embedded at most once per synthesis. Retries skip the lookup:
+    the cached answer is the one that failed validation, so the retry (and
+    its max_tokens budget) must reach the LLM.
+    """
+    question = state.get("question", "")
+    if not question or state.get("no_cache"):
+        return None, None
+    search_engine, context = state.get("search_engine"), state.get("context", "")
+    key = SemanticCache.make_key(question, context)
+    # Semantic matches must share the engine (same embedder and corpus) and context
+    scope = SemanticCache.make_key(id(search_engine), context)
+    if state.get("max_retries", 0) > 0:
+        return (key, scope, _embed_question(search_engine, question)), None
+    cached = _QA_CACHE.get(key)
+    vector = None
+    if cached is None:
+        vector = _embed_question(search_engine, question)
+        if vector is not None:
+            try:
+                cached = _QA_CACHE.get(key, vector=vector, scope=scope)
+            except Exception:
+                # e.g. numpy unavailable: exact matches only
+                vector = None
+    return (key, scope, vector), (dict(cached) if cached is not None else None)
+
+
+def _finish_reason(resp: Any) -> Any:
+    return resp.get("finish_reason") if isinstance(resp, dict) else getattr(resp, "finish_reason", None)
+
+
+def _cache_store(ref, resp: Any) -> QAState:
+    """Synthesis result for ``resp``, cached only when the generation completed."""
+    result = _synthesis_result(resp)
+    if ref is not None and result.get("answer") and _finish_reason(resp) in _CACHEABLE_FINISH:
+        key, scope, vector = ref
+        value = {"answer": result["answer"], "confidence": result["confidence"]}
+        try:
+            _QA_CACHE.set(key, value, vector=vector, scope=scope)
+        except Exception:
+            _QA_CACHE.set(key, value)
+    return result
+
+
+def _synthesis_result(resp: Any) -> QAState:
+    answer_content = resp.get("content", "") if isinstance(resp, dict) else getattr(resp, "content", "")
+
+    # Calculate confidence based on answer quality
+    if answer_content and len(answer_content.strip()) > 10:
+        confidence = 0.8
+    else:
+        confidence = 0.5
+
+    return {"answer": answer_content, "confidence": confidence}
+
+
+def _speculative_generator(state: QAState, llm_client: Any):
+    """Bound ``generate_response_speculative`` when a draft model is configured, else None."""
+    draft = state.get("draft_llm_client")
+    speculative = getattr(llm_client, "generate_response_speculative", None)
+    if draft is None or speculative is None:
+        return None
+    k = state.get("speculative_k", 4)
+    return lambda messages, **kwargs: speculative(messages, draft_client=draft, k=k, **kwargs)
+
+
+def _generate(state: QAState, llm_client: Any, messages: List[Dict[str, Any]], **per_call) -> Any:
+    """Generate an answer, with speculative decoding when ``draft_llm_client`` is set."""
+    speculative = _speculative_generator(state, llm_client)
+    if speculative is not None:
+        try:
+            return speculative(messages, **per_call)
+        except Exception:
+            pass  # fall back to regular decoding
+    return llm_client.generate_response(messages, **per_call)
+
+
+def _synthesis_agent(state: QAState) -> QAState:
+    inputs = _synthesis_inputs(state)
+    if isinstance(inputs, dict):
+        return inputs
+    llm_client, messages, per_call = inputs
+    ref, cached = _cache_lookup(state)
+    if cached is not None:
+        return cached
+    try:
+        return _cache_store(ref, _generate(state, llm_client, messages, **per_call))
     except Exception as e:
         return {"error": f"synthesis failed: {str(e)}", "confidence": 0.3}
 
 
+def _publish(stream: Any, result: QAState) -> QAState:
+    """Send a complete (non-streamed) answer through ``answer_stream``."""
+    if stream is not None:
+        if result.get("answer"):
+            stream.put_nowait(result["answer"])
+        stream.put_nowait(None)
+    return result
+
+
+async def _astream_answer(llm_client: Any, messages: List[Dict[str, Any]], stream: Any, **per_call) -> Dict[str, Any]:
+    """Stream an answer into ``stream``.
+
+    Streamed text carries no finish_reason (clients yield failures as text),
+    so the result is never stored in the answer cache; streaming clients
+    cache completed responses themselves.
+    """
+    parts: List[str] = []
+    try:
+        async for piece in llm_client.astream_response(messages, **per_call):
+            parts.append(piece)
+            stream.put_nowait(piece)
+    finally:
+        stream.put_nowait(None)
+    return {"content": "".join(parts), "finish_reason": None}
+
+
+async def _asynthesis_agent(state: QAState) -> QAState:
+    """Async synthesis node.
+
+    When the caller puts an ``asyncio.Queue`` in ``state["answer_stream"]``,
+    answer text is pushed to it as it is generated (via
+    ``llm_client.astream_response`` when available), followed by ``None`` at
+    the end of each synthesis attempt.
+    """
+    stream = state.get("answer_stream")
+    inputs = _synthesis_inputs(state)
+    if isinstance(inputs, dict):
+        return _publish(stream, inputs)
+    prefetched = state.get("prefetched_answer")
+    if prefetched is not None and not state.get("context") and _finish_reason(prefetched) in _CACHEABLE_FINISH:
+        # Use the completed speculative no-context answer once; retries regenerate
+        result = _synthesis_result(prefetched)
+        result["prefetched_answer"] = None
+        return _publish(stream, result)
+    llm_client, messages, per_call = inputs
+    ref, cached = _cache_lookup(state)
+    if cached is not None:
+        return _publish(stream, cached)
+    try:
+        if stream is not None and hasattr(llm_client, "astream_response"):
+            resp = await _astream_answer(llm_client, messages, stream, **per_call)
+            return _cache_store(ref, resp)
+        if _speculative_generator(state, llm_client) is not None:
+            resp = await asyncio.to_thread(_generate, state, llm_client, messages, **per_call)
+        else:
+            resp = await _agenerate(llm_client, messages, **per_call)
+        return _publish(stream, _cache_store(ref, resp))
+    except Exception as e:
+        return _publish(stream, {"error": f"synthesis failed: {str(e)}", "confidence": 0.3})
+
+
 def _validate_agent(state: QAState) -> QAState:
     answer = state.get("answer", "")
     question = state.get("question", "")
     if not answer or not question:
         # Increment retries even on failure to avoid infinite loops
         retries = state.get("max_retries", 0) + 1
-        return {"error": "missing answer or question", "max_retries": retries}
-    q_words = set(question.lower().split())
-    a_words = set(answer.lower().split())
-    overlap = len(q_words.intersection(a_words)) / (len(q_words) or 1)
+        # Keep an upstream error (e.g. from the gate or synthesis) visible
+        return {"error": state.get("error") or "missing answer or question", "max_retries": retries}
+    # Question tokens are computed once per question and carried across retries
+    q_words = state.get("q_tokens")
+    update: QAState = {}
+    if q_words is None:
+        q_words = update["q_tokens"] = frozenset(_WORD.findall(question.lower()))
+    # Membership scan over the answer tokens; no answer-side set is built
+    overlap = len(q_words.intersection(_WORD.findall(answer.lower()))) / (len(q_words) or 1)
     confidence = (state.get("confidence", 0.8) + overlap) / 2
     # Increment retry counter here (stateful node), not in conditional fn
     retries = state.get("max_retries", 0) + 1
@@ -122,72 +409,221 @@ def _validate_agent(state: QAState) -> QAState:
         remaining = 2
     else:
         remaining = max(0, int(remaining) - 1)
-    return {"confidence": confidence, "max_retries": retries, "remaining_loops": remaining}
+    update.update(confidence=confidence, max_retries=retries, remaining_loops=remaining)
+    return update
+
+
+async def _avalidate_agent(state: QAState) -> QAState:
+    # CPU-only; async so the whole graph runs on the event loop
+    return _validate_agent(state)
 
 
 def _should_continue(state: QAState) -> str:
-    confidence = state.get("confidence", 0.0)
-    retries = state.get("max_retries", 0)
-    error = state.get("error", "")
-    
     # Always end if there's an error to prevent infinite loops
-    if error:
-        return "end"
-    
-    # Hard stop conditions to prevent infinite loops
-    if retries >= 2:
+    if state.get("error"):
         return "end"
-    if int(state.get("remaining_loops", 0)) <= 0:
-        return "end"
-    
-    # End if confidence is high enough
-    if confidence >= 0.8:
+    # Hard stop conditions (retry cap, loop budget) and confident results;
+    # validate always runs first and stores remaining_loops as an int
+    if (
+        state.get("max_retries", 0) >= 2
+        or state.get("remaining_loops", 0) <= 0
+        or state.get("confidence", 0.0) >= 0.8
+    ):
         return "end"
-    
     return "synthesize"
 
 
-def create_qa_workflow(recursion_limit: int = 10):
-    if StateGraph is None:  # LangGraph not installed
-        def _fallback_invoke(initial_state: QAState) -> QAState:  # type: ignore[misc]
-            # Minimal fallback: run agents sequentially
-            state = dict(initial_state)
-            state.update(_search_agent(state))
-            state.update(_synthesis_agent(state))
-            state.update(_validate_agent(state))
-            return state
-
-        class _Fallback:
-            def invoke(self, initial_state: QAState) -> QAState:
-                return _fallback_invoke(initial_state)
+def _synth_and_validate(state: QAState) -> QAState:
+    """Fused synthesize -> validate node; retries loop here instead of in the graph.
+
+    Follows ``_should_continue`` exactly, so results match the three-node
+    graph with one node dispatch and one state merge per question.
+    """
+    current, update = dict(state), {}
+    while True:
+        for step in (_synthesis_agent, _validate_agent):
+            result = step(current)
+            current.update(result)
+            update.update(result)
+        if _should_continue(current) != "synthesize":
+            return update
 
-        return _Fallback()
 
+async def _asynth_and_validate(state: QAState) -> QAState:
+    current, update = dict(state), {}
+    while True:
+        result = await _asynthesis_agent(current)
+        current.update(result)
+        update.update(result)
+        result = _validate_agent(current)
+        current.update(result)
+        update.update(result)
+        if _should_continue(current) != "synthesize":
+            return update
+
+
+async def _abatch_search(states: List[QAState]) -> None:
+    """Run the search step for every state.
+
+    Repeated questions to the same engine are searched once per batch; the
+    results are never kept beyond it, so later batches see newly ingested
+    content. Questions sharing an engine that provides ``search_batch`` are
+    sent in one call; the rest go through the regular async search node.
+    """
+    # (engine id, question) -> indices of the states asking it
+    unique: Dict[Tuple[int, str], List[int]] = {}
+    for i, state in enumerate(states):
+        unique.setdefault((id(state.get("search_engine")), state.get("question", "")), []).append(i)
+
+    results: List[Any] = [None] * len(states)
+    groups: Dict[int, Any] = {}
+    for (_, question), indices in unique.items():
+        engine = states[indices[0]].get("search_engine")
+        if question and hasattr(engine, "search_batch"):
+            groups.setdefault(id(engine), (engine, []))[1].append((indices, question))
+
+    for engine, items in groups.values():
+        try:
+            batched = await asyncio.to_thread(
+                engine.search_batch, [q for _, q in items], k=_SEARCH_K, threshold=_SEARCH_THRESHOLD
+            )
+            found_results = [_format_search_results(found) for found in batched]
+        except Exception as e:
+            found_results = [_search_failed(e)] * len(items)
+        for (indices, _), result in zip(items, found_results):
+            results[indices[0]] = result
+
+    rest = [indices[0] for indices in unique.values() if results[indices[0]] is None]
+    for i, result in zip(rest, await asyncio.gather(*(_asearch_agent(states[i]) for i in rest))):
+        results[i] = result
+    for indices in unique.values():
+        for i in indices:
+            states[i].update(results[indices[0]])
+
+
+async def _ainvoke_batch(initial_states: List[QAState]) -> List[QAState]:
+    """Answer several questions with the graph's nodes, batching each step.
+
+    Synthesis calls for all questions are issued concurrently, so clients
+    that micro-batch concurrent requests (LangchainLLMClient) send them to
+    the provider together. Retries follow ``_should_continue`` per question.
+    """
+    states = [dict(s) for s in initial_states]
+    await _abatch_search(states)
+    for state, result in zip(states, await asyncio.gather(*(_asynth_and_validate(s) for s in states))):
+        state.update(result)
+    return states
+
+
+class _Fallback:
+    """Sequential node runner used when LangGraph is not installed."""
+
+    def invoke(self, initial_state: QAState) -> QAState:
+        state = dict(initial_state)
+        state.update(_search_agent(state))
+        state.update(_synthesis_agent(state))
+        state.update(_validate_agent(state))
+        return state
+
+    def invoke_batch(self, initial_states: List[QAState]) -> List[QAState]:
+        return asyncio.run(_ainvoke_batch(initial_states))
+
+
+class _AsyncFallback:
+    async def ainvoke(self, initial_state: QAState) -> QAState:
+        state = dict(initial_state)
+        state.update(await _asearch_agent(state))
+        state.update(await _asynthesis_agent(state))
+        state.update(await _avalidate_agent(state))
+        return state
+
+    async def ainvoke_batch(self, initial_states: List[QAState]) -> List[QAState]:
+        return await _ainvoke_batch(initial_states)
+
+
+class _WithConfig:
+    """Thin wrapper injecting recursion_limit into each invoke."""
+
+    def __init__(self, g, limit: int):
+        self._g = g
+        self._limit = limit
+
+    def invoke(self, initial_state: QAState) -> QAState:  # type: ignore[misc]
+        try:
+            return self._g.invoke(initial_state, config={"recursion_limit": self._limit})
+        except TypeError:
+            # Older versions may not accept config; fallback to plain invoke
+            return self._g.invoke(initial_state)
+
+    def invoke_batch(self, initial_states: List[QAState]) -> List[QAState]:
+        """Answer several questions at once; bypasses the graph engine.
+
+        Uses ``asyncio.run``, so call ``ainvoke_batch`` from running event loops.
+        """
+        return asyncio.run(_ainvoke_batch(initial_states))
+
+    async def ainvoke_batch(self, initial_states: List[QAState]) -> List[QAState]:
+        return await _ainvoke_batch(initial_states)
+
+
+class _AsyncWithConfig(_WithConfig):
+    async def ainvoke(self, initial_state: QAState) -> QAState:  # type: ignore[misc]
+        return await self._g.ainvoke(initial_state, config={"recursion_limit": self._limit})
+
+
+# Compiled graphs are built once per process ("sync" / "async") and shared by
+# every workflow wrapper; compiled LangGraph graphs are safe to reuse
+_COMPILED: Dict[str, Any] = {}
+_COMPILE_LOCK = threading.Lock()
+
+
+def _build_graph(asynchronous: bool, fused: bool = True):
+    search, synthesize, validate = (
+        (_asearch_agent, _asynthesis_agent, _avalidate_agent) if asynchronous
+        else (_search_agent, _synthesis_agent, _validate_agent)
+    )
     graph = StateGraph(QAState)
-    graph.add_node("search", _search_agent)
-    graph.add_node("synthesize", _synthesis_agent)
-    graph.add_node("validate", _validate_agent)
+    graph.add_node("search", search)
     graph.set_entry_point("search")
+    if fused:
+        graph.add_node("synth_and_validate", _asynth_and_validate if asynchronous else _synth_and_validate)
+        graph.add_edge("search", "synth_and_validate")
+        graph.add_edge("synth_and_validate", END)
+        return graph.compile()
+    # Three-node graph: one dispatch per synthesis/validation step
+    graph.add_node("synthesize", synthesize)
+    graph.add_node("validate", validate)
     graph.add_edge("search", "synthesize")
     graph.add_edge("synthesize", "validate")
     graph.add_conditional_edges("validate", _should_continue, {"synthesize": "synthesize", "end": END})
-    
-    # Compile graph
-    _compiled = graph.compile()
+    return graph.compile()
 
-    # Return a thin wrapper that injects recursion_limit on each invoke
-    class _WithConfig:
-        def __init__(self, g, limit: int):
-            self._g = g
-            self._limit = limit
 
-        def invoke(self, initial_state: QAState) -> QAState:  # type: ignore[misc]
-            try:
-                return self._g.invoke(initial_state, config={"recursion_limit": self._limit})
-            except TypeError:
-                # Older versions may not accept config; fallback to plain invoke
-                return self._g.invoke(initial_state)
+def _compiled_graph(asynchronous: bool = False, fused: bool = True):
+    key = ("async" if asynchronous else "sync") + ("" if fused else "-3node")
+    compiled = _COMPILED.get(key)
+    if compiled is None:
+        with _COMPILE_LOCK:
+            compiled = _COMPILED.get(key)
+            if compiled is None:
+                compiled = _COMPILED[key] = _build_graph(asynchronous, fused)
+    return compiled
 
-    return _WithConfig(_compiled, recursion_limit)
+
+def create_qa_workflow(recursion_limit: int = 10, fused: bool = True):
+    """QA workflow; ``fused=False`` keeps separate synthesize/validate nodes."""
+    if StateGraph is None:  # LangGraph not installed
+        return _Fallback()
+    return _WithConfig(_compiled_graph(fused=fused), recursion_limit)
 
 
+def create_qa_workflow_async(recursion_limit: int = 10, fused: bool = True):
+    """Async QA workflow; call ``await workflow.ainvoke(state)``.
+
+    Nodes await ``search_engine.asearch`` / ``llm_client.agenerate_response``
+    when available (falling back to worker threads), so one event loop can
+    serve many QA sessions concurrently.
+    """
+    if StateGraph is None:  # LangGraph not installed
+        return _AsyncFallback()
+    return _AsyncWithConfig(_compiled_graph(asynchronous=True, fused=fused), recursion_limit)
@@ -1,118 +1,268 @@
+import asyncio
+import threading
 from typing import TypedDict, List, Dict, Any
 
+from src.utils.cache import SemanticCache
+
 try:
     from langgraph.graph import StateGraph, END
 except Exception:  # pragma: no cover
     StateGraph = None  # type: ignore
     END = "__END__"  # type: ignore
 
+# Summaries of stable documents, keyed on content and generation settings
+_SUMMARY_CACHE = SemanticCache(max_entries=1024, ttl=3600)
+
+# Only completed generations are cached; clients report failures as regular
+# responses with finish_reason "error" / "no_api_key"
+_CACHEABLE_FINISH = frozenset({"stop", "length"})
+
+# Characters per chunk produced by _chunk_node
+_CHUNK_SIZE = 1500
+
+# Map-reduce summarization: concurrent per-chunk calls and their token budget
+_MAP_CONCURRENCY = 8
+_MAP_MAX_TOKENS = 400
+
+# Beyond _TREE_REDUCE_MIN partial summaries, they are merged in groups of
+# _REDUCE_BRANCHING, level by level, so no reduce prompt grows with the document
+_REDUCE_BRANCHING = 4
+_TREE_REDUCE_MIN = 8
+
 
+# Plain overwrite fields; see QAState for why no reducers are declared
 class SummarizationState(TypedDict, total=False):
     content: str
     summary: str
     chunks: List[str]
+    _chunks_from_content: bool
     confidence: float
     error: str
     max_retries: int
+    remaining_loops: int
+    _content_words: int
+    _summary_words: int
 
 
 def _chunk_node(state: SummarizationState) -> SummarizationState:
     content = state.get("content", "")
-    if not content or not content.strip():
+    if not content or content.isspace():
         return {"error": "missing content", "chunks": []}
     
-    # naive chunking fallback (LangChain splitter can replace later)
-    chunk_size = 1500
-    chunks = [content[i:i + chunk_size] for i in range(0, len(content), chunk_size)]
-    
-    # Filter out empty chunks
-    chunks = [chunk.strip() for chunk in chunks if chunk.strip()]
+    # naive chunking fallback (LangChain splitter can replace later); each
+    # window is sliced and stripped once, and empty chunks are dropped
+    chunk_size = _CHUNK_SIZE
+    chunks = [
+        chunk
+        for start in range(0, len(content), chunk_size)
+        if (chunk := content[start:start + chunk_size].strip())
+    ]
     
     if not chunks:
         return {"error": "no valid chunks created", "chunks": []}
     
-    return {"chunks": chunks}
+    # Chunks partition the original content, so later nodes read it directly
+    # instead of re-joining them into a second full-document string
+    return {"chunks": chunks, "_chunks_from_content": True, "_content_words": len(content.split())}
 
 
-def _summary_node(state: SummarizationState) -> SummarizationState:
+def _source_text(state: SummarizationState) -> str:
+    """Document text to summarize/validate: the content, or externally supplied chunks."""
+    chunks = state.get("chunks")
+    if chunks and not state.get("_chunks_from_content"):
+        return "\n\n".join(chunks)
+    return state.get("content", "")
+
+
+def _summary_inputs(state: SummarizationState):
+    """Return (llm_client, prompt_manager, content, addl, max_tokens, cache_key) or an error state."""
     llm_client = state.get("llm_client")
     prompt_manager = state.get("prompt_manager")
-    chunks = state.get("chunks", [])
-    original_content = state.get("content", "")
-    
-    # Use chunks if available, otherwise fallback to original content
-    if chunks:
-        content = "\n\n".join(chunks)
-    else:
-        content = original_content
-    
+    content = _source_text(state)
     addl = state.get("additional_instructions", "")
     gen_max_tokens = int(state.get("max_tokens", 0)) or 1600
     
     if not llm_client or not prompt_manager:
         return {"error": "missing llm_client/prompt_manager"}
     
-    if not content or not content.strip():
+    if not content or content.isspace():
         return {"error": "missing content", "confidence": 0.0}
     
+    cache_key = None if state.get("no_cache") else SemanticCache.make_key(content, addl, gen_max_tokens)
+    return llm_client, prompt_manager, content, addl, gen_max_tokens, cache_key
+
+
+def _response_text(resp: Any) -> str:
+    # Extract content safely
+    return resp.get("content", "") if isinstance(resp, dict) else getattr(resp, "content", "")
+
+
+def _completed(resp: Any) -> bool:
+    """Whether the client finished the generation (as opposed to reporting a failure)."""
+    reason = resp.get("finish_reason") if isinstance(resp, dict) else getattr(resp, "finish_reason", None)
+    return reason in _CACHEABLE_FINISH
+
+
+def _summary_result(content: str, summary_content: str, cache_key, content_words: int = 0) -> SummarizationState:
+    # Calculate dynamic confidence based on response quality
+    summary_words = 0
+    if summary_content:
+        # Simple confidence calculation based on summary length vs content length;
+        # the content count usually comes from _chunk_node
+        content_words = content_words or len(content.split())
+        summary_words = len(summary_content.split())
+        if content_words > 0:
+            ratio = summary_words / content_words
+            # Prefer 10%-35% ratio for good summaries
+            if 0.1 <= ratio <= 0.35:
+                confidence = 0.9
+            elif ratio < 0.1:
+                confidence = 0.7
+            else:
+                confidence = 0.75
+        else:
+            confidence = 0.8
+    else:
+        confidence = 0.5
+
+    # Word counts are reused by _validate_node instead of re-splitting
+    result = {
+        "summary": summary_content,
+        "confidence": confidence,
+        "_content_words": content_words,
+        "_summary_words": summary_words,
+    }
+    if cache_key is not None and summary_content:
+        _SUMMARY_CACHE.set(cache_key, result)
+    return result
+
+
+def _summary_node(state: SummarizationState) -> SummarizationState:
+    inputs = _summary_inputs(state)
+    if isinstance(inputs, dict):
+        return inputs
+    llm_client, prompt_manager, content, addl, gen_max_tokens, cache_key = inputs
+    # Retries must regenerate rather than return the summary being retried
+    if cache_key is not None and not state.get("max_retries"):
+        cached = _SUMMARY_CACHE.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+
     try:
         messages = prompt_manager.build_summary_prompt(
             content=content,
             additional_instructions=addl,
         )
         resp = llm_client.generate_response(messages, max_tokens=gen_max_tokens, temperature=0.2)
-        
-        # Extract content safely
-        summary_content = resp.get("content", "") if isinstance(resp, dict) else getattr(resp, "content", "")
-        
-        # Calculate dynamic confidence based on response quality
-        if summary_content:
-            # Simple confidence calculation based on summary length vs content length
-            content_words = len(content.split())
-            summary_words = len(summary_content.split())
-            if content_words > 0:
-                ratio = summary_words / content_words
-                # Prefer 10%-35% ratio for good summaries
-                if 0.1 <= ratio <= 0.35:
-                    confidence = 0.9
-                elif ratio < 0.1:
-                    confidence = 0.7
-                else:
-                    confidence = 0.75
-            else:
-                confidence = 0.8
-        else:
-            confidence = 0.5
-            
-        return {"summary": summary_content, "confidence": confidence}
+        return _summary_result(content, _response_text(resp), cache_key if _completed(resp) else None,
+                               state.get("_content_words", 0))
         
     except Exception as e:
         return {"error": f"summary generation failed: {str(e)}", "confidence": 0.3}
 
 
+async def _agenerate(llm_client: Any, messages: List[Dict[str, Any]], **kwargs) -> Any:
+    """Native async generation when the client provides it, else a worker thread."""
+    agenerate = getattr(llm_client, "agenerate_response", None)
+    if agenerate is not None:
+        return await agenerate(messages, **kwargs)
+    return await asyncio.to_thread(llm_client.generate_response, messages, **kwargs)
+
+
+def _reduce_messages(prompt_manager: Any, partials: List[str], addl: str) -> List[Dict[str, Any]]:
+    build_reduce = getattr(prompt_manager, "build_reduce_prompt", None)
+    if build_reduce is not None:
+        return build_reduce(partials, additional_instructions=addl)
+    return prompt_manager.build_summary_prompt(content="\n\n".join(partials), additional_instructions=addl)
+
+
+async def _tree_reduce(partials: List[str], reduce_group, branching: int = _REDUCE_BRANCHING) -> List[str]:
+    """Merge partial summaries group-wise until at most ``branching`` remain."""
+    while len(partials) > branching:
+        groups = [partials[i:i + branching] for i in range(0, len(partials), branching)]
+        partials = [p for p in await asyncio.gather(*(reduce_group(g) for g in groups)) if p]
+    return partials
+
+
+async def _asummary_node(state: SummarizationState) -> SummarizationState:
+    """Map-reduce summary: chunks are summarized concurrently, then combined.
+
+    At most ``_MAP_CONCURRENCY`` partial summaries are requested at once to
+    respect provider rate limits. A single chunk takes one direct call, and
+    more than ``_TREE_REDUCE_MIN`` partials are combined hierarchically.
+    """
+    inputs = _summary_inputs(state)
+    if isinstance(inputs, dict):
+        return inputs
+    llm_client, prompt_manager, content, addl, gen_max_tokens, cache_key = inputs
+    # Retries must regenerate rather than return the summary being retried
+    if cache_key is not None and not state.get("max_retries"):
+        cached = _SUMMARY_CACHE.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+
+    chunks = state.get("chunks") or []
+    try:
+        if len(chunks) <= 1:
+            messages = prompt_manager.build_summary_prompt(content=content, additional_instructions=addl)
+            resp = await _agenerate(llm_client, messages, max_tokens=gen_max_tokens, temperature=0.2)
+            return _summary_result(content, _response_text(resp), cache_key if _completed(resp) else None,
+                                   state.get("_content_words", 0))
+
+        semaphore = asyncio.Semaphore(_MAP_CONCURRENCY)
+        # Any failed map/reduce call keeps the final summary out of the cache
+        failed: List[Any] = []
+
+        def _text(resp: Any) -> str:
+            if not _completed(resp):
+                failed.append(resp)
+            return _response_text(resp)
+
+        async def _map(chunk: str) -> str:
+            async with semaphore:
+                messages = prompt_manager.build_summary_prompt(content=chunk, additional_instructions=addl)
+                return _text(await _agenerate(llm_client, messages, max_tokens=_MAP_MAX_TOKENS, temperature=0.2))
+
+        async def _reduce_group(group: List[str]) -> str:
+            if len(group) == 1:
+                return group[0]
+            async with semaphore:
+                messages = _reduce_messages(prompt_manager, group, addl)
+                return _text(await _agenerate(llm_client, messages, max_tokens=_MAP_MAX_TOKENS, temperature=0.2))
+
+        partials = [p for p in await asyncio.gather(*(_map(c) for c in chunks)) if p]
+        if len(partials) > _TREE_REDUCE_MIN:
+            partials = await _tree_reduce(partials, _reduce_group)
+        if not partials:
+            return _summary_result(content, "", None)
+        resp = await _agenerate(
+            llm_client, _reduce_messages(prompt_manager, partials, addl),
+            max_tokens=gen_max_tokens, temperature=0.2,
+        )
+        text = _text(resp)
+        return _summary_result(content, text, None if failed else cache_key, state.get("_content_words", 0))
+
+    except Exception as e:
+        return {"error": f"summary generation failed: {str(e)}", "confidence": 0.3}
+
+
 def _validate_node(state: SummarizationState) -> SummarizationState:
-    # Get content from either chunks or original content
-    chunks = state.get("chunks", [])
-    original_content = state.get("content", "")
+    # Same text the summary node worked on
+    content = _source_text(state)
     summary = state.get("summary", "")
+    # Every outcome counts as one validation attempt
+    retries = state.get("max_retries", 0) + 1
     
-    # Determine which content to use for validation
-    if chunks:
-        content = "\n\n".join(chunks)
-    else:
-        content = original_content
-    
-    if not content or not content.strip():
-        retries = state.get("max_retries", 0) + 1
+    if not content or content.isspace():
         return {"error": "missing content", "confidence": 0.0, "max_retries": retries}
     
-    if not summary or not summary.strip():
-        retries = state.get("max_retries", 0) + 1
+    if not summary or summary.isspace():
         return {"error": "missing summary", "confidence": 0.0, "max_retries": retries}
     
     try:
-        cw = max(1, len(content.split()))
-        sw = len(summary.split())
+        # Counts cached by the summary node for this same content/summary
+        cw = max(1, state.get("_content_words") or len(content.split()))
+        sw = state.get("_summary_words") or len(summary.split())
         ratio = sw / cw
         
         # Enhanced confidence calculation
@@ -130,79 +280,124 @@ def _validate_node(state: SummarizationState) -> SummarizationState:
             confidence = 0.5
             
         # Additional quality checks
-        if summary.strip() and len(summary) > 50:
+        if len(summary) > 50:  # non-blank already checked above
             confidence = min(confidence + 0.1, 1.0)
         
-        retries = state.get("max_retries", 0) + 1
-        return {"confidence": confidence, "max_retries": retries}
+        update: SummarizationState = {"confidence": confidence, "max_retries": retries}
+        # Normalize once so _should_continue can compare without casting
+        remaining = state.get("remaining_loops", 0)
+        if type(remaining) is not int:
+            update["remaining_loops"] = int(remaining)
+        return update
         
     except Exception as e:
         return {"error": f"validation failed: {str(e)}", "confidence": 0.3}
 
 
 def _should_continue(state: SummarizationState) -> str:
-    confidence = state.get("confidence", 0.0)
-    retries = state.get("max_retries", 0)
-    error = state.get("error", "")
-    
     # Always end if there's an error to prevent infinite loops
-    if error:
-        return "end"
-    
-    # Always end after max retries to prevent infinite loops
-    if retries >= 2:
+    if state.get("error"):
         return "end"
-    
-    if int(state.get("remaining_loops", 0)) <= 0:
-        return "end"
-    
-    # End if confidence is high enough
-    if confidence >= 0.85:
+    # Hard stop conditions (retry cap, loop budget) and confident results;
+    # validate always runs first and stores remaining_loops as an int
+    if (
+        state.get("max_retries", 0) >= 2
+        or state.get("remaining_loops", 0) <= 0
+        or state.get("confidence", 0.0) >= 0.85
+    ):
         return "end"
-    
     return "summarize"
 
 
-def create_summarization_workflow(recursion_limit: int = 10):
-    if StateGraph is None:  # fallback when LangGraph not installed
-        def _fallback_invoke(initial_state: SummarizationState) -> SummarizationState:  # type: ignore[misc]
-            state = dict(initial_state)
-            state.update(_chunk_node(state))
-            state.update(_summary_node(state))
-            state.update(_validate_node(state))
-            return state
-
-        class _Fallback:
-            def invoke(self, initial_state: SummarizationState) -> SummarizationState:
-                return _fallback_invoke(initial_state)
+async def _avalidate_node(state: SummarizationState) -> SummarizationState:
+    return _validate_node(state)
 
-        return _Fallback()
 
+async def _achunk_node(state: SummarizationState) -> SummarizationState:
+    return _chunk_node(state)
+
+
+class _Fallback:
+    """Sequential node runner used when LangGraph is not installed."""
+
+    def invoke(self, initial_state: SummarizationState) -> SummarizationState:
+        state = dict(initial_state)
+        state.update(_chunk_node(state))
+        state.update(_summary_node(state))
+        state.update(_validate_node(state))
+        return state
+
+
+class _AsyncFallback:
+    async def ainvoke(self, initial_state: SummarizationState) -> SummarizationState:
+        state = dict(initial_state)
+        state.update(await _achunk_node(state))
+        state.update(await _asummary_node(state))
+        state.update(await _avalidate_node(state))
+        return state
+
+
+class _WithConfig:
+    """Thin wrapper injecting recursion_limit into each invoke."""
+
+    def __init__(self, g, limit: int):
+        self._g = g
+        self._limit = limit
+
+    def invoke(self, initial_state: SummarizationState) -> SummarizationState:  # type: ignore[misc]
+        try:
+            return self._g.invoke(initial_state, config={"recursion_limit": self._limit})
+        except TypeError:
+            # Older versions may not accept config; fallback to plain invoke
+            return self._g.invoke(initial_state)
+
+
+class _AsyncWithConfig(_WithConfig):
+    async def ainvoke(self, initial_state: SummarizationState) -> SummarizationState:  # type: ignore[misc]
+        return await self._g.ainvoke(initial_state, config={"recursion_limit": self._limit})
+
+
+# Compiled graphs are built once per process ("sync" / "async") and shared by
+# every workflow wrapper; compiled LangGraph graphs are safe to reuse
+_COMPILED: Dict[str, Any] = {}
+_COMPILE_LOCK = threading.Lock()
+
+
+def _build_graph(asynchronous: bool):
+    chunk, summarize, validate = (
+        (_achunk_node, _asummary_node, _avalidate_node) if asynchronous
+        else (_chunk_node, _summary_node, _validate_node)
+    )
     graph = StateGraph(SummarizationState)
-    graph.add_node("chunk", _chunk_node)
-    graph.add_node("summarize", _summary_node)
-    graph.add_node("validate", _validate_node)
+    graph.add_node("chunk", chunk)
+    graph.add_node("summarize", summarize)
+    graph.add_node("validate", validate)
     graph.set_entry_point("chunk")
     graph.add_edge("chunk", "summarize")
     graph.add_edge("summarize", "validate")
     graph.add_conditional_edges("validate", _should_continue, {"summarize": "summarize", "end": END})
-    
-    # Compile graph
-    _compiled = graph.compile()
+    return graph.compile()
+
 
-    # Return a thin wrapper that injects recursion_limit on each invoke
-    class _WithConfig:
-        def __init__(self, g, limit: int):
-            self._g = g
-            self._limit = limit
+def _compiled_graph(asynchronous: bool = False):
+    key = "async" if asynchronous else "sync"
+    compiled = _COMPILED.get(key)
+    if compiled is None:
+        with _COMPILE_LOCK:
+            compiled = _COMPILED.get(key)
+            if compiled is None:
+                compiled = _COMPILED[key] = _build_graph(asynchronous)
+    return compiled
 
-        def invoke(self, initial_state: SummarizationState) -> SummarizationState:  # type: ignore[misc]
-            try:
-                return self._g.invoke(initial_state, config={"recursion_limit": self._limit})
-            except TypeError:
-                # Older versions may not accept config; fallback to plain invoke
-                return self._g.invoke(initial_state)
 
-    return _WithConfig(_compiled, recursion_limit)
+def create_summarization_workflow(recursion_limit: int = 10):
+    if StateGraph is None:  # LangGraph not installed
+        return _Fallback()
+    return _WithConfig(_compiled_graph(), recursion_limit)
 
 
+def create_summarization_workflow_async(recursion_limit: int = 10):
+    """Async map-reduce summarization workflow; call ``await workflow.ainvoke(state)``."""
+    if StateGraph is None:  # LangGraph not installed
+        return _AsyncFallback()
+    return _AsyncWithConfig(_compiled_graph(asynchronous=True), recursion_limit)
@@ -2,36 +2,214 @@
 LLM client module for Thunderbolts.
 Handles Azure OpenAI and OpenAI API interactions.
 """
+import asyncio
 import json
-from typing import List, Dict, Any, Optional, Union, AsyncGenerator
-from dataclasses import dataclass
+import os
+import threading
+import time
+import weakref
+from collections.abc import Mapping
+from functools import lru_cache
+from importlib.util import find_spec
+from typing import List, Dict, Any, Optional, Union, AsyncGenerator, Callable, Generator
+from dataclasses import dataclass, replace
+
+# openai, tiktoken and langchain are imported on first use; importing this
+# module only checks that they are installed
+OPENAI_AVAILABLE = find_spec("openai") is not None
+LANGCHAIN_AVAILABLE = find_spec("langchain_openai") is not None and find_spec("langchain") is not None
 
 try:
-    from openai import AzureOpenAI, OpenAI
-    OPENAI_AVAILABLE = True
+    from orjson import dumps as _json_bytes, loads as _json_loads
 except ImportError:
-    OPENAI_AVAILABLE = False
+    from json import loads as _json_loads
+
+    def _json_bytes(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
 
 try:
-    from langchain_openai import AzureChatOpenAI, ChatOpenAI
-    from langchain.schema import HumanMessage, SystemMessage, AIMessage
-    LANGCHAIN_AVAILABLE = True
+    # libuv-based event loop for the client's own loops (optional)
+    from uvloop import new_event_loop as _new_event_loop
 except ImportError:
-    LANGCHAIN_AVAILABLE = False
+    _new_event_loop = None
 
 from config.settings import settings
 from src.utils.logger import logger
 from src.utils.exceptions import LLMError
 from src.utils.memory import memory_manager
+from src.utils.cache import SemanticCache, load_local_embedder
+from src.utils.tokens import token_encoding
 from src.ai.function_calling import FunctionCaller
 
+# Responses are only cached for (near-)deterministic generations
+_CACHE_MAX_TEMPERATURE = 0.3
+
+# System prompt used when the caller supplies none; kept byte-identical across
+# calls so providers can reuse the cached prompt prefix
+_STATIC_SYSTEM_PROMPT = "You are a helpful AI assistant. Use the context from previous interactions when relevant."
+
+
+@lru_cache(maxsize=None)
+def _openai() -> Any:
+    """The openai module, imported when the first client is built."""
+    import openai
+    return openai
+
+
+@lru_cache(maxsize=None)
+def _tiktoken() -> Any:
+    """The tiktoken module, imported when the first encoder is loaded."""
+    import tiktoken
+    return tiktoken
+
+
+@lru_cache(maxsize=None)
+def _langchain_roles() -> Dict[str, Any]:
+    """Role -> LangChain message class, imported on the first LangChain call."""
+    from langchain.schema import HumanMessage, SystemMessage, AIMessage
+    return {'system': SystemMessage, 'user': HumanMessage, 'assistant': AIMessage}
+
+
+# Memory snippet budgets in tokens, with the character caps used without tiktoken
+_TURN_TOKENS, _TURN_CHARS = 50, 200
+_MEMORY_TOKENS, _MEMORY_CHARS = 40, 150
+
+
+def _truncate_tokens(text: str, tokens: int, chars: int, encoding_name: Optional[str]) -> str:
+    """First ``tokens`` tokens of ``text`` (first ``chars`` characters without an encoding)."""
+    if encoding_name is None:
+        return text[:chars]
+    encoding = _tiktoken().get_encoding(encoding_name)
+    # Only a bounded prefix is encoded; tokens rarely exceed 16 characters
+    head = text[:tokens * 16]
+    ids = encoding.encode(head, disallowed_special=())
+    return head if len(ids) <= tokens else encoding.decode(ids[:tokens])
+
+
+@lru_cache(maxsize=64)
+def _render_turns(turns: tuple, encoding_name: Optional[str]) -> tuple:
+    """Conversation-history lines for ((turn_id, user_input, assistant_response), ...)."""
+    lines = []
+    for _, user_input, assistant_response in turns:
+        lines.append(f"User: {user_input}")
+        lines.append(f"Assistant: {_truncate_tokens(assistant_response, _TURN_TOKENS, _TURN_CHARS, encoding_name)}...")
+    return tuple(lines)
+
+
+_VALID_ROLES = frozenset({'system', 'user', 'assistant'})
+
+
+def _last_user_index(messages: List[Dict[str, str]]) -> Optional[int]:
+    """Index of the most recent user message, scanning from the end; None if absent."""
+    for i in range(len(messages) - 1, -1, -1):
+        if messages[i]['role'] == 'user':
+            return i
+    return None
+
+
+# Per-call generation kwargs forwarded to chat.completions.create
+_CALL_KWARGS = frozenset({'temperature', 'max_tokens', 'functions', 'function_call', 'tools', 'tool_choice'})
+
+# Parameters that need the SDK's typed response (tool / function calls)
+_TOOL_KWARGS = frozenset({'functions', 'function_call', 'tools', 'tool_choice'})
+
+# Upper word-count bound of the confidence bonus band
+_CONFIDENCE_MAX_WORDS = 500
+
+# Token counts of texts up to this length are memoized (prompt fragments)
+_TOKEN_CACHE_MAX_CHARS = 4096
+
+
+@lru_cache(maxsize=4096)
+def _cached_token_count(encoding_name: str, text: str) -> int:
+    return len(_tiktoken().get_encoding(encoding_name).encode(text, disallowed_special=()))
+
+
+# HTTP connection pool and timeouts of the SDK clients
+_HTTP_MAX_CONNECTIONS = 100
+_HTTP_MAX_KEEPALIVE = 50
+_HTTP_TIMEOUT = 60.0
+_HTTP_CONNECT_TIMEOUT = 5.0
+
+# SDK retries (exponential backoff honoring Retry-After on 408/409/429/5xx)
+_DEFAULT_MAX_RETRIES = 5
+
+_SYNC_HTTP_CLIENT = None
+_SYNC_HTTP_CLIENT_LOCK = threading.Lock()
+
+
+def _run_coroutine(coro: Any) -> Any:
+    """Run ``coro`` on a fresh event loop, a uvloop one when installed (Python 3.11+)."""
+    if _new_event_loop is None or not hasattr(asyncio, 'Runner'):
+        return asyncio.run(coro)
+    with asyncio.Runner(loop_factory=_new_event_loop) as runner:
+        return runner.run(coro)
+
+
+def _httpx_response() -> Any:
+    """httpx.Response; as ``cast_to`` the SDK returns the raw response unparsed."""
+    import httpx
+    return httpx.Response
+
+
+def _http_options() -> Dict[str, Any]:
+    import httpx
+    return {
+        'limits': httpx.Limits(max_connections=_HTTP_MAX_CONNECTIONS, max_keepalive_connections=_HTTP_MAX_KEEPALIVE),
+        'timeout': httpx.Timeout(_HTTP_TIMEOUT, connect=_HTTP_CONNECT_TIMEOUT),
+    }
+
+
+def _shared_sync_http_client() -> Any:
+    """Process-wide keep-alive httpx client for the sync SDK clients (thread-safe)."""
+    global _SYNC_HTTP_CLIENT
+    if _SYNC_HTTP_CLIENT is None:
+        with _SYNC_HTTP_CLIENT_LOCK:
+            if _SYNC_HTTP_CLIENT is None:
+                _SYNC_HTTP_CLIENT = _openai().DefaultHttpxClient(**_http_options())
+    return _SYNC_HTTP_CLIENT
+
+
+class _LazyUsage(Mapping):
+    """Read-only usage mapping that serializes the SDK usage model on first access.
+
+    Attribute access (``usage.total_tokens``) reads the SDK model directly
+    without building the dict.
+    """
+
+    __slots__ = ("_source", "_data")
+
+    def __init__(self, source: Any):
+        self._source = source
+        self._data = None
+
+    def _dump(self) -> Dict[str, Any]:
+        if self._data is None:
+            self._data = self._source.model_dump()
+        return self._data
+
+    def __getitem__(self, key: str) -> Any:
+        return self._dump()[key]
+
+    def __iter__(self):
+        return iter(self._dump())
 
-@dataclass
+    def __len__(self) -> int:
+        return len(self._dump())
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._source, name)
+
+    def __repr__(self) -> str:
+        return repr(self._dump())
+
+
+@dataclass(slots=True, frozen=True)
 class LLMResponse:
     """Represents an LLM response."""
     content: str
     model: str
-    usage: Dict[str, int]
+    usage: Mapping[str, Any]
     finish_reason: str
     function_calls: Optional[List[Dict[str, Any]]] = None
 
@@ -39,12 +217,16 @@ class LLMResponse:
 class LLMClient:
     """Client for interacting with Large Language Models."""
     
-    def __init__(self, config: Optional[Dict[str, Any]] = None):
+    def __init__(self, config: Optional[Dict[str, Any]] = None,
+                 response_cache: Optional[SemanticCache] = None,
+                 embed_fn: Optional[Callable[[str], Any]] = None):
         """
         Initialize the LLM client.
         
         Args:
             config: Optional configuration dictionary
+            response_cache: Optional shared response cache; one is created from config otherwise
+            embed_fn: Optional text -> vector function enabling semantic cache hits
         """
         if not OPENAI_AVAILABLE:
             raise LLMError("OpenAI library not available. Please install openai package.")
@@ -56,66 +238,98 @@ class LLMClient:
         # Model configuration
         self.temperature = self.config.get('temperature', 0.7)
         self.max_tokens = self.config.get('max_tokens', 2000)
+        self.max_retries = int(self.config.get('max_retries', _DEFAULT_MAX_RETRIES))
         
-        # Initialize clients
+        # Initialize clients; the LangChain client is built on first use
         self.azure_client = None
         self.openai_client = None
         self.langchain_client = None
+        # Async SDK clients per event loop; their connection pools are loop-bound
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
         
         # Initialize function caller
         self.function_caller = FunctionCaller()
         
+        # Exact-match response cache; the semantic tier is enabled by passing an
+        # embed_fn or configuring a local sentence-transformers model
+        if response_cache is None:
+            if embed_fn is None and self.config.get('semantic_cache_model'):
+                embed_fn = load_local_embedder(self.config['semantic_cache_model'])
+            response_cache = SemanticCache(
+                max_entries=int(self.config.get('response_cache_size', 1024)),
+                ttl=int(self.config.get('response_cache_ttl', 3600)),
+                embed_fn=embed_fn,
+                similarity_threshold=float(self.config.get('semantic_cache_threshold', 0.95)),
+            )
+        self.response_cache = response_cache
+        
         self._initialize_clients()
+        # Post plain completions through the SDK transport and parse the JSON
+        # body with orjson, skipping the SDK's pydantic response models
+        self._raw_json_transport = bool(self.config.get('raw_json_transport', False))
+        # Per-request defaults of chat.completions.create
+        self._default_call_kwargs = {
+            'model': getattr(self, 'model_name', None),
+            'temperature': self.temperature,
+            'max_tokens': self.max_tokens
+        }
         
         # Fix: Log provider type after initialization
         provider_info = self.get_model_info()
-        self.logger.info(f"LLM Client initialized - Provider: Model: {self.model_name}")
+        self.logger.info("LLM Client initialized - Provider: Model: %s", self.model_name)
     
     def _initialize_clients(self) -> None:
         """Initialize OpenAI clients."""
         try:
+            openai = _openai()
             # Initialize Azure OpenAI client
             if (settings.azure_openai_api_key and settings.azure_openai_endpoint and settings.azure_openai_deployment_name):
                 self.model_name = self.config.get('model_name', settings.azure_openai_deployment_name)
-                self.azure_client = AzureOpenAI(
+                self.azure_client = openai.AzureOpenAI(
                     api_key=settings.azure_openai_api_key,
                     api_version=settings.azure_openai_api_version,
-                    azure_endpoint=settings.azure_openai_endpoint
+                    azure_endpoint=settings.azure_openai_endpoint,
+                    max_retries=self.max_retries,
+                    http_client=_shared_sync_http_client()
                 )
                 self.logger.info("Azure OpenAI client initialized")
-                
-                # Initialize Langchain Azure client if available
-                if LANGCHAIN_AVAILABLE:
-                    self.langchain_client = AzureChatOpenAI(
-                        api_key=settings.azure_openai_api_key,
-                        api_version=settings.azure_openai_api_version,
-                        azure_endpoint=settings.azure_openai_endpoint,
-                        deployment_name=self.model_name,
-                        temperature=self.temperature,
-                        max_tokens=self.max_tokens
-                    )
             
             # Fallback to OpenAI client
             elif settings.openai_api_key:
-                self.openai_client = OpenAI(api_key=settings.openai_api_key, base_url=settings.openai_base_url)
+                self.openai_client = openai.OpenAI(api_key=settings.openai_api_key, base_url=settings.openai_base_url,
+                                                   max_retries=self.max_retries, http_client=_shared_sync_http_client())
                 self.logger.info("OpenAI client initialized")
                 self.model_name = self.config.get('model_name', settings.openai_chat_model)
-                # Initialize Langchain OpenAI client if available
-                if LANGCHAIN_AVAILABLE:
-                    self.langchain_client = ChatOpenAI(
-                        api_key=settings.openai_api_key,
-                        model=self.model_name,
-                        temperature=self.temperature,
-                        max_tokens=self.max_tokens
-                    )
             
             else:
                 self.logger.warning("No OpenAI API credentials configured - LLM features will be disabled")
 
         except Exception as e:
-            self.logger.error(f"Failed to initialize LLM clients: {e}")
+            self.logger.error("Failed to initialize LLM clients: %s", e)
             # Don't raise exception, just log the error
             pass
+
+    def _get_langchain_client(self) -> Any:
+        """LangChain chat model for the configured provider, built on first use; None without credentials."""
+        if self.langchain_client is None and LANGCHAIN_AVAILABLE:
+            from langchain_openai import AzureChatOpenAI, ChatOpenAI
+            if self.azure_client:
+                self.langchain_client = AzureChatOpenAI(
+                    api_key=settings.azure_openai_api_key,
+                    api_version=settings.azure_openai_api_version,
+                    azure_endpoint=settings.azure_openai_endpoint,
+                    deployment_name=self.model_name,
+                    temperature=self.temperature,
+                    max_tokens=self.max_tokens
+                )
+            elif self.openai_client:
+                self.langchain_client = ChatOpenAI(
+                    api_key=settings.openai_api_key,
+                    model=self.model_name,
+                    temperature=self.temperature,
+                    max_tokens=self.max_tokens
+                )
+        return self.langchain_client
     
     def generate_response(self, messages: List[Dict[str, str]], **kwargs) -> LLMResponse:
         """
@@ -132,118 +346,285 @@ class LLMClient:
             LLMError: If generation fails
         """
         try:
-            import time
             start_time = time.time()
-
-            # Enhance messages with memory context if requested
-            if kwargs.get('use_memory', True):
-                messages = self._enhance_with_memory(messages, **kwargs)
+            messages, cache_key, cache_text, cache_scope, cached = self._prepare_generation(messages, kwargs)
 
             # Use Azure client if available
-            if self.azure_client:
+            if cached is not None:
+                response = replace(cached, usage={'cached': 1})
+            elif self.azure_client:
                 response = self._generate_azure_response(messages, **kwargs)
             elif self.openai_client:
                 response = self._generate_openai_response(messages, **kwargs)
             else:
-                # Return a mock response when no client is available
-                return LLMResponse(
-                    content="LLM service not available - please configure API credentials",
-                    model="none",
-                    usage={'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0},
-                    function_calls=None
-                )
+                return self._unavailable_response()
 
-            # Store conversation in memory if enabled
-            if kwargs.get('store_in_memory', True) and len(messages) >= 2:
-                processing_time = time.time() - start_time
-                user_message = next((msg['content'] for msg in messages if msg['role'] == 'user'), '')
+            return self._finish_generation(messages, response, kwargs, start_time,
+                                           cache_key, cache_text, cache_scope, cached)
 
-                # Calculate confidence score based on response characteristics
-                confidence_score = self._calculate_confidence_score(response)
+        except Exception as e:
+            self.logger.error("LLM response generation failed: %s", e)
+            raise LLMError(f"LLM response generation failed: {e}")
 
-                memory_manager.add_conversation_turn(
-                    user_input=user_message,
-                    assistant_response=response.content,
-                    context_used=kwargs.get('context_sources', []),
-                    processing_time=processing_time,
-                    confidence_score=confidence_score
-                )
+    async def agenerate_response(self, messages: List[Dict[str, str]], **kwargs) -> LLMResponse:
+        """
+        Async variant of generate_response using the AsyncOpenAI/AsyncAzureOpenAI SDK.
 
-            return response
+        Args:
+            messages: List of message dictionaries with 'role' and 'content'
+            **kwargs: Additional generation parameters
+
+        Returns:
+            LLMResponse object
+
+        Raises:
+            LLMError: If generation fails
+        """
+        try:
+            start_time = time.time()
+            messages, cache_key, cache_text, cache_scope, cached = self._prepare_generation(messages, kwargs)
+
+            if cached is not None:
+                response = replace(cached, usage={'cached': 1})
+            else:
+                client = self._async_client()
+                if client is None:
+                    return self._unavailable_response()
+                params = self._completion_params(messages, kwargs)
+                if self._use_raw_transport(params):
+                    raw = await client.post('/chat/completions', body=params, cast_to=_httpx_response())
+                    response = self._json_to_llm_response(_json_loads(raw.content))
+                else:
+                    response = self._to_llm_response(await client.chat.completions.create(**params))
+
+            return self._finish_generation(messages, response, kwargs, start_time,
+                                           cache_key, cache_text, cache_scope, cached)
 
         except Exception as e:
-            self.logger.error(f"LLM response generation failed: {e}")
+            self.logger.error("Async LLM response generation failed: %s", e)
             raise LLMError(f"LLM response generation failed: {e}")
-    
-    def _generate_azure_response(self, messages: List[Dict[str, str]], **kwargs) -> LLMResponse:
-        """Generate response using Azure OpenAI."""
-        try:
-            response = self.azure_client.chat.completions.create(
-                model=self.model_name,
-                messages=messages,
-                temperature=kwargs.get('temperature', self.temperature),
-                max_tokens=kwargs.get('max_tokens', self.max_tokens),
-                functions=kwargs.get('functions'),
-                function_call=kwargs.get('function_call')
+
+    async def agenerate_responses_batch(self, list_of_messages: List[List[Dict[str, str]]],
+                                        concurrency: int = 10, **kwargs) -> List[LLMResponse]:
+        """
+        Generate responses for many conversations with bounded concurrency.
+
+        Args:
+            list_of_messages: One message list per request
+            concurrency: Maximum number of requests in flight
+            **kwargs: Generation parameters applied to every request
+
+        Returns:
+            Responses in input order
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _one(messages: List[Dict[str, str]]) -> LLMResponse:
+            async with semaphore:
+                return await self.agenerate_response(messages, **kwargs)
+
+        return list(await asyncio.gather(*(_one(messages) for messages in list_of_messages)))
+
+    def generate_responses_batch(self, list_of_messages: List[List[Dict[str, str]]],
+                                 concurrency: int = 10, **kwargs) -> List[LLMResponse]:
+        """
+        Blocking wrapper around agenerate_responses_batch.
+
+        Runs its own event loop (uvloop when installed), so use
+        agenerate_responses_batch from async code.
+        """
+        async def _run() -> List[LLMResponse]:
+            try:
+                return await self.agenerate_responses_batch(list_of_messages, concurrency, **kwargs)
+            finally:
+                client = self._async_clients.pop(asyncio.get_running_loop(), None)
+                if client is not None:
+                    await client.close()
+
+        return _run_coroutine(_run())
+
+    def _prepare_generation(self, messages: List[Dict[str, str]], kwargs: Dict[str, Any]):
+        """Look up the response cache and apply memory enhancement.
+
+        The cache is keyed on the caller's messages, before the memory context
+        (which changes every turn) is added.
+
+        Returns ``(messages, cache_key, cache_text, cache_scope, cached_response)``.
+        """
+        cache_key, cache_text, cache_scope = self._response_cache_key(messages, kwargs)
+        cached = self.response_cache.get(cache_key, cache_text, scope=cache_scope) if cache_key else None
+
+        # Enhance messages with memory context if requested
+        if kwargs.get('use_memory', True):
+            messages = self._enhance_with_memory(messages, **kwargs)
+        return messages, cache_key, cache_text, cache_scope, cached
+
+    def _finish_generation(self, messages: List[Dict[str, str]], response: LLMResponse, kwargs: Dict[str, Any],
+                           start_time: float, cache_key: Optional[str], cache_text: Optional[str],
+                           cache_scope: Optional[str], cached: Optional[LLMResponse]) -> LLMResponse:
+        """Cache the response and record the turn in memory."""
+        if cache_key and cached is None and response.finish_reason in ('stop', 'length'):
+            self.response_cache.set(cache_key, response, cache_text, scope=cache_scope)
+
+        # Store conversation in memory if enabled
+        if kwargs.get('store_in_memory', True) and len(messages) >= 2:
+            processing_time = time.time() - start_time
+            user_idx = _last_user_index(messages)
+            user_message = messages[user_idx]['content'] if user_idx is not None else ''
+
+            # Calculate confidence score based on response characteristics
+            confidence_score = self._calculate_confidence_score(response)
+
+            memory_manager.add_conversation_turn(
+                user_input=user_message,
+                assistant_response=response.content,
+                context_used=kwargs.get('context_sources', []),
+                processing_time=processing_time,
+                confidence_score=confidence_score
             )
+
+        return response
+
+    def _unavailable_response(self) -> LLMResponse:
+        # Return a mock response when no client is available
+        return LLMResponse(
+            content="LLM service not available - please configure API credentials",
+            model="none",
+            usage={'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0},
+            finish_reason="no_api_key",
+            function_calls=None
+        )
+
+    def _async_client(self) -> Any:
+        """Async SDK client for the running event loop, or None without credentials."""
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            openai = _openai()
+            http_client = openai.DefaultAsyncHttpxClient(**_http_options())
+            if self.azure_client:
+                client = openai.AsyncAzureOpenAI(
+                    api_key=settings.azure_openai_api_key,
+                    api_version=settings.azure_openai_api_version,
+                    azure_endpoint=settings.azure_openai_endpoint,
+                    max_retries=self.max_retries,
+                    http_client=http_client
+                )
+            elif self.openai_client:
+                client = openai.AsyncOpenAI(api_key=settings.openai_api_key, base_url=settings.openai_base_url,
+                                            max_retries=self.max_retries, http_client=http_client)
+            else:
+                return None
+            self._async_clients[loop] = client
+        return client
+    
+    def _response_cache_key(self, messages: List[Dict[str, str]], kwargs: Dict[str, Any]):
+        """
+        Build the response cache key for a request.
+        
+        Args:
+            messages: Caller's messages, before memory enhancement
+            kwargs: Generation parameters
             
-            choice = response.choices[0]
-            
-            # Handle function calls
-            function_calls = None
-            if choice.message.function_call:
-                function_calls = [{
-                    'name': choice.message.function_call.name,
-                    'arguments': choice.message.function_call.arguments
-                }]
-            
-            return LLMResponse(
-                content=choice.message.content or "",
-                model=response.model,
-                usage=response.usage.model_dump() if response.usage else {},
-                finish_reason=choice.finish_reason,
-                function_calls=function_calls
-            )
+        Returns:
+            ``(cache_key, semantic_text, scope)``, or ``(None, None, None)`` when
+            the request must not be cached (function calling, sampling,
+            ``no_cache=True``); semantic hits are limited to the scope of the
+            same model, temperature and ``max_tokens``
+        """
+        temperature = kwargs.get('temperature', self.temperature)
+        if kwargs.get('functions') or kwargs.get('tools') or kwargs.get('no_cache') or temperature > _CACHE_MAX_TEMPERATURE:
+            return None, None, None
+        scope = SemanticCache.make_key(self.model_name, temperature, kwargs.get('max_tokens', self.max_tokens))
+        cache_key = SemanticCache.make_key(scope, messages)
+        cache_text = "\n".join(
+            msg['content'] for msg in messages
+            if msg['role'] in ('system', 'user') and isinstance(msg['content'], str)
+        )
+        return cache_key, cache_text, scope
+
+    def _completion_params(self, messages: List[Dict[str, str]], kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Chat-completions request parameters shared by all providers.
+
+        Starts from the defaults snapshotted at init; only API parameters that
+        were actually given (not None) are sent on top of them.
+        """
+        params = {**self._default_call_kwargs, 'messages': messages}
+        for key in _CALL_KWARGS.intersection(kwargs):
+            if kwargs[key] is not None:
+                params[key] = kwargs[key]
+        return params
+
+    @staticmethod
+    def _extract_function_calls(message: Any) -> Optional[List[Dict[str, Any]]]:
+        """Function calls requested by a completion message, or None.
+
+        Tool calls carry the ``id`` their results must reference; the legacy
+        ``function_call`` field has none.
+        """
+        tool_calls = getattr(message, 'tool_calls', None)
+        if tool_calls:
+            return [
+                {'id': call.id, 'name': call.function.name, 'arguments': call.function.arguments}
+                for call in tool_calls
+            ]
+        function_call = getattr(message, 'function_call', None)
+        if not function_call:
+            return None
+        return [{'name': function_call.name, 'arguments': function_call.arguments}]
+
+    @classmethod
+    def _to_llm_response(cls, response: Any) -> LLMResponse:
+        """Convert a chat-completions response into an LLMResponse."""
+        choice = response.choices[0]
+        message = choice.message
+        return LLMResponse(
+            content=message.content or "",
+            model=response.model,
+            usage=_LazyUsage(response.usage) if response.usage else {},
+            finish_reason=choice.finish_reason,
+            function_calls=cls._extract_function_calls(message)
+        )
+    
+    @staticmethod
+    def _json_to_llm_response(data: Dict[str, Any]) -> LLMResponse:
+        """Convert a decoded chat-completions JSON body into an LLMResponse."""
+        choice = data['choices'][0]
+        return LLMResponse(
+            content=choice['message'].get('content') or "",
+            model=data.get('model', ''),
+            usage=data.get('usage') or {},
+            finish_reason=choice.get('finish_reason'),
+            function_calls=None
+        )
+    
+    def _use_raw_transport(self, params: Dict[str, Any]) -> bool:
+        """Whether a request can skip the SDK's typed response (no tool calls)."""
+        return self._raw_json_transport and _TOOL_KWARGS.isdisjoint(params)
+    
+    def _generate(self, client: Any, provider: str, messages: List[Dict[str, str]], **kwargs) -> LLMResponse:
+        """Generate a response with a sync OpenAI-compatible client."""
+        try:
+            params = self._completion_params(messages, kwargs)
+            if self._use_raw_transport(params):
+                # Same retries, auth and Azure deployment routing as create()
+                raw = client.post('/chat/completions', body=params, cast_to=_httpx_response())
+                return self._json_to_llm_response(_json_loads(raw.content))
+            return self._to_llm_response(client.chat.completions.create(**params))
             
         except Exception as e:
-            self.logger.error(f"Azure OpenAI generation failed: {e}")
-            raise LLMError(f"Azure OpenAI generation failed: {e}")
+            self.logger.error("%s generation failed: %s", provider, e)
+            raise LLMError(f"{provider} generation failed: {e}")
+    
+    def _generate_azure_response(self, messages: List[Dict[str, str]], **kwargs) -> LLMResponse:
+        """Generate response using Azure OpenAI."""
+        return self._generate(self.azure_client, "Azure OpenAI", messages, **kwargs)
     
     def _generate_openai_response(self, messages: List[Dict[str, str]], **kwargs) -> LLMResponse:
         """Generate response using OpenAI."""
-        try:
-            response = self.openai_client.chat.completions.create(
-                model=self.model_name,
-                messages=messages,
-                temperature=kwargs.get('temperature', self.temperature),
-                max_tokens=kwargs.get('max_tokens', self.max_tokens),
-                functions=kwargs.get('functions'),
-                function_call=kwargs.get('function_call')
-            )
-            
-            choice = response.choices[0]
-            
-            # Handle function calls
-            function_calls = None
-            if choice.message.function_call:
-                function_calls = [{
-                    'name': choice.message.function_call.name,
-                    'arguments': choice.message.function_call.arguments
-                }]
-            
-            return LLMResponse(
-                content=choice.message.content or "",
-                model=response.model,
-                usage=response.usage.model_dump() if response.usage else {},
-                finish_reason=choice.finish_reason,
-                function_calls=function_calls
-            )
-            
-        except Exception as e:
-            self.logger.error(f"OpenAI generation failed: {e}")
-            raise LLMError(f"OpenAI generation failed: {e}")
+        return self._generate(self.openai_client, "OpenAI", messages, **kwargs)
     
-    def generate_streaming_response(self, messages: List[Dict[str, str]], **kwargs) -> AsyncGenerator[str, None]:
+    def generate_streaming_response(self, messages: List[Dict[str, str]], **kwargs) -> Generator[str, None, None]:
         """
         Generate streaming response from LLM.
         
@@ -268,13 +649,77 @@ class LLMClient:
             )
             
             for chunk in response:
-                if chunk.choices[0].delta.content:
-                    yield chunk.choices[0].delta.content
+                choices = chunk.choices
+                if choices:
+                    content = choices[0].delta.content
+                    if content:
+                        yield content
+                    
+        except Exception as e:
+            self.logger.error("Streaming response failed: %s", e)
+            raise LLMError(f"Streaming response failed: {e}")
+    
+    async def agenerate_streaming_response(self, messages: List[Dict[str, str]],
+                                           on_usage: Optional[Callable[[Dict[str, int]], None]] = None,
+                                           **kwargs) -> AsyncGenerator[str, None]:
+        """
+        Stream a response without blocking the event loop.
+        
+        Args:
+            messages: List of message dictionaries
+            on_usage: Optional callback receiving the token usage, which is then
+                requested in the same stream (``stream_options.include_usage``)
+            **kwargs: Additional parameters
+            
+        Yields:
+            Response chunks
+        """
+        try:
+            client = self._async_client()
+            if not client:
+                raise LLMError("No LLM client available")
+            
+            params = {
+                'model': self.model_name,
+                'messages': messages,
+                'temperature': kwargs.get('temperature', self.temperature),
+                'max_tokens': kwargs.get('max_tokens', self.max_tokens),
+                'stream': True
+            }
+            if on_usage is not None:
+                params['stream_options'] = {'include_usage': True}
+            response = await client.chat.completions.create(**params)
+            
+            async for chunk in response:
+                choices = chunk.choices
+                if choices:
+                    content = choices[0].delta.content
+                    if content:
+                        yield content
+                elif on_usage is not None and chunk.usage:
+                    # Final usage-only chunk
+                    on_usage(chunk.usage.model_dump())
                     
+        except LLMError:
+            raise
         except Exception as e:
-            self.logger.error(f"Streaming response failed: {e}")
+            self.logger.error("Async streaming response failed: %s", e)
             raise LLMError(f"Streaming response failed: {e}")
     
+    async def agenerate_sse_stream(self, messages: List[Dict[str, str]], **kwargs) -> AsyncGenerator[bytes, None]:
+        """
+        Stream a response as pre-encoded server-sent events.
+        
+        Args:
+            messages: List of message dictionaries
+            **kwargs: Parameters for agenerate_streaming_response
+            
+        Yields:
+            ``data: {"t": <chunk>}`` events as bytes, ready for an ASGI response
+        """
+        async for content in self.agenerate_streaming_response(messages, **kwargs):
+            yield b"data: " + _json_bytes({'t': content}) + b"\n\n"
+    
     def generate_with_langchain(self, messages: List[Dict[str, str]], **kwargs) -> str:
         """
         Generate response using Langchain.
@@ -286,39 +731,54 @@ class LLMClient:
         Returns:
             Generated response text
         """
-        if not LANGCHAIN_AVAILABLE or not self.langchain_client:
+        langchain_client = self._get_langchain_client()
+        if not langchain_client:
             raise LLMError("Langchain not available")
         
         try:
-            # Convert messages to Langchain format
-            lc_messages = []
-            for msg in messages:
-                if msg['role'] == 'system':
-                    lc_messages.append(SystemMessage(content=msg['content']))
-                elif msg['role'] == 'user':
-                    lc_messages.append(HumanMessage(content=msg['content']))
-                elif msg['role'] == 'assistant':
-                    lc_messages.append(AIMessage(content=msg['content']))
+            # Convert messages to Langchain format; other roles are skipped
+            roles = _langchain_roles()
+            lc_messages = [
+                roles[msg['role']](content=msg['content'])
+                for msg in messages if msg['role'] in roles
+            ]
             
-            response = self.langchain_client.invoke(lc_messages)
+            response = langchain_client.invoke(lc_messages)
             return response.content
             
         except Exception as e:
-            self.logger.error(f"Langchain generation failed: {e}")
+            self.logger.error("Langchain generation failed: %s", e)
             raise LLMError(f"Langchain generation failed: {e}")
     
-    def count_tokens(self, text: str) -> int:
+    async def agenerate_with_langchain(self, messages: List[Dict[str, str]], **kwargs) -> str:
+        """generate_with_langchain in a worker thread, keeping the event loop free."""
+        return await asyncio.to_thread(self.generate_with_langchain, messages, **kwargs)
+    
+    def count_tokens(self, text: Union[str, List[str]]) -> Union[int, List[int]]:
         """
-        Estimate token count for text.
+        Count tokens with the model's tiktoken encoding.
         
         Args:
-            text: Input text
+            text: Input text, or a list of texts to count in one batch
             
         Returns:
-            Estimated token count
+            Token count (one per text for lists); a ~4 characters per token
+            estimate when the encoding is unavailable (tiktoken missing or its
+            BPE file not downloadable)
         """
-        # Simple estimation: ~4 characters per token
-        return len(text) // 4
+        encoder = token_encoding(getattr(self, 'model_name', None))
+        if encoder is None:
+            # Simple estimation: ~4 characters per token
+            if isinstance(text, list):
+                return [len(t) // 4 for t in text]
+            return len(text) // 4
+        if isinstance(text, list):
+            # Encoded in parallel by tiktoken's native threads
+            encoded = encoder.encode_batch(text, num_threads=os.cpu_count() or 1, disallowed_special=())
+            return [len(tokens) for tokens in encoded]
+        if len(text) <= _TOKEN_CACHE_MAX_CHARS:
+            return _cached_token_count(encoder.name, text)
+        return len(encoder.encode(text, disallowed_special=()))
     
     def validate_messages(self, messages: List[Dict[str, str]]) -> bool:
         """
@@ -330,18 +790,10 @@ class LLMClient:
         Returns:
             True if valid
         """
-        if not messages:
-            return False
-        
-        for msg in messages:
-            if not isinstance(msg, dict):
-                return False
-            if 'role' not in msg or 'content' not in msg:
-                return False
-            if msg['role'] not in ['system', 'user', 'assistant']:
-                return False
-        
-        return True
+        return bool(messages) and all(
+            isinstance(msg, dict) and 'content' in msg and msg.get('role') in _VALID_ROLES
+            for msg in messages
+        )
     
     def _enhance_with_memory(self, messages: List[Dict[str, str]], **kwargs) -> List[Dict[str, str]]:
         """
@@ -356,14 +808,10 @@ class LLMClient:
         """
         try:
             # Get user query from messages
-            user_query = ""
-            for msg in reversed(messages):
-                if msg['role'] == 'user':
-                    user_query = msg['content']
-                    break
-
-            if not user_query:
+            user_idx = _last_user_index(messages)
+            if user_idx is None or not messages[user_idx]['content']:
                 return messages
+            user_query = messages[user_idx]['content']
 
             # Get relevant context from memory
             max_context = kwargs.get('max_memory_context', 3)
@@ -373,12 +821,17 @@ class LLMClient:
             # Build context string
             context_parts = []
 
-            # Add conversation history
+            # Snippets are cut to token budgets with the model's encoding
+            encoder = token_encoding(getattr(self, 'model_name', None))
+            encoding_name = encoder.name if encoder is not None else None
+
+            # Add conversation history (last 2 turns), rendered once per set of turns
             if conversation_context:
                 context_parts.append("Recent conversation:")
-                for turn in conversation_context[-2:]:  # Last 2 turns
-                    context_parts.append(f"User: {turn.user_input}")
-                    context_parts.append(f"Assistant: {turn.assistant_response[:200]}...")
+                context_parts.extend(_render_turns(tuple(
+                    (turn.turn_id, turn.user_input, turn.assistant_response)
+                    for turn in conversation_context[-2:]
+                ), encoding_name))
 
             # Add relevant memories
             if relevant_memories:
@@ -387,37 +840,26 @@ class LLMClient:
                     if memory.memory_type == 'fact':
                         context_parts.append(f"- {memory.content}")
                     elif memory.memory_type == 'conversation':
-                        context_parts.append(f"- Previous discussion: {memory.content[:150]}...")
+                        snippet = _truncate_tokens(memory.content, _MEMORY_TOKENS, _MEMORY_CHARS, encoding_name)
+                        context_parts.append(f"- Previous discussion: {snippet}...")
 
-            # Enhance system message with context
+            # Add context as its own message right before the user turn; existing
+            # system messages stay untouched so the prompt prefix is stable
             if context_parts:
                 context_text = "\n".join(context_parts)
-                enhanced_messages = messages.copy()
-
-                # Find system message or create one
-                system_msg_idx = None
-                for i, msg in enumerate(enhanced_messages):
-                    if msg['role'] == 'system':
-                        system_msg_idx = i
-                        break
-
-                if system_msg_idx is not None:
-                    # Enhance existing system message
-                    enhanced_messages[system_msg_idx]['content'] += f"\n\nContext from previous interactions:\n{context_text}"
-                else:
-                    # Add new system message
-                    system_msg = {
-                        'role': 'system',
-                        'content': f"You are a helpful AI assistant. Use the following context from previous interactions when relevant:\n\n{context_text}"
-                    }
-                    enhanced_messages.insert(0, system_msg)
-
+                enhanced_messages = list(messages)
+                enhanced_messages.insert(user_idx, {
+                    'role': 'system',
+                    'content': f"Context from previous interactions:\n{context_text}"
+                })
+                if not any(msg['role'] == 'system' for msg in messages):
+                    enhanced_messages.insert(0, {'role': 'system', 'content': _STATIC_SYSTEM_PROMPT})
                 return enhanced_messages
 
             return messages
 
         except Exception as e:
-            self.logger.warning(f"Failed to enhance messages with memory: {e}")
+            self.logger.warning("Failed to enhance messages with memory: %s", e)
             return messages
 
     def _calculate_confidence_score(self, response: LLMResponse) -> float:
@@ -438,10 +880,11 @@ class LLMClient:
         elif response.finish_reason == 'length':
             base_score -= 0.1
 
-        # Adjust based on response length
+        # Adjust based on response length; counting stops past the 500-word
+        # band, so long responses are not split in full
         if response.content:
-            word_count = len(response.content.split())
-            if 20 <= word_count <= 500:
+            word_count = len(response.content.split(None, _CONFIDENCE_MAX_WORDS + 1))
+            if 20 <= word_count <= _CONFIDENCE_MAX_WORDS:
                 base_score += 0.1
             elif word_count < 10:
                 base_score -= 0.2
@@ -475,7 +918,7 @@ class LLMClient:
             'max_tokens': self.max_tokens,
             'azure_available': bool(self.azure_client),
             'openai_available': bool(self.openai_client),
-            'langchain_available': bool(self.langchain_client),
+            'langchain_available': LANGCHAIN_AVAILABLE and bool(self.azure_client or self.openai_client),
             'memory_enabled': True,
             'memory_stats': self.get_memory_stats()
         }
@@ -489,6 +932,10 @@ class LLMClient:
         """Get function definitions in OpenAI format for LLM."""
         return self.function_caller.get_function_definitions()
     
+    def get_tool_definitions(self) -> List[Dict[str, Any]]:
+        """Get function definitions in OpenAI tools format for LLM."""
+        return self.function_caller.get_tool_definitions()
+    
     def register_function(self, name: str, description: str, parameters: Dict[str, Any], 
                          function: callable) -> None:
         """Register a new function for calling."""
@@ -516,17 +963,18 @@ class LLMClient:
             LLMResponse with potential function calls
         """
         try:
-            self.logger.info(f"Generating response with functions: {use_functions}")
-            self.logger.info(f"Messages count: {len(messages)}")
+            self.logger.info("Generating response with functions: %s", use_functions)
+            self.logger.info("Messages count: %d", len(messages))
             
             if use_functions:
-                # Add function definitions to the request
-                functions = self.get_function_definitions()
-                self.logger.info(f"Available functions: {len(functions)}")
+                # Add tool definitions to the request; the tools API lets the
+                # model request several calls in one response
+                tools = self.get_tool_definitions()
+                self.logger.info("Available functions: %d", len(tools))
                 
-                if functions:
-                    kwargs['functions'] = functions
-                    kwargs['function_call'] = 'auto'  # Let the model decide when to call functions
+                if tools:
+                    kwargs['tools'] = tools
+                    kwargs['tool_choice'] = 'auto'  # Let the model decide when to call functions
                     self.logger.info("Function definitions added to request")
                 else:
                     self.logger.warning("No function definitions available")
@@ -534,26 +982,33 @@ class LLMClient:
             # Generate response
             self.logger.info("Calling generate_response...")
             response = self.generate_response(messages, **kwargs)
-            self.logger.info(f"Response received: {response.content[:100]}...")
+            self.logger.info("Response received: %.100s...", response.content)
             
             # If response contains function calls, process them
             if response.function_calls:
-                self.logger.info(f"Processing {len(response.function_calls)} function calls")
+                self.logger.info("Processing %d function calls", len(response.function_calls))
                 function_results = self.process_function_calls(response.function_calls)
                 
                 # Add function results to messages for follow-up
-                function_message = self.function_caller.create_function_call_message(function_results)
-                messages.append(function_message)
+                if all('id' in call for call in response.function_calls):
+                    messages.extend(self.function_caller.create_tool_messages(response.function_calls, function_results))
+                else:
+                    messages.append(self.function_caller.create_function_call_message(function_results))
                 
                 # Generate final response with function results
                 self.logger.info("Generating final response with function results...")
                 final_response = self.generate_response(messages, **kwargs)
-                self.logger.info(f"Final response: {final_response.content[:100]}...")
+                self.logger.info("Final response: %.100s...", final_response.content)
                 return final_response
             
             self.logger.info("No function calls detected, returning original response")
             return response
             
         except Exception as e:
-            self.logger.error(f"Error in generate_response_with_functions: {e}")
+            self.logger.error("Error in generate_response_with_functions: %s", e)
             raise
+
+    async def agenerate_response_with_functions(self, messages: List[Dict[str, str]],
+                                                use_functions: bool = True, **kwargs) -> LLMResponse:
+        """generate_response_with_functions in a worker thread, keeping the event loop free."""
+        return await asyncio.to_thread(self.generate_response_with_functions, messages, use_functions, **kwargs)
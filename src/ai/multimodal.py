@@ -2,17 +2,20 @@
 Multi-modal AI features for Thunderbolts.
 Handles text-to-speech, speech-to-text, and image generation.
 """
-import base64
+import re
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property, lru_cache
+from importlib.util import find_spec
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Union
+from types import MappingProxyType
+from typing import List, Dict, Any, Iterator, Mapping, Optional, Tuple, Union
 from dataclasses import dataclass
 import io
 
-try:
-    import openai
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
+# The SDK is imported when the first client is built
+OPENAI_AVAILABLE = find_spec("openai") is not None
 
 try:
     from PIL import Image
@@ -26,19 +29,214 @@ try:
 except ImportError:
     REQUESTS_AVAILABLE = False
 
+try:
+    # SIMD base64 codec for image payloads
+    from pybase64 import b64decode, b64encode_as_string
+except ImportError:
+    import base64
+
+    def b64decode(data: Union[str, bytes], validate: bool = False) -> bytes:
+        return base64.b64decode(data, validate=validate)
+
+    def b64encode_as_string(data: bytes) -> str:
+        return base64.b64encode(data).decode('ascii')
+
 from config.settings import settings
 from src.utils.logger import logger
 from src.utils.exceptions import LLMError
+from src.utils.cache import image_analysis_cache, tts_cache
+
+
+# Parallel audio summaries: sentence-aligned chunks of about this many
+# characters, synthesized a few at a time (API rate limits)
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+_TTS_CHUNK_CHARS = 1000
+_TTS_CONCURRENCY = 4
+# Formats whose files can be joined by concatenating bytes (framed streams)
+_CONCATENABLE_FORMATS = frozenset({'mp3', 'aac'})
+
+
+_VISION_MODEL = "gpt-4-vision-preview"
+
+_HTTP_CLIENT = None
+_HTTP_CLIENT_LOCK = threading.Lock()
+
+
+def _shared_http_client() -> Any:
+    """Process-wide keep-alive httpx client shared by the multi-modal SDK clients.
+
+    TTS, image and vision requests reuse pooled TCP/TLS connections, over
+    HTTP/2 when ``h2`` is installed.
+    """
+    global _HTTP_CLIENT
+    with _HTTP_CLIENT_LOCK:
+        if _HTTP_CLIENT is None:
+            import atexit
+            import httpx
+
+            try:
+                import h2  # noqa: F401
+                http2 = True
+            except ImportError:
+                http2 = False
+            limits = httpx.Limits(max_keepalive_connections=32, max_connections=64)
+            _HTTP_CLIENT = httpx.Client(limits=limits, timeout=60.0, http2=http2)
+            atexit.register(_HTTP_CLIENT.close)
+        return _HTTP_CLIENT
+
+
+# OpenAI TTS voices and DALL-E image sizes
+_VOICES = ('alloy', 'echo', 'fable', 'onyx', 'nova', 'shimmer')
+_IMAGE_SIZES = ('256x256', '512x512', '1024x1024', '1792x1024', '1024x1792')
+
+
+@lru_cache(maxsize=4)
+def _capabilities(openai_available: bool, azure_available: bool) -> Mapping[str, Any]:
+    """Read-only capability report for one combination of configured clients."""
+    return MappingProxyType({
+        'text_to_speech': MappingProxyType({
+            'available': openai_available,
+            'voices': _VOICES,
+            'formats': ('mp3', 'opus', 'aac', 'flac')
+        }),
+        'image_generation': MappingProxyType({
+            'available': openai_available,
+            'models': ('dall-e-2', 'dall-e-3'),
+            'sizes': _IMAGE_SIZES
+        }),
+        'image_analysis': MappingProxyType({
+            'available': openai_available,
+            'models': (_VISION_MODEL,)
+        }),
+        'clients': MappingProxyType({
+            'azure_available': azure_available,
+            'openai_available': openai_available
+        })
+    })
+
+# Vision inputs are downscaled to this longest side (the model resizes
+# larger images anyway) and re-encoded as JPEG before upload
+_VISION_MAX_SIDE = 2048
+_VISION_JPEG_QUALITY = 85
+
+
+def _prepare_vision_image(image_data: bytes) -> Tuple[bytes, str]:
+    """Image bytes to upload and their MIME type; oversized images are shrunk to JPEG."""
+    with Image.open(io.BytesIO(image_data)) as img:
+        if max(img.size) <= _VISION_MAX_SIDE:
+            return image_data, Image.MIME.get(img.format, 'image/jpeg')
+        
+        img.thumbnail((_VISION_MAX_SIDE, _VISION_MAX_SIDE), Image.LANCZOS)
+        buffer = io.BytesIO()
+        img.convert('RGB').save(buffer, 'JPEG', quality=_VISION_JPEG_QUALITY, optimize=True)
+        return buffer.getvalue(), 'image/jpeg'
+
+
+# Abbreviations spoken in full, and pauses added after punctuation
+_SPEECH_ABBREVIATIONS = {
+    'e.g.': 'for example',
+    'i.e.': 'that is',
+    'etc.': 'and so on',
+    'vs.': 'versus',
+    'Mr.': 'Mister',
+    'Mrs.': 'Missus',
+    'Dr.': 'Doctor'
+}
+_SPEECH_PAUSES = {'. ': '. ... ', ':': ': ... ', ';': '; ... '}
+_SPEECH_PATTERN = re.compile(
+    '(' + '|'.join(map(re.escape, _SPEECH_ABBREVIATIONS)) + r')( ?)|\. |[:;]'
+)
+
+
+def _speech_replacement(match: "re.Match[str]") -> str:
+    abbreviation = match.group(1)
+    if abbreviation:
+        # An abbreviation ending a clause still gets its pause
+        return _SPEECH_ABBREVIATIONS[abbreviation] + (' ... ' if match.group(2) else '')
+    return _SPEECH_PAUSES[match.group(0)]
+
+
+def _split_for_speech(text: str, max_chars: int = _TTS_CHUNK_CHARS) -> List[str]:
+    """Split text into chunks of whole sentences of at most ~max_chars."""
+    chunks: List[str] = []
+    current: List[str] = []
+    length = 0
+    for sentence in _SENTENCE_END.split(text):
+        if current and length + len(sentence) > max_chars:
+            chunks.append(" ".join(current))
+            current, length = [], 0
+        current.append(sentence)
+        length += len(sentence) + 1
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
 
 
 @dataclass
 class TTSResult:
-    """Result of text-to-speech conversion."""
-    audio_data: bytes
+    """Result of text-to-speech conversion.
+    
+    File-backed results (``text_to_speech(..., file_backed=True)``) have
+    ``audio_data`` None and the audio in the TTS cache file ``source_path``.
+    Use ``read()`` or ``iter_chunks()`` for either kind.
+    """
+    audio_data: Optional[bytes]
     format: str
     duration: Optional[float]
     voice: str
     model: str
+    source_path: Optional[Path] = None
+    
+    def read(self) -> bytes:
+        """The complete audio."""
+        if self.audio_data is not None:
+            return self.audio_data
+        return self.source_path.read_bytes()
+    
+    def iter_chunks(self, chunk_size: int = 65536) -> Iterator[bytes]:
+        """The audio in chunks, without loading a file-backed result."""
+        if self.audio_data is not None:
+            yield self.audio_data
+            return
+        with open(self.source_path, 'rb') as f:
+            while chunk := f.read(chunk_size):
+                yield chunk
+
+
+@dataclass
+class TTSBatchResult:
+    """Results of several TTS conversions, one list per field.
+    
+    Entry ``i`` of every list belongs to the ``i``-th input text. File-backed
+    entries have ``audio_data[i]`` None and their audio in ``source_paths[i]``.
+    """
+    audio_data: List[Optional[bytes]]
+    source_paths: List[Optional[Path]]
+    formats: List[str]
+    voices: List[str]
+    models: List[str]
+    durations: List[Optional[float]]
+    
+    @classmethod
+    def from_results(cls, results: List[TTSResult]) -> 'TTSBatchResult':
+        return cls(
+            audio_data=[r.audio_data for r in results],
+            source_paths=[r.source_path for r in results],
+            formats=[r.format for r in results],
+            voices=[r.voice for r in results],
+            models=[r.model for r in results],
+            durations=[r.duration for r in results]
+        )
+    
+    def __len__(self) -> int:
+        return len(self.formats)
+    
+    def concatenated_audio(self) -> bytes:
+        """All audio in order, joined in a single allocation."""
+        return b"".join(
+            data if data is not None else path.read_bytes()
+            for data, path in zip(self.audio_data, self.source_paths)
+        )
 
 
 @dataclass
@@ -53,7 +251,11 @@ class ImageGenerationResult:
 
 
 class MultiModalAI:
-    """Multi-modal AI capabilities for Thunderbolts."""
+    """Multi-modal AI capabilities for Thunderbolts.
+    
+    The SDK clients are built on first use. ``MultiModalAI.instance()``
+    returns a process-wide default instance.
+    """
     
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         """
@@ -69,11 +271,12 @@ class MultiModalAI:
         self.settings = settings
         self.logger = logger
         
-        # Initialize OpenAI clients
-        self.azure_client = None
-        self.openai_client = None
+        # Per-key locks collapsing identical concurrent image analyses
+        self._analysis_locks: Dict[str, threading.Lock] = {}
+        self._analysis_locks_guard = threading.Lock()
         
-        self._initialize_clients()
+        if not (settings.azure_openai_api_key and settings.azure_openai_endpoint) and not settings.openai_api_key:
+            self.logger.warning("No OpenAI API credentials configured for multi-modal features")
         
         # Default parameters
         self.default_tts_voice = self.config.get('tts_voice', 'alloy')
@@ -81,37 +284,56 @@ class MultiModalAI:
         self.default_image_size = self.config.get('image_size', '1024x1024')
         self.default_image_model = self.config.get('image_model', 'dall-e-3')
     
-    def _initialize_clients(self) -> None:
-        """Initialize OpenAI clients for multi-modal features."""
+    @classmethod
+    @lru_cache(maxsize=1)
+    def instance(cls) -> 'MultiModalAI':
+        """Shared instance with the default configuration."""
+        return cls()
+    
+    @cached_property
+    def azure_client(self) -> Optional[Any]:
+        """Azure OpenAI client, built on first access; None if unconfigured."""
+        if not (settings.azure_openai_api_key and settings.azure_openai_endpoint):
+            return None
         try:
-            # Azure OpenAI client
-            if (settings.azure_openai_api_key and settings.azure_openai_endpoint):
-                from openai import AzureOpenAI
-                self.azure_client = AzureOpenAI(
-                    api_key=settings.azure_openai_api_key,
-                    api_version=settings.azure_openai_api_version,
-                    azure_endpoint=settings.azure_openai_endpoint
-                )
-                self.logger.info("Azure OpenAI client initialized for multi-modal")
-            
-            # OpenAI client
-            if settings.openai_api_key:
-                from openai import OpenAI
-                self.openai_client = OpenAI(api_key=settings.openai_api_key)
-                self.logger.info("OpenAI client initialized for multi-modal")
-            
-            if not self.azure_client and not self.openai_client:
-                self.logger.warning("No OpenAI API credentials configured for multi-modal features")
-
+            from openai import AzureOpenAI
+            client = AzureOpenAI(
+                api_key=settings.azure_openai_api_key,
+                api_version=settings.azure_openai_api_version,
+                azure_endpoint=settings.azure_openai_endpoint,
+                http_client=_shared_http_client()
+            )
+            self.logger.info("Azure OpenAI client initialized for multi-modal")
+            return client
         except Exception as e:
-            self.logger.error(f"Failed to initialize multi-modal clients: {e}")
             # Don't raise exception, just log the error
-            pass
+            self.logger.error(f"Failed to initialize Azure multi-modal client: {e}")
+            return None
+    
+    @cached_property
+    def openai_client(self) -> Optional[Any]:
+        """OpenAI client, built on first access; None if unconfigured."""
+        if not settings.openai_api_key:
+            return None
+        try:
+            from openai import OpenAI
+            client = OpenAI(api_key=settings.openai_api_key,
+                            http_client=_shared_http_client())
+            self.logger.info("OpenAI client initialized for multi-modal")
+            return client
+        except Exception as e:
+            # Don't raise exception, just log the error
+            self.logger.error(f"Failed to initialize OpenAI multi-modal client: {e}")
+            return None
     
     def text_to_speech(self, text: str, **kwargs) -> TTSResult:
         """
         Convert text to speech.
         
+        With ``file_backed=True`` (and caching enabled) the audio is streamed
+        straight into the TTS cache and not loaded; the result's
+        ``audio_data`` is then None.
+        
         Args:
             text: Text to convert to speech
             **kwargs: Additional TTS parameters
@@ -128,37 +350,113 @@ class MultiModalAI:
         try:
             self.logger.info(f"Converting text to speech: {len(text)} characters")
             
-            # Use OpenAI client (Azure doesn't support TTS yet)
-            client = self.openai_client
-            if not client:
-                raise LLMError("OpenAI client required for TTS")
-            
             voice = kwargs.get('voice', self.default_tts_voice)
             model = kwargs.get('model', self.default_tts_model)
-            
-            # Generate speech
-            response = client.audio.speech.create(
-                model=model,
-                voice=voice,
-                input=text,
-                response_format=kwargs.get('format', 'mp3')
-            )
-            
-            # Get audio data
-            audio_data = response.content
+            audio_format = kwargs.get('format', 'mp3')
+            use_cache = kwargs.get('use_cache', True)
+            file_backed = use_cache and kwargs.get('file_backed', False)
+
+            audio_data = None
+            source_path = None
+            if file_backed:
+                cache_key = tts_cache.make_key(text, voice, model, audio_format)
+                source_path = tts_cache.get(cache_key)
+                if source_path is None:
+                    # Streamed to the cache file without buffering in memory
+                    for _ in self._stream_speech(text, voice, model, audio_format, use_cache):
+                        pass
+                    source_path = tts_cache.path(cache_key)
+            else:
+                audio_data = b"".join(self._stream_speech(text, voice, model, audio_format, use_cache))
             
             return TTSResult(
                 audio_data=audio_data,
-                format=kwargs.get('format', 'mp3'),
+                format=audio_format,
                 duration=None,  # OpenAI doesn't provide duration
                 voice=voice,
-                model=model
+                model=model,
+                source_path=source_path
             )
             
         except Exception as e:
             self.logger.error(f"TTS conversion failed: {e}")
             raise LLMError(f"TTS conversion failed: {e}")
     
+    def stream_speech(self, text: str, chunk_size: int = 4096, **kwargs) -> Iterator[bytes]:
+        """
+        Convert text to speech, yielding audio chunks as they arrive.
+        
+        Playback can start before synthesis finishes; the full audio is
+        cached once the stream has been consumed.
+        
+        Args:
+            text: Text to convert to speech
+            chunk_size: Size of yielded chunks in bytes
+            **kwargs: Additional TTS parameters (as for text_to_speech)
+            
+        Yields:
+            Audio bytes
+            
+        Raises:
+            LLMError: If TTS conversion fails
+        """
+        if not text or not text.strip():
+            raise LLMError("Empty text provided for TTS")
+        
+        try:
+            yield from self._stream_speech(
+                text,
+                kwargs.get('voice', self.default_tts_voice),
+                kwargs.get('model', self.default_tts_model),
+                kwargs.get('format', 'mp3'),
+                kwargs.get('use_cache', True),
+                chunk_size
+            )
+        except LLMError:
+            raise
+        except Exception as e:
+            self.logger.error(f"TTS streaming failed: {e}")
+            raise LLMError(f"TTS streaming failed: {e}")
+    
+    def _stream_speech(self, text: str, voice: str, model: str, audio_format: str,
+                       use_cache: bool, chunk_size: int = 65536) -> Iterator[bytes]:
+        """Audio chunks from the TTS cache or the streaming API, filling the cache."""
+        cache_key = tts_cache.make_key(text, voice, model, audio_format)
+        
+        # Identical requests are served from the on-disk TTS cache
+        cached_path = tts_cache.get(cache_key) if use_cache else None
+        if cached_path is not None:
+            yield from TTSResult(None, audio_format, None, voice, model, cached_path).iter_chunks(chunk_size)
+            return
+        
+        # Use OpenAI client (Azure doesn't support TTS yet)
+        client = self.openai_client
+        if not client:
+            raise LLMError("OpenAI client required for TTS")
+        
+        tmp_path = tts_cache.temp_path(cache_key) if use_cache else None
+        completed = False
+        try:
+            with client.audio.speech.with_streaming_response.create(
+                model=model,
+                voice=voice,
+                input=text,
+                response_format=audio_format
+            ) as response:
+                if tmp_path is None:
+                    yield from response.iter_bytes(chunk_size)
+                else:
+                    with open(tmp_path, 'wb') as f:
+                        for chunk in response.iter_bytes(chunk_size):
+                            f.write(chunk)
+                            yield chunk
+                    tts_cache.commit(cache_key, tmp_path)
+            completed = True
+        finally:
+            # Drop partial audio when the request failed or the caller stopped early
+            if tmp_path is not None and not completed:
+                tmp_path.unlink(missing_ok=True)
+    
     def save_tts_audio(self, tts_result: TTSResult, output_path: Union[str, Path]) -> Path:
         """
         Save TTS audio to file.
@@ -173,8 +471,12 @@ class MultiModalAI:
         try:
             output_path = Path(output_path)
             
-            with open(output_path, 'wb') as f:
-                f.write(tts_result.audio_data)
+            if tts_result.source_path is not None:
+                # Copied in the kernel (sendfile) rather than hard-linked, so
+                # the saved file stays independent of the cache entry
+                shutil.copyfile(tts_result.source_path, output_path)
+            else:
+                output_path.write_bytes(tts_result.audio_data)
             
             self.logger.info(f"TTS audio saved to: {output_path}")
             return output_path
@@ -223,7 +525,7 @@ class MultiModalAI:
             )
             
             # Get image data
-            image_data = base64.b64decode(response.data[0].b64_json)
+            image_data = b64decode(response.data[0].b64_json, validate=False)
             revised_prompt = getattr(response.data[0], 'revised_prompt', None)
             
             return ImageGenerationResult(
@@ -254,8 +556,7 @@ class MultiModalAI:
         try:
             output_path = Path(output_path)
             
-            with open(output_path, 'wb') as f:
-                f.write(image_result.image_data)
+            output_path.write_bytes(image_result.image_data)
             
             self.logger.info(f"Generated image saved to: {output_path}")
             return output_path
@@ -268,6 +569,9 @@ class MultiModalAI:
         """
         Analyze image using vision model.
         
+        Results are cached by image content and prompt; identical concurrent
+        requests share one API call.
+        
         Args:
             image_path: Path to image file
             prompt: Analysis prompt
@@ -297,35 +601,59 @@ class MultiModalAI:
             with open(image_path, 'rb') as f:
                 image_data = f.read()
             
-            # Encode to base64
-            image_b64 = base64.b64encode(image_data).decode('utf-8')
-            
-            # Analyze image
-            response = client.chat.completions.create(
-                model="gpt-4-vision-preview",
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "text", "text": prompt},
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:image/jpeg;base64,{image_b64}"
-                                }
-                            }
-                        ]
-                    }
-                ],
-                max_tokens=500
-            )
-            
-            return response.choices[0].message.content
+            cache_key = image_analysis_cache.make_key(image_data, prompt, _VISION_MODEL)
+            cached = image_analysis_cache.get_analysis(cache_key)
+            if cached is not None:
+                return cached
+            
+            with self._analysis_locks_guard:
+                lock = self._analysis_locks.setdefault(cache_key, threading.Lock())
+            try:
+                with lock:
+                    # A concurrent identical request may have finished meanwhile
+                    cached = image_analysis_cache.get_analysis(cache_key)
+                    if cached is not None:
+                        return cached
+                    analysis = self._request_image_analysis(client, image_data, prompt)
+                    if analysis is not None:
+                        image_analysis_cache.set_analysis(cache_key, analysis)
+                    return analysis
+            finally:
+                with self._analysis_locks_guard:
+                    self._analysis_locks.pop(cache_key, None)
             
         except Exception as e:
             self.logger.error(f"Image analysis failed: {e}")
             raise LLMError(f"Image analysis failed: {e}")
     
+    def _request_image_analysis(self, client: Any, image_data: bytes, prompt: str) -> Optional[str]:
+        """Send one image to the vision model and return its answer."""
+        # Shrink oversized images, then encode to base64
+        image_data, mime_type = _prepare_vision_image(image_data)
+        image_b64 = b64encode_as_string(image_data)
+        
+        # Analyze image
+        response = client.chat.completions.create(
+            model=_VISION_MODEL,
+            messages=[
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "text", "text": prompt},
+                        {
+                            "type": "image_url",
+                            "image_url": {
+                                "url": f"data:{mime_type};base64,{image_b64}"
+                            }
+                        }
+                    ]
+                }
+            ],
+            max_tokens=500
+        )
+        
+        return response.choices[0].message.content
+    
     def create_summary_visualization(self, summary: str, **kwargs) -> ImageGenerationResult:
         """
         Create a visual representation of a summary.
@@ -355,6 +683,9 @@ Style: Modern, minimalist infographic with clear sections, icons, and readable t
         """
         Create audio version of summary.
         
+        With ``parallel=True`` long MP3/AAC summaries are split at sentence
+        boundaries, synthesized concurrently and joined into one file.
+        
         Args:
             summary: Summary text to convert
             **kwargs: Additional TTS parameters
@@ -366,12 +697,43 @@ Style: Modern, minimalist infographic with clear sections, icons, and readable t
             # Optimize text for speech
             speech_text = self._optimize_text_for_speech(summary)
             
+            if kwargs.pop('parallel', False) and kwargs.get('format', 'mp3') in _CONCATENABLE_FORMATS:
+                chunks = _split_for_speech(speech_text)
+                if len(chunks) > 1:
+                    return self._text_to_speech_parallel(chunks, **kwargs)
+            
             return self.text_to_speech(speech_text, **kwargs)
             
         except Exception as e:
             self.logger.error(f"Audio summary creation failed: {e}")
             raise LLMError(f"Audio summary creation failed: {e}")
     
+    def text_to_speech_batch(self, texts: List[str], **kwargs) -> TTSBatchResult:
+        """
+        Convert several texts to speech concurrently.
+        
+        Args:
+            texts: Texts to convert, each synthesized (and cached) separately
+            **kwargs: TTS parameters shared by all texts
+            
+        Returns:
+            TTSBatchResult in the order of ``texts``
+        """
+        with ThreadPoolExecutor(max_workers=max(1, min(_TTS_CONCURRENCY, len(texts)))) as executor:
+            results = list(executor.map(lambda text: self.text_to_speech(text, **kwargs), texts))
+        return TTSBatchResult.from_results(results)
+    
+    def _text_to_speech_parallel(self, chunks: List[str], **kwargs) -> TTSResult:
+        """Synthesize chunks concurrently and concatenate the audio in order."""
+        batch = self.text_to_speech_batch(chunks, **kwargs)
+        return TTSResult(
+            audio_data=batch.concatenated_audio(),
+            format=batch.formats[0],
+            duration=None,
+            voice=batch.voices[0],
+            model=batch.models[0]
+        )
+    
     def _optimize_text_for_speech(self, text: str) -> str:
         """
         Optimize text for better speech synthesis.
@@ -382,70 +744,32 @@ Style: Modern, minimalist infographic with clear sections, icons, and readable t
         Returns:
             Optimized text for speech
         """
-        # Add pauses for better speech flow
-        optimized = text.replace('. ', '. ... ')
-        optimized = optimized.replace(':', ': ... ')
-        optimized = optimized.replace(';', '; ... ')
-        
-        # Replace abbreviations with full words
-        replacements = {
-            'e.g.': 'for example',
-            'i.e.': 'that is',
-            'etc.': 'and so on',
-            'vs.': 'versus',
-            'Mr.': 'Mister',
-            'Mrs.': 'Missus',
-            'Dr.': 'Doctor'
-        }
-        
-        for abbrev, full in replacements.items():
-            optimized = optimized.replace(abbrev, full)
-        
-        return optimized
+        # Add pauses and replace abbreviations with full words in one pass
+        return _SPEECH_PATTERN.sub(_speech_replacement, text)
     
-    def get_available_voices(self) -> List[str]:
+    def get_available_voices(self) -> Tuple[str, ...]:
         """
-        Get list of available TTS voices.
+        Get available TTS voices.
         
         Returns:
-            List of voice names
+            Tuple of voice names
         """
-        # OpenAI TTS voices
-        return ['alloy', 'echo', 'fable', 'onyx', 'nova', 'shimmer']
+        return _VOICES
     
-    def get_supported_image_sizes(self) -> List[str]:
+    def get_supported_image_sizes(self) -> Tuple[str, ...]:
         """
-        Get list of supported image sizes.
+        Get supported image sizes.
         
         Returns:
-            List of size strings
+            Tuple of size strings
         """
-        return ['256x256', '512x512', '1024x1024', '1792x1024', '1024x1792']
+        return _IMAGE_SIZES
     
-    def get_multimodal_capabilities(self) -> Dict[str, Any]:
+    def get_multimodal_capabilities(self) -> Mapping[str, Any]:
         """
         Get information about available multi-modal capabilities.
         
         Returns:
-            Dictionary with capability information
+            Read-only mapping with capability information
         """
-        return {
-            'text_to_speech': {
-                'available': bool(self.openai_client),
-                'voices': self.get_available_voices(),
-                'formats': ['mp3', 'opus', 'aac', 'flac']
-            },
-            'image_generation': {
-                'available': bool(self.openai_client),
-                'models': ['dall-e-2', 'dall-e-3'],
-                'sizes': self.get_supported_image_sizes()
-            },
-            'image_analysis': {
-                'available': bool(self.openai_client),
-                'models': ['gpt-4-vision-preview']
-            },
-            'clients': {
-                'azure_available': bool(self.azure_client),
-                'openai_available': bool(self.openai_client)
-            }
-        }
+        return _capabilities(bool(self.openai_client), bool(self.azure_client))
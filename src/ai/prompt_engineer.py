@@ -2,57 +2,94 @@
 Prompt engineering module for Thunderbolts.
 Handles advanced prompt construction with role prompts, few-shot examples, and chain-of-thought.
 """
-from typing import List, Dict, Any, Optional, Tuple
-from dataclasses import dataclass
-from enum import Enum
+from itertools import chain
+from string import Formatter
+from typing import List, Dict, Any, Iterable, Iterator, Mapping, Optional, Tuple
+from dataclasses import dataclass, field
+from enum import IntEnum
 
 from config.settings import settings
 from src.utils.logger import logger
+from src.utils.tokens import token_encoding
 
 
-class PromptType(Enum):
-    """Types of prompts."""
-    SUMMARIZATION = "summarization"
-    QUESTION_ANSWERING = "question_answering"
-    ANALYSIS = "analysis"
-    EXTRACTION = "extraction"
-    CLASSIFICATION = "classification"
+class PromptType(IntEnum):
+    """Types of prompts.
+    
+    Values index the template tuple; types with a template come first.
+    """
+    SUMMARIZATION = 0
+    QUESTION_ANSWERING = 1
+    ANALYSIS = 2
+    EXTRACTION = 3
+    CLASSIFICATION = 4
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PromptTemplate:
-    """Template for prompt construction."""
+    """Template for prompt construction (immutable; shared by all PromptEngineers)."""
     system_prompt: str
     user_template: str
-    few_shot_examples: List[Dict[str, str]]
+    few_shot_examples: Tuple[Dict[str, str], ...]
     chain_of_thought: bool
-    variables: List[str]
+    variables: Tuple[str, ...]
+    # Formatted few_shot_examples, rendered once per template
+    few_shot_block: str = field(init=False, repr=False, compare=False)
+    # user_template pre-parsed into (literal, field name) pairs; None if it
+    # needs the full format mini-language
+    user_fields: Optional[Tuple[Tuple[str, Optional[str]], ...]] = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        object.__setattr__(self, 'few_shot_block', _format_few_shot_examples(self.few_shot_examples))
+        object.__setattr__(self, 'user_fields', _compile_format(self.user_template))
+    
+    def format_user(self, variables: Mapping[str, Any]) -> str:
+        """Equivalent to ``user_template.format(**variables)`` without re-parsing."""
+        if self.user_fields is None:
+            return self.user_template.format(**variables)
+        parts = []
+        for literal, name in self.user_fields:
+            parts.append(literal)
+            if name is not None:
+                parts.append(format(variables[name]))
+        return "".join(parts)
 
 
-class PromptEngineer:
-    """Advanced prompt engineering for various AI tasks."""
+_COT_INSTRUCTION = "\n\nPlease think through this step by step before providing your final answer."
+
+
+def _compile_format(template: str) -> Optional[Tuple[Tuple[str, Optional[str]], ...]]:
+    """Parse a format string whose fields are all plain ``{name}`` references."""
+    compiled = []
+    for literal, name, spec, conversion in Formatter().parse(template):
+        if name is not None and (spec or conversion or not name.isidentifier()):
+            return None
+        compiled.append((literal, name))
+    return tuple(compiled)
+
+
+def _format_few_shot_examples(examples: Tuple[Dict[str, str], ...]) -> str:
+    """Format few-shot examples for inclusion in prompts."""
+    if not examples:
+        return ""
     
-    def __init__(self, config: Optional[Dict[str, Any]] = None):
-        """
-        Initialize the prompt engineer.
-        
-        Args:
-            config: Optional configuration dictionary
-        """
-        self.config = config or {}
-        self.settings = settings
-        self.logger = logger
-        
-        # Load prompt templates
-        self.templates = self._load_prompt_templates()
+    formatted_examples = ["Here are some examples:"]
     
-    def _load_prompt_templates(self) -> Dict[PromptType, PromptTemplate]:
-        """Load predefined prompt templates."""
-        templates = {}
-        
-        # Summarization template
-        templates[PromptType.SUMMARIZATION] = PromptTemplate(
-            system_prompt="""You are an expert content summarizer. Your task is to create comprehensive, accurate, and well-structured summaries of the provided content. 
+    for i, example in enumerate(examples, 1):
+        formatted_examples.append(f"\nExample {i}:")
+        formatted_examples.append(f"Input: {example['input']}")
+        formatted_examples.append(f"Output: {example['output']}")
+    
+    return "\n".join(formatted_examples)
+
+
+def _build_templates() -> Tuple[PromptTemplate, ...]:
+    """Build the predefined prompt templates, indexed by PromptType."""
+    templates = {}
+    
+    # Summarization template
+    templates[PromptType.SUMMARIZATION] = PromptTemplate(
+        system_prompt="""You are an expert content summarizer. Your task is to create comprehensive, accurate, and well-structured summaries of the provided content. 
 
 Key requirements:
 - Maintain factual accuracy and preserve important details
@@ -60,29 +97,29 @@ Key requirements:
 - Structure the summary logically with main points and supporting details
 - Preserve the original tone and context when possible
 - Include key insights, conclusions, and actionable information""",
-            
-            user_template="""Please summarize the following content:
+        
+        user_template="""Please summarize the following content:
 
 {content}
 
 {additional_instructions}
 
 Summary:""",
-            
-            few_shot_examples=[
-                {
-                    "input": "A 30-minute video about machine learning basics covering supervised learning, unsupervised learning, and neural networks with practical examples.",
-                    "output": "**Machine Learning Basics Summary**\n\n**Main Topics Covered:**\n1. **Supervised Learning**: Uses labeled data to train models for prediction tasks\n2. **Unsupervised Learning**: Finds patterns in unlabeled data through clustering and dimensionality reduction\n3. **Neural Networks**: Computational models inspired by biological neurons, capable of learning complex patterns\n\n**Key Insights:**\n- Machine learning enables computers to learn from data without explicit programming\n- Different approaches suit different types of problems and data availability\n- Practical applications demonstrated across various industries\n\n**Duration**: 30 minutes of comprehensive content suitable for beginners"
-                }
-            ],
-            
-            chain_of_thought=True,
-            variables=["content", "additional_instructions"]
-        )
         
-        # Question Answering template
-        templates[PromptType.QUESTION_ANSWERING] = PromptTemplate(
-            system_prompt="""You are a knowledgeable assistant that provides accurate, helpful answers based on the given context. 
+        few_shot_examples=(
+            {
+                "input": "A 30-minute video about machine learning basics covering supervised learning, unsupervised learning, and neural networks with practical examples.",
+                "output": "**Machine Learning Basics Summary**\n\n**Main Topics Covered:**\n1. **Supervised Learning**: Uses labeled data to train models for prediction tasks\n2. **Unsupervised Learning**: Finds patterns in unlabeled data through clustering and dimensionality reduction\n3. **Neural Networks**: Computational models inspired by biological neurons, capable of learning complex patterns\n\n**Key Insights:**\n- Machine learning enables computers to learn from data without explicit programming\n- Different approaches suit different types of problems and data availability\n- Practical applications demonstrated across various industries\n\n**Duration**: 30 minutes of comprehensive content suitable for beginners"
+            },
+        ),
+        
+        chain_of_thought=True,
+        variables=("content", "additional_instructions")
+    )
+    
+    # Question Answering template
+    templates[PromptType.QUESTION_ANSWERING] = PromptTemplate(
+        system_prompt="""You are a knowledgeable assistant that provides accurate, helpful answers based on the given context. 
 
 Guidelines:
 - Answer questions directly and comprehensively using only the provided context
@@ -90,28 +127,28 @@ Guidelines:
 - Provide specific details and examples when available
 - Maintain objectivity and cite relevant parts of the context
 - If the question is ambiguous, ask for clarification""",
-            
-            user_template="""Context:
+        
+        user_template="""Context:
 {context}
 
 Question: {question}
 
 Answer:""",
-            
-            few_shot_examples=[
-                {
-                    "input": "Context: The video discusses three types of machine learning: supervised, unsupervised, and reinforcement learning.\nQuestion: What are the main types of machine learning mentioned?",
-                    "output": "Based on the provided context, there are three main types of machine learning mentioned:\n1. Supervised learning\n2. Unsupervised learning\n3. Reinforcement learning\n\nThese represent the fundamental categories of machine learning approaches discussed in the video."
-                }
-            ],
-            
-            chain_of_thought=False,
-            variables=["context", "question"]
-        )
         
-        # Analysis template
-        templates[PromptType.ANALYSIS] = PromptTemplate(
-            system_prompt="""You are an expert analyst capable of deep content analysis. Your role is to examine content thoroughly and provide insightful analysis.
+        few_shot_examples=(
+            {
+                "input": "Context: The video discusses three types of machine learning: supervised, unsupervised, and reinforcement learning.\nQuestion: What are the main types of machine learning mentioned?",
+                "output": "Based on the provided context, there are three main types of machine learning mentioned:\n1. Supervised learning\n2. Unsupervised learning\n3. Reinforcement learning\n\nThese represent the fundamental categories of machine learning approaches discussed in the video."
+            },
+        ),
+        
+        chain_of_thought=False,
+        variables=("context", "question")
+    )
+    
+    # Analysis template
+    templates[PromptType.ANALYSIS] = PromptTemplate(
+        system_prompt="""You are an expert analyst capable of deep content analysis. Your role is to examine content thoroughly and provide insightful analysis.
 
 Analysis approach:
 - Identify key themes, patterns, and insights
@@ -119,21 +156,59 @@ Analysis approach:
 - Consider multiple perspectives and implications
 - Provide evidence-based conclusions
 - Suggest actionable recommendations when appropriate""",
-            
-            user_template="""Please analyze the following content:
+        
+        user_template="""Please analyze the following content:
 
 {content}
 
 Focus areas: {focus_areas}
 
 Analysis:""",
-            
-            few_shot_examples=[],
-            chain_of_thought=True,
-            variables=["content", "focus_areas"]
-        )
         
-        return templates
+        few_shot_examples=(),
+        chain_of_thought=True,
+        variables=("content", "focus_areas")
+    )
+    
+    return tuple(templates[PromptType(i)] for i in range(len(templates)))
+
+
+# Templates never depend on config; built once at import and shared read-only
+_TEMPLATES: Tuple[PromptTemplate, ...] = _build_templates()
+
+
+def _chunk_blocks(chunks: Iterable[Dict[str, Any]], label: str = "",
+                  default_source: Optional[str] = None) -> Iterator[str]:
+    """Yield one ``[label source]\ntext`` block per chunk, for a single join.
+    
+    Chunks without a source are numbered unless ``default_source`` is given.
+    """
+    for i, chunk in enumerate(chunks, 1):
+        chunk_text = chunk.get('text', chunk.get('content', ''))
+        source = chunk.get('metadata', {}).get('source', default_source or f'Source {i}')
+        yield f"[{label}{source}]\n{chunk_text}"
+
+
+class PromptEngineer:
+    """Advanced prompt engineering for various AI tasks."""
+    
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the prompt engineer.
+        
+        Args:
+            config: Optional configuration dictionary
+        """
+        self.config = config or {}
+        self.settings = settings
+        self.logger = logger
+        
+        # Load prompt templates
+        self.templates = self._load_prompt_templates()
+    
+    def _load_prompt_templates(self) -> Tuple[PromptTemplate, ...]:
+        """Load predefined prompt templates (built once per process)."""
+        return _TEMPLATES
     
     def build_prompt(self, prompt_type: PromptType, variables: Dict[str, Any], **kwargs) -> List[Dict[str, str]]:
         """
@@ -147,31 +222,25 @@ Analysis:""",
         Returns:
             List of message dictionaries for the LLM
         """
-        if prompt_type not in self.templates:
-            raise ValueError(f"Unknown prompt type: {prompt_type}")
+        try:
+            template = self.templates[prompt_type]
+        except (IndexError, TypeError):
+            raise ValueError(f"Unknown prompt type: {prompt_type!r}") from None
         
-        template = self.templates[prompt_type]
-        
-        # Build system message
+        # Build system message, with role-specific instructions if provided
         system_message = template.system_prompt
-        
-        # Add role-specific instructions if provided
         if 'role' in kwargs:
-            role_instruction = f"\nAdditional role context: {kwargs['role']}"
-            system_message += role_instruction
-        
-        # Build user message
-        user_message = template.user_template.format(**variables)
-        
-        # Add few-shot examples if requested
-        if kwargs.get('include_examples', True) and template.few_shot_examples:
-            examples_text = self._format_few_shot_examples(template.few_shot_examples)
-            user_message = examples_text + "\n\n" + user_message
-        
-        # Add chain-of-thought instruction if enabled
+            system_message = f"{system_message}\nAdditional role context: {kwargs['role']}"
+        
+        # Build user message: [few-shot examples] + filled template + [chain-of-thought]
+        user_parts = []
+        if kwargs.get('include_examples', True) and template.few_shot_block:
+            user_parts.append(template.few_shot_block)
+            user_parts.append("\n\n")
+        user_parts.append(template.format_user(variables))
         if template.chain_of_thought and kwargs.get('use_chain_of_thought', True):
-            cot_instruction = "\n\nPlease think through this step by step before providing your final answer."
-            user_message += cot_instruction
+            user_parts.append(_COT_INSTRUCTION)
+        user_message = "".join(user_parts)
         
         # Build message list
         messages = [
@@ -231,13 +300,7 @@ Analysis:""",
             List of message dictionaries
         """
         # Combine chunks into context
-        context_parts = []
-        for i, chunk in enumerate(chunks, 1):
-            chunk_text = chunk.get('text', chunk.get('content', ''))
-            source_info = chunk.get('metadata', {}).get('source', f'Source {i}')
-            context_parts.append(f"[{source_info}]\n{chunk_text}")
-        
-        combined_context = "\n\n".join(context_parts)
+        combined_context = "\n\n".join(_chunk_blocks(chunks))
         
         # Add multi-hop specific instructions
         multi_hop_instructions = """
@@ -276,32 +339,18 @@ When answering, please:
         Returns:
             List of message dictionaries
         """
-        # Separate local and web content
-        local_context = []
-        web_context = []
-        
-        for chunk in local_chunks:
-            chunk_text = chunk.get('text', chunk.get('content', ''))
-            source = chunk.get('metadata', {}).get('source', 'Local source')
-            local_context.append(f"[Local: {source}]\n{chunk_text}")
-        
-        for chunk in web_chunks:
-            chunk_text = chunk.get('text', chunk.get('content', ''))
-            source = chunk.get('metadata', {}).get('source', 'Web source')
-            web_context.append(f"[Web: {source}]\n{chunk_text}")
+        # Combine local and web content in one pass
+        sections = []
+        if local_chunks:
+            sections.append(("=== LOCAL SOURCES ===",))
+            sections.append(_chunk_blocks(local_chunks, "Local: ", "Local source"))
         
-        # Combine contexts
-        all_context = []
-        if local_context:
-            all_context.append("=== LOCAL SOURCES ===")
-            all_context.extend(local_context)
+        if web_chunks:
+            sections.append(("\n=== WEB SOURCES ===",))
+            sections.append(_chunk_blocks(web_chunks, "Web: ", "Web source"))
+            sections.append(("\n⚠️ Note: Web sources may require verification",))
         
-        if web_context:
-            all_context.append("\n=== WEB SOURCES ===")
-            all_context.extend(web_context)
-            all_context.append("\n⚠️ Note: Web sources may require verification")
-        
-        combined_context = "\n\n".join(all_context)
+        combined_context = "\n\n".join(chain.from_iterable(sections))
         
         # Web-specific instructions
         web_instructions = """
@@ -324,17 +373,7 @@ Important guidelines for web-enhanced responses:
     
     def _format_few_shot_examples(self, examples: List[Dict[str, str]]) -> str:
         """Format few-shot examples for inclusion in prompts."""
-        if not examples:
-            return ""
-        
-        formatted_examples = ["Here are some examples:"]
-        
-        for i, example in enumerate(examples, 1):
-            formatted_examples.append(f"\nExample {i}:")
-            formatted_examples.append(f"Input: {example['input']}")
-            formatted_examples.append(f"Output: {example['output']}")
-        
-        return "\n".join(formatted_examples)
+        return _format_few_shot_examples(examples)
     
     def optimize_prompt_length(self, messages: List[Dict[str, str]], max_tokens: int = 4000) -> List[Dict[str, str]]:
         """
@@ -347,6 +386,10 @@ Important guidelines for web-enhanced responses:
         Returns:
             Optimized messages
         """
+        encoding = token_encoding()
+        if encoding is not None:
+            return self._truncate_to_tokens(encoding, messages, max_tokens)
+        
         # Simple token estimation (4 chars per token)
         total_length = sum(len(msg["content"]) for msg in messages)
         estimated_tokens = total_length // 4
@@ -366,3 +409,30 @@ Important guidelines for web-enhanced responses:
             self.logger.warning("Prompt truncated to fit token limit")
         
         return optimized_messages
+    
+    def _truncate_to_tokens(self, encoding: Any, messages: List[Dict[str, str]], max_tokens: int) -> List[Dict[str, str]]:
+        """Token-accurate optimize_prompt_length: cut the user message by decoded token slice."""
+        # Encoded in parallel by tiktoken's native threads
+        token_lists = encoding.encode_batch([msg["content"] for msg in messages], disallowed_special=())
+        total_tokens = sum(map(len, token_lists))
+        
+        if total_tokens <= max_tokens:
+            return messages
+        
+        user_idx = next((i for i, msg in enumerate(messages) if msg["role"] == "user"), None)
+        if user_idx is None:
+            return messages
+        
+        # Use 80% of the limit, leaving the other messages intact
+        user_tokens = token_lists[user_idx]
+        budget = max(int(max_tokens * 0.8) - (total_tokens - len(user_tokens)), 0)
+        
+        optimized_messages = messages.copy()
+        if len(user_tokens) > budget:
+            optimized_messages[user_idx] = {
+                **messages[user_idx],
+                "content": encoding.decode(user_tokens[:budget]) + "...[truncated]"
+            }
+            self.logger.warning("Prompt truncated to fit token limit")
+        
+        return optimized_messages
@@ -109,7 +109,7 @@ def _build_context() -> Dict[str, Any]:
     context["summarization_workflow"] = None
 
     try:
-        context["multimodal_ai"] = MultiModalAI()
+        context["multimodal_ai"] = MultiModalAI.instance()
     except Exception as e:  # pragma: no cover
         logger.warning(f"Multimodal AI initialization failed: {e}")
         context["multimodal_ai"] = None
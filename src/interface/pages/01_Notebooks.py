@@ -1689,7 +1689,9 @@ def _render_chat(nb: store.Notebook):
                     try:
                         structured_output = ctx["output_parser"].parse_qa(answer)
                         sources = [r.metadata.get("source", "unknown") for r in filtered_results[:5]]
-                        structured_output.citations = ctx["output_parser"].extract_citations(answer, sources)
+                        structured_output = structured_output.model_copy(
+                            update={"citations": ctx["output_parser"].extract_citations(answer, sources)}
+                        )
                     except Exception:
                         pass
             except Exception as _e:
@@ -2,10 +2,13 @@
 Caching utilities for Thunderbolts application.
 """
 import hashlib
+import os
 import pickle
 import json
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Optional, Dict, Union, Callable
+from typing import Any, Optional, Dict, List, Tuple, Union, Callable
 from functools import wraps
 import time
 from datetime import datetime, timedelta
@@ -287,6 +290,328 @@ class LLMResponseCache:
         return f"llm_response_{key_hash}"
 
 
+class ImageAnalysisCache:
+    """Specialized cache for vision-model image analyses."""
+    
+    def __init__(self, cache_dir: Optional[Path] = None):
+        """Initialize image analysis cache."""
+        self.cache_dir = cache_dir or settings.data_dir / "vision_cache"
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        
+        self.cache_manager = CacheManager(self.cache_dir)
+    
+    @staticmethod
+    def make_key(image_data: bytes, prompt: str, model: str) -> str:
+        """Cache key from the image content, prompt and model."""
+        digest = hashlib.blake2b(image_data, digest_size=16)
+        digest.update(b"\0" + prompt.encode() + b"\0" + model.encode())
+        return f"vision_{digest.hexdigest()}"
+    
+    def get_analysis(self, key: str) -> Optional[str]:
+        """Get cached analysis text."""
+        return self.cache_manager.get(key)
+    
+    def set_analysis(self, key: str, analysis: str, ttl: int = 30 * 86400) -> None:
+        """Cache analysis text (default 30 days)."""
+        self.cache_manager.set(key, analysis, ttl)
+
+
+class TTSCache:
+    """
+    Disk cache of synthesized speech.
+    
+    Each (model, voice, format, text) maps to one audio file, so hits are a
+    file read and saved copies can hard-link the cached file. Entries expire
+    after ``ttl`` seconds; the least recently used files are evicted once the
+    directory exceeds ``max_bytes``.
+    """
+    
+    def __init__(self, cache_dir: Optional[Path] = None, ttl: int = 30 * 86400, max_bytes: int = 2 ** 30):
+        """Initialize TTS cache (default 30 days, 1 GiB)."""
+        self.cache_dir = Path(cache_dir) if cache_dir else settings.data_dir / "tts_cache"
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self._size = sum(f.stat().st_size for f in self.cache_dir.glob("*.audio"))
+    
+    @staticmethod
+    def make_key(text: str, voice: str, model: str, fmt: str) -> str:
+        """Cache key for a synthesis request."""
+        return hashlib.blake2b(f"{model}|{voice}|{fmt}|{text}".encode(), digest_size=16).hexdigest()
+    
+    def path(self, key: str) -> Path:
+        """Cache file of a key (it may not exist)."""
+        return self.cache_dir / f"{key}.audio"
+    
+    def get(self, key: str) -> Optional[Path]:
+        """Path of the cached audio for a key, or None on a miss."""
+        path = self.path(key)
+        try:
+            mtime = path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+        now = time.time()
+        if now - mtime > self.ttl:
+            self._remove(path)
+            return None
+        # Access time drives LRU eviction (mtime keeps the write time for the TTL)
+        os.utime(path, (now, mtime))
+        return path
+    
+    def set(self, key: str, audio_data: bytes) -> Path:
+        """Store audio for a key and return its cache file."""
+        tmp_path = self.temp_path(key)
+        tmp_path.write_bytes(audio_data)
+        return self.commit(key, tmp_path)
+    
+    def temp_path(self, key: str) -> Path:
+        """Private file to write (e.g. stream) audio for a key before commit."""
+        return self.cache_dir / f"{key}.{threading.get_ident()}.tmp"
+    
+    def commit(self, key: str, tmp_path: Path) -> Path:
+        """Atomically move a written temp file into place and return the cache file."""
+        path = self.path(key)
+        size = tmp_path.stat().st_size
+        with self.lock:
+            if path.exists():
+                self._size -= path.stat().st_size
+            os.replace(tmp_path, path)
+            self._size += size
+            if self._size > self.max_bytes:
+                self._evict()
+        return path
+    
+    def _evict(self) -> None:
+        """Delete least recently used files until under max_bytes (lock held)."""
+        files = sorted(
+            ((f.stat(), f) for f in self.cache_dir.glob("*.audio")),
+            key=lambda item: item[0].st_atime
+        )
+        for stat, f in files:
+            if self._size <= self.max_bytes:
+                break
+            f.unlink(missing_ok=True)
+            self._size -= stat.st_size
+    
+    def _remove(self, path: Path) -> None:
+        with self.lock:
+            try:
+                size = path.stat().st_size
+                path.unlink()
+            except FileNotFoundError:
+                return
+            self._size -= size
+
+
+class SemanticCache:
+    """In-memory two-tier response cache.
+
+    Lookups first try an exact key match; on a miss, and when an ``embed_fn``
+    is configured (or a precomputed ``vector`` is passed), the query is
+    compared (cosine similarity) against the texts of cached entries. Entries
+    expire after ``ttl`` seconds and the least recently used entry is evicted
+    beyond ``max_entries``.
+    
+    Semantic matches only consider entries stored with the same ``scope``, so
+    callers can keep unrelated corpora or embedding models apart.
+    
+    Stored vectors can be kept as ``float16`` or ``int8`` (``vector_dtype``)
+    to cut index memory 2x/4x; similarities are still computed in float32.
+    """
+    
+    def __init__(self, max_entries: int = 1024, ttl: int = 3600,
+                 embed_fn: Optional[Callable[[str], Any]] = None,
+                 similarity_threshold: float = 0.95,
+                 vector_dtype: str = "float32"):
+        """
+        Initialize semantic cache.
+        
+        Args:
+            max_entries: Maximum number of cached entries
+            ttl: Time to live in seconds
+            embed_fn: Optional text -> vector function enabling the semantic tier
+            similarity_threshold: Minimum cosine similarity for a semantic hit
+            vector_dtype: Storage type of indexed vectors ("float32", "float16" or "int8")
+        """
+        if vector_dtype not in ("float32", "float16", "int8"):
+            raise ValueError(f"Unsupported vector_dtype: {vector_dtype}")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.embed_fn = embed_fn
+        self.similarity_threshold = similarity_threshold
+        self.vector_dtype = vector_dtype
+        
+        # key -> (expires_at, value), in LRU order
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        # Semantic tier: parallel lists of keys, unit-normalized vectors and scopes
+        self._vector_keys: List[str] = []
+        self._vectors: List[Any] = []
+        self._vector_scopes: List[Any] = []
+        # scope -> (stacked vectors of that scope, their keys), rebuilt lazily
+        self._matrices: Dict[Any, Tuple[Any, List[str]]] = {}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Build a stable cache key from JSON-serializable parts."""
+        key_string = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.blake2b(key_string.encode(), digest_size=16).hexdigest()
+    
+    def get(self, key: str, text: Optional[str] = None, *,
+            vector: Any = None, scope: Any = None) -> Any:
+        """
+        Get a cached value by exact key, falling back to semantic lookup.
+        
+        Args:
+            key: Exact-match cache key
+            text: Text to embed for the semantic tier
+            vector: Precomputed embedding of the text (skips ``embed_fn``)
+            scope: Only entries stored with this scope can match semantically
+            
+        Returns:
+            Cached value or None
+        """
+        with self._lock:
+            value = self._get_exact(key)
+        if value is not None:
+            return value
+        vector = self._query_vector(text, vector)
+        if vector is None:
+            return None
+        
+        with self._lock:
+            match = self._nearest_key(vector, scope)
+            return self._get_exact(match) if match is not None else None
+    
+    def set(self, key: str, value: Any, text: Optional[str] = None, *,
+            vector: Any = None, scope: Any = None) -> None:
+        """
+        Store a value, indexing ``text`` for semantic lookups when enabled.
+        
+        Args:
+            key: Exact-match cache key
+            value: Value to cache
+            text: Text to embed for the semantic tier
+            vector: Precomputed embedding of the text (skips ``embed_fn``)
+            scope: Scope the entry can be matched in
+        """
+        vector = self._query_vector(text, vector)
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl, value)
+            self._entries.move_to_end(key)
+            if vector is not None and key not in self._vector_keys:
+                self._vector_keys.append(key)
+                self._vectors.append(self._quantize(vector))
+                self._vector_scopes.append(scope)
+                self._matrices.pop(scope, None)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._drop_vector(evicted)
+    
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._vector_keys.clear()
+            self._vectors.clear()
+            self._vector_scopes.clear()
+            self._matrices.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def _get_exact(self, key: str) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.time() >= expires_at:
+            del self._entries[key]
+            self._drop_vector(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+    
+    def _query_vector(self, text: Optional[str], vector: Any) -> Any:
+        """Unit vector for the semantic tier, or None when it does not apply."""
+        if vector is not None:
+            return self._unit(vector)
+        if self.embed_fn is None or not text:
+            return None
+        return self._unit(self.embed_fn(text))
+    
+    @staticmethod
+    def _unit(vector: Any) -> Any:
+        import numpy as np
+        
+        vector = np.asarray(vector, dtype=np.float32).ravel()
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm > 0 else vector
+    
+    def _quantize(self, vector: Any) -> Any:
+        """Convert a unit vector to the storage dtype (int8 scaled by 127)."""
+        import numpy as np
+        
+        if self.vector_dtype == "int8":
+            return np.round(vector * 127).astype(np.int8)
+        return vector.astype(self.vector_dtype, copy=False)
+    
+    def _nearest_key(self, vector: Any, scope: Any = None) -> Optional[str]:
+        import numpy as np
+        
+        indexed = self._matrices.get(scope)
+        if indexed is None:
+            positions = [i for i, s in enumerate(self._vector_scopes) if s == scope]
+            if not positions:
+                return None
+            indexed = self._matrices[scope] = (
+                np.vstack([self._vectors[i] for i in positions]),
+                [self._vector_keys[i] for i in positions],
+            )
+        matrix, keys = indexed
+        if self.vector_dtype == "float32":
+            scores = matrix @ vector
+        else:
+            # numpy has no fast float16/int8 matmul; upcast for the product only
+            scores = matrix.astype(np.float32) @ vector
+            if self.vector_dtype == "int8":
+                scores /= 127
+        best = int(np.argmax(scores))
+        if float(scores[best]) >= self.similarity_threshold:
+            return keys[best]
+        return None
+    
+    def _drop_vector(self, key: str) -> None:
+        try:
+            index = self._vector_keys.index(key)
+        except ValueError:
+            return
+        del self._vector_keys[index]
+        del self._vectors[index]
+        self._matrices.pop(self._vector_scopes.pop(index), None)
+
+
+def load_local_embedder(model_name: str) -> Optional[Callable[[str], Any]]:
+    """
+    Return a text -> vector function backed by sentence-transformers.
+    
+    Args:
+        model_name: sentence-transformers model name (e.g. "all-MiniLM-L6-v2")
+        
+    Returns:
+        The model's encode function, or None if sentence-transformers is not installed
+    """
+    try:
+        from sentence_transformers import SentenceTransformer
+    except Exception:  # pragma: no cover
+        return None
+    model = SentenceTransformer(model_name)
+    return model.encode
+
+
 # Global cache instances
 embedding_cache = EmbeddingCache()
 llm_cache = LLMResponseCache()
+image_analysis_cache = ImageAnalysisCache()
+tts_cache = TTSCache()
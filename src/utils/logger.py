@@ -4,7 +4,7 @@ Logging utilities for Thunderbolts application.
 import logging
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
 from config.settings import settings
 
@@ -57,25 +57,25 @@ class Logger:
         """Get the logger instance."""
         return self._logger
     
-    def debug(self, message: str) -> None:
-        """Log debug message."""
-        self._logger.debug(message)
+    def debug(self, message: str, *args: Any) -> None:
+        """Log debug message; ``args`` are %-formatted only if the record is emitted."""
+        self._logger.debug(message, *args)
     
-    def info(self, message: str) -> None:
-        """Log info message."""
-        self._logger.info(message)
+    def info(self, message: str, *args: Any) -> None:
+        """Log info message; ``args`` are %-formatted only if the record is emitted."""
+        self._logger.info(message, *args)
     
-    def warning(self, message: str) -> None:
-        """Log warning message."""
-        self._logger.warning(message)
+    def warning(self, message: str, *args: Any) -> None:
+        """Log warning message; ``args`` are %-formatted only if the record is emitted."""
+        self._logger.warning(message, *args)
     
-    def error(self, message: str) -> None:
-        """Log error message."""
-        self._logger.error(message)
+    def error(self, message: str, *args: Any) -> None:
+        """Log error message; ``args`` are %-formatted only if the record is emitted."""
+        self._logger.error(message, *args)
     
-    def critical(self, message: str) -> None:
-        """Log critical message."""
-        self._logger.critical(message)
+    def critical(self, message: str, *args: Any) -> None:
+        """Log critical message; ``args`` are %-formatted only if the record is emitted."""
+        self._logger.critical(message, *args)
 
 
 # Global logger instance
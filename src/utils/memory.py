@@ -4,7 +4,7 @@ Implements short-term and long-term memory for conversation context.
 """
 import json
 import time
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Set, Tuple
 from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -16,6 +16,11 @@ from .logger import logger
 from .cache import cache_manager
 
 
+def _trigrams(text: str) -> Set[str]:
+    """Character trigrams of ``text``."""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
 @dataclass
 class MemoryEntry:
     """Represents a single memory entry."""
@@ -159,6 +164,10 @@ class LongTermMemory:
         self.memories: Dict[str, MemoryEntry] = {}
         self.importance_threshold = 0.7  # Threshold for long-term storage
         self.lock = threading.Lock()
+        # Lowercased content per entry and the trigrams of all of it; a query
+        # with a trigram outside the set cannot be a substring of any entry
+        self._lowered: Dict[str, str] = {}
+        self._trigrams: Set[str] = set()
         
         # Load existing memories
         self._load_memories()
@@ -169,6 +178,7 @@ class LongTermMemory:
         """Add entry to long-term memory."""
         with self.lock:
             self.memories[entry.id] = entry
+            self._index(entry)
             
             # Save to disk if important enough
             if entry.importance >= self.importance_threshold:
@@ -185,6 +195,12 @@ class LongTermMemory:
                 entry.last_accessed = datetime.now()
             return entry
     
+    def _index(self, entry: MemoryEntry) -> None:
+        """Record an entry's lowercased content for search."""
+        lowered = entry.content.lower()
+        self._lowered[entry.id] = lowered
+        self._trigrams |= _trigrams(lowered)
+    
     def search_memories(self, query: str, memory_type: Optional[str] = None,
                        min_importance: float = 0.0, limit: int = 10) -> List[MemoryEntry]:
         """Search memories by content and criteria."""
@@ -192,6 +208,10 @@ class LongTermMemory:
             results = []
             query_lower = query.lower()
             
+            # Cheap prefilter: skip the scan when no entry can contain the query
+            if len(query_lower) >= 3 and not _trigrams(query_lower) <= self._trigrams:
+                return results
+            
             for entry in self.memories.values():
                 # Filter by type if specified
                 if memory_type and entry.memory_type != memory_type:
@@ -202,7 +222,7 @@ class LongTermMemory:
                     continue
                 
                 # Simple text search (could be enhanced with embeddings)
-                if query_lower in entry.content.lower():
+                if query_lower in self._lowered[entry.id]:
                     entry.access_count += 1
                     entry.last_accessed = datetime.now()
                     results.append(entry)
@@ -266,6 +286,7 @@ class LongTermMemory:
                     
                     entry = MemoryEntry(**entry_dict)
                     self.memories[entry.id] = entry
+                    self._index(entry)
                     
                 except Exception as e:
                     logger.warning(f"Failed to load memory file {file_path}: {e}")
@@ -290,11 +311,15 @@ class LongTermMemory:
             # Remove entries
             for entry_id in to_remove:
                 del self.memories[entry_id]
+                del self._lowered[entry_id]
                 # Remove file
                 file_path = self.storage_path / f"{entry_id}.json"
                 if file_path.exists():
                     file_path.unlink()
             
+            if to_remove:
+                self._trigrams = set().union(*map(_trigrams, self._lowered.values()))
+            
             logger.info(f"Cleaned up {len(to_remove)} old memories")
             return len(to_remove)
     
@@ -327,6 +352,9 @@ class MemoryManager:
         self.long_term = LongTermMemory()
         self.consolidation_interval = 300  # 5 minutes
         self.last_consolidation = time.time()
+        # Guards turn ids and consolidation; turns may be recorded from worker threads
+        self.lock = threading.Lock()
+        self._last_turn_ms = 0
         
         logger.info("Memory manager initialized")
     
@@ -334,7 +362,11 @@ class MemoryManager:
                             context_used: List[str], processing_time: float,
                             confidence_score: float) -> str:
         """Add a conversation turn to memory."""
-        turn_id = f"turn_{int(time.time() * 1000)}"
+        with self.lock:
+            # Millisecond ids, bumped so concurrent turns never share one
+            turn_ms = max(int(time.time() * 1000), self._last_turn_ms + 1)
+            self._last_turn_ms = turn_ms
+        turn_id = f"turn_{turn_ms}"
         
         turn = ConversationTurn(
             turn_id=turn_id,
@@ -411,9 +443,12 @@ class MemoryManager:
     def _maybe_consolidate(self) -> None:
         """Consolidate memories if enough time has passed."""
         current_time = time.time()
-        if current_time - self.last_consolidation > self.consolidation_interval:
-            self._consolidate_memories()
+        with self.lock:
+            # Claim the consolidation slot so concurrent callers don't run it twice
+            if current_time - self.last_consolidation <= self.consolidation_interval:
+                return
             self.last_consolidation = current_time
+        self._consolidate_memories()
     
     def _consolidate_memories(self) -> None:
         """Consolidate important short-term memories to long-term."""
@@ -0,0 +1,54 @@
+"""
+Token counting utilities for Thunderbolts application.
+"""
+from functools import lru_cache
+from typing import Any, Optional
+
+from .logger import logger
+
+
+@lru_cache(maxsize=None)
+def token_encoding(model_name: Optional[str] = None) -> Any:
+    """
+    Get the tiktoken encoding for a model, loaded once per model name.
+
+    Unknown model names (Azure deployments, non-OpenAI models) use
+    cl100k_base. tiktoken downloads the BPE file on first use, so this can
+    fail on offline hosts.
+
+    Args:
+        model_name: Model name, or None for cl100k_base
+
+    Returns:
+        The encoding, or None when tiktoken or its BPE file is unavailable;
+        callers then estimate ~4 characters per token
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model_name or "")
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning(f"tiktoken encoding unavailable, estimating tokens: {e}")
+        return None
+
+
+def count_tokens(text: str, model_name: Optional[str] = None) -> int:
+    """
+    Count tokens of a text with the model's encoding.
+
+    Args:
+        text: Input text
+        model_name: Model name, or None for cl100k_base
+
+    Returns:
+        Token count; a ~4 characters per token estimate without an encoding
+    """
+    encoding = token_encoding(model_name)
+    if encoding is None:
+        return len(text) // 4
+    return len(encoding.encode(text, disallowed_special=()))
@@ -0,0 +1,137 @@
+"""
+Tests for caching utilities.
+"""
+import os
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.cache import ImageAnalysisCache, SemanticCache, TTSCache
+
+
+class TestSemanticCache:
+    """Test cases for SemanticCache."""
+
+    def test_exact_hit_and_miss(self):
+        """Test exact-key lookups."""
+        cache = SemanticCache()
+        key = SemanticCache.make_key("gpt-4o-mini", 0.0, [{"role": "user", "content": "hi"}])
+
+        assert cache.get(key) is None
+        cache.set(key, {"content": "hello"})
+        assert cache.get(key) == {"content": "hello"}
+
+    def test_make_key_is_stable(self):
+        """Test that equal inputs produce equal keys regardless of dict order."""
+        assert SemanticCache.make_key({"a": 1, "b": 2}) == SemanticCache.make_key({"b": 2, "a": 1})
+        assert SemanticCache.make_key("x") != SemanticCache.make_key("y")
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted."""
+        cache = SemanticCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_expired_entries_are_dropped(self):
+        """Test that entries past their TTL are not returned."""
+        cache = SemanticCache(ttl=0)
+        cache.set("a", 1)
+
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_semantic_hit(self):
+        """Test similarity lookups through the embedding tier."""
+        pytest.importorskip("numpy")
+        vectors = {
+            "what is python": [1.0, 0.0, 0.0],
+            "what's python": [0.99, 0.05, 0.0],
+            "best pizza": [0.0, 1.0, 0.0],
+        }
+        cache = SemanticCache(embed_fn=vectors.__getitem__, similarity_threshold=0.95)
+        cache.set("k1", "a language", text="what is python")
+
+        assert cache.get("other", text="what's python") == "a language"
+        assert cache.get("other", text="best pizza") is None
+
+    def test_semantic_hit_scoped(self):
+        """Test that semantic matches stay within the scope they were stored in."""
+        pytest.importorskip("numpy")
+        cache = SemanticCache(similarity_threshold=0.95)
+        cache.set("k1", "answer A", vector=[1.0, 0.0], scope="notebook-a")
+
+        assert cache.get("other", vector=[0.99, 0.05], scope="notebook-a") == "answer A"
+        assert cache.get("other", vector=[1.0, 0.0], scope="notebook-b") is None
+        assert cache.get("other", vector=[1.0, 0.0, 0.0], scope="other-model") is None
+
+    @pytest.mark.parametrize("dtype", ["float16", "int8"])
+    def test_semantic_hit_quantized(self, dtype):
+        """Test that reduced-precision vector storage keeps similarity lookups."""
+        np = pytest.importorskip("numpy")
+        vectors = {"what is python": [1.0, 0.0, 0.0], "what's python": [0.99, 0.05, 0.0]}
+        cache = SemanticCache(embed_fn=vectors.__getitem__, similarity_threshold=0.95, vector_dtype=dtype)
+        cache.set("k1", "a language", text="what is python")
+
+        assert cache._vectors[0].dtype == np.dtype(dtype)
+        assert cache.get("other", text="what's python") == "a language"
+
+    def test_invalid_vector_dtype(self):
+        """Test that unsupported storage types are rejected."""
+        with pytest.raises(ValueError):
+            SemanticCache(vector_dtype="int4")
+
+
+class TestImageAnalysisCache:
+    """Test cases for ImageAnalysisCache."""
+
+    def test_keyed_by_image_prompt_and_model(self, tmp_path):
+        """Test that analyses are stored per image content, prompt and model."""
+        cache = ImageAnalysisCache(tmp_path)
+        key = ImageAnalysisCache.make_key(b"png", "Describe", "vision")
+
+        assert cache.get_analysis(key) is None
+        cache.set_analysis(key, "A cat")
+        assert ImageAnalysisCache(tmp_path).get_analysis(key) == "A cat"
+        assert key != ImageAnalysisCache.make_key(b"png", "Describe", "vision-2")
+        assert key != ImageAnalysisCache.make_key(b"pn", "gDescribe", "vision")
+
+
+class TestTTSCache:
+    """Test cases for TTSCache."""
+
+    def test_hit_miss_and_expiry(self, tmp_path):
+        """Test that stored audio is returned until its TTL passes."""
+        cache = TTSCache(tmp_path, ttl=60)
+        key = TTSCache.make_key("Hello", "alloy", "tts-1", "mp3")
+
+        assert cache.get(key) is None
+        cache.set(key, b"audio")
+        assert cache.get(key).read_bytes() == b"audio"
+        assert key != TTSCache.make_key("Hello", "echo", "tts-1", "mp3")
+
+        cache.ttl = -1
+        assert cache.get(key) is None
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        """Test that the size limit evicts the least recently read file."""
+        cache = TTSCache(tmp_path, max_bytes=10)
+        cache.set("a", b"12345")
+        cache.set("b", b"12345")
+        os.utime(cache.path("a"), (0, cache.path("a").stat().st_mtime))
+        cache.get("b")
+
+        cache.set("c", b"12345")
+
+        assert cache.get("a") is None
+        assert cache.get("b") is not None
+        assert cache.get("c") is not None
@@ -0,0 +1,191 @@
+"""
+Tests for function calling module.
+"""
+import pytest
+import sys
+import threading
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.ai.function_calling import FunctionCaller
+from src.utils.exceptions import LLMError
+
+
+class TestFunctionCaller:
+    """Test cases for FunctionCaller."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.caller = FunctionCaller()
+
+    def test_builtin_functions_registered(self):
+        """Test that built-in functions are available."""
+        available = self.caller.get_available_functions()
+        assert "search_documents" in available
+        assert "get_current_time" in available
+
+    def test_call_function_with_json_arguments(self):
+        """Test calling a function with JSON string arguments."""
+        result = self.caller.call_function("search_documents", '{"query": "test"}')
+
+        assert result["success"] is True
+        assert result["function_name"] == "search_documents"
+        assert result["result"]["query"] == "test"
+
+    def test_call_function_missing_required_param(self):
+        """Test that missing required parameters are reported."""
+        result = self.caller.call_function("search_documents", {})
+
+        assert result["success"] is False
+        assert "query" in result["error"]
+
+    def test_call_unknown_function(self):
+        """Test that unknown functions raise LLMError."""
+        with pytest.raises(LLMError):
+            self.caller.call_function("does_not_exist", {})
+
+    def test_call_function_invalid_json(self):
+        """Test that invalid JSON arguments raise LLMError."""
+        with pytest.raises(LLMError):
+            self.caller.call_function("search_documents", "{not json")
+
+    def test_register_custom_function(self):
+        """Test registering and calling a custom function."""
+        self.caller.register_function(
+            name="add",
+            description="Add two numbers",
+            parameters={
+                "type": "object",
+                "properties": {"a": {"type": "number"}, "b": {"type": "number"}},
+                "required": ["a", "b"],
+            },
+            function=lambda a, b: a + b,
+        )
+
+        result = self.caller.call_function("add", {"a": 1, "b": 2})
+
+        assert result["success"] is True
+        assert result["result"] == 3
+
+    def test_function_definitions_cache_invalidated_on_register(self):
+        """Test that definitions are cached and refreshed after registration."""
+        first = self.caller.get_function_definitions()
+        assert self.caller.get_function_definitions() is first
+
+        self.caller.register_function(
+            name="noop",
+            description="Do nothing",
+            parameters={"type": "object", "properties": {}, "required": []},
+            function=lambda: None,
+        )
+
+        refreshed = self.caller.get_function_definitions()
+        assert refreshed is not first
+        assert [d["name"] for d in refreshed][-1] == "noop"
+
+    def test_tool_definitions_cache_invalidated_on_register(self):
+        """Test that tools-format definitions follow the same cache lifecycle."""
+        first = self.caller.get_tool_definitions()
+        assert self.caller.get_tool_definitions() is first
+
+        self.caller.register_function(
+            name="noop",
+            description="Do nothing",
+            parameters={"type": "object", "properties": {}, "required": []},
+            function=lambda: None,
+        )
+
+        refreshed = self.caller.get_tool_definitions()
+        assert refreshed is not first
+        assert refreshed[-1]["function"] is self.caller.get_function_definitions()[-1]
+
+    def test_create_function_call_message_is_compact(self):
+        """Test that function results are serialized without pretty-printing."""
+        message = self.caller.create_function_call_message([
+            {"success": True, "function_name": "f", "result": {"a": 1, "b": [1, 2]}},
+            {"success": False, "function_name": "g", "error": "boom"},
+        ])
+
+        assert message["role"] == "function"
+        assert "Function 'f' returned: {\"a\":1,\"b\":[1,2]}" in message["content"]
+        assert "Function 'g' failed: boom" in message["content"]
+
+    def test_calculate_statistics(self):
+        """Test the built-in statistics function."""
+        pytest.importorskip("numpy")
+
+        result = self.caller.call_function(
+            "calculate_statistics", {"numbers": [1, 2, 3, 4]}
+        )["result"]
+
+        assert result["count"] == 4
+        assert result["sum"] == 10
+        assert result["mean"] == 2.5
+        assert result["median"] == 2.5
+        assert result["stdev"] == pytest.approx(1.2909944, rel=1e-6)
+
+    def test_get_current_time_formats(self):
+        """Test the built-in time function output formats."""
+        readable = self.caller.call_function("get_current_time", {})["result"]
+        timestamp = self.caller.call_function(
+            "get_current_time", {"format": "timestamp"}
+        )["result"]
+
+        assert readable["format"] == "readable"
+        assert len(readable["current_time"]) == len("2024-01-01 00:00:00")
+        assert timestamp["current_time"].isdigit()
+
+    def test_process_function_calls(self):
+        """Test processing a batch of function calls in order."""
+        results = self.caller.process_function_calls([
+            {"name": "search_documents", "arguments": '{"query": "a"}'},
+            {"arguments": "{}"},
+        ])
+
+        assert results[0]["success"] is True
+        assert results[1] == {"success": False, "error": "Missing function name"}
+
+    def test_process_function_calls_concurrently(self):
+        """Test that several calls run in parallel and keep their order."""
+        barrier = threading.Barrier(3, timeout=5)
+
+        def echo(value):
+            barrier.wait()
+            return value
+
+        self.caller.register_function(
+            name="echo",
+            description="Return the value once all calls have started",
+            parameters={"type": "object", "properties": {"value": {"type": "integer"}}, "required": ["value"]},
+            function=echo,
+        )
+
+        results = self.caller.process_function_calls([
+            {"name": "echo", "arguments": {"value": i}} for i in range(3)
+        ])
+
+        assert [r["result"] for r in results] == [0, 1, 2]
+
+    def test_create_tool_messages(self):
+        """Test that tool results reference the ids of the model's tool calls."""
+        calls = [{"id": "call_1", "name": "get_current_time", "arguments": "{}"}]
+        results = self.caller.process_function_calls(calls)
+
+        assistant, tool = self.caller.create_tool_messages(calls, results)
+
+        assert assistant["tool_calls"][0]["id"] == "call_1"
+        assert tool["role"] == "tool"
+        assert tool["tool_call_id"] == "call_1"
+        assert tool["content"].startswith("Function 'get_current_time' returned:")
+        assert self.caller.get_tool_definitions()[0]["type"] == "function"
+
+    def test_get_function_help(self):
+        """Test help output lists required parameters in schema order."""
+        help_info = self.caller.get_function_help("search_documents")
+
+        assert help_info["name"] == "search_documents"
+        assert help_info["required_parameters"] == ["query"]
+        assert self.caller.get_function_help("missing") is None
@@ -0,0 +1,289 @@
+"""
+Tests for the LangChain LLM client.
+"""
+import asyncio
+import pytest
+import sys
+from dataclasses import replace
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.ai.langchain import llm_client as langchain_llm_client
+from src.ai.langchain.llm_client import LangchainLLMClient, _MicroBatcher
+
+
+class FakeChunk:
+    """Streamed message chunk supporting LangChain-style aggregation."""
+
+    def __init__(self, content):
+        self.content = content
+
+    def __add__(self, other):
+        return FakeChunk(self.content + other.content)
+
+
+class FakeLLM:
+    """Minimal stand-in for a LangChain chat model."""
+
+    def __init__(self):
+        self.batches = []
+        self.calls = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        return SimpleNamespace(content=f"answer {self.calls}", model="fake")
+
+    async def astream(self, messages):
+        for piece in ("Hel", "lo"):
+            yield FakeChunk(piece)
+
+    async def abatch(self, inputs, return_exceptions=False):
+        self.batches.append(len(inputs))
+        return [SimpleNamespace(content=f"answer {i}", model="fake") for i in range(len(inputs))]
+
+
+class SlowLLM:
+    """Fake model answering after a fixed delay."""
+
+    def __init__(self, name, delay, fail=False):
+        self.name, self.delay, self.fail = name, delay, fail
+        self.cancelled = False
+
+    async def ainvoke(self, messages):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.fail:
+            raise RuntimeError(self.name)
+        return SimpleNamespace(content=self.name, model=self.name)
+
+
+class TestMicroBatcher:
+    """Test cases for _MicroBatcher."""
+
+    def test_concurrent_calls_are_batched_per_llm(self):
+        """Test that concurrent submissions share one abatch call per LLM."""
+        batcher = _MicroBatcher(max_batch=8, max_wait=0.01)
+        first, second = FakeLLM(), FakeLLM()
+
+        async def run():
+            return await asyncio.gather(
+                batcher.submit(first, ["a"]),
+                batcher.submit(first, ["b"]),
+                batcher.submit(second, ["c"]),
+            )
+
+        results = asyncio.run(run())
+
+        assert [r.content for r in results] == ["answer 0", "answer 1", "answer 0"]
+        assert first.batches == [2]
+        assert second.batches == [1]
+
+    def test_max_batch_splits_batches(self):
+        """Test that batches never exceed max_batch items."""
+        batcher = _MicroBatcher(max_batch=2, max_wait=0.01)
+        llm = FakeLLM()
+
+        async def run():
+            return await asyncio.gather(*(batcher.submit(llm, [str(i)]) for i in range(5)))
+
+        assert len(asyncio.run(run())) == 5
+        assert max(llm.batches) <= 2
+        assert sum(llm.batches) == 5
+
+
+class TestLangchainLLMClient:
+    """Test cases for LangchainLLMClient with a fake model."""
+
+    def setup_method(self):
+        """Set up a client whose LLM is replaced by a fake."""
+        self.client = LangchainLLMClient({"temperature": 0.0})
+        self.client.llm = FakeLLM()
+        # Hand role dicts to the fake model unchanged
+        self.client._dict_messages = True
+
+    def test_generate_response_uses_cache(self):
+        """Test that deterministic responses are served from the cache."""
+        messages = [{"role": "user", "content": "Hi"}]
+
+        first = self.client.generate_response(messages)
+        second = self.client.generate_response(messages)
+
+        assert first["content"] == second["content"] == "answer 1"
+        assert self.client.llm.calls == 1
+
+    def test_agenerate_response(self):
+        """Test the async path returns the normalized response dict."""
+        result = asyncio.run(self.client.agenerate_response([{"role": "user", "content": "Hi"}]))
+
+        assert result["content"] == "answer 0"
+        assert result["finish_reason"] == "stop"
+        assert self.client.llm.batches == [1]
+
+    def test_cached_result_isolated_from_caller(self):
+        """Test that mutating a returned result does not change the cached answer."""
+        messages = [{"role": "user", "content": "Hi"}]
+
+        self.client.generate_response(messages)["content"] = "mutated"
+
+        assert self.client.generate_response(messages)["content"] == "answer 1"
+
+    def test_semantic_hits_scoped_to_surrounding_messages(self, monkeypatch):
+        """Test that a paraphrase only hits answers given for the same system prompt and parameters."""
+        pytest.importorskip("numpy")
+        monkeypatch.setattr(LangchainLLMClient, "_build_llm_with_overrides", lambda self, overrides: self.llm)
+        self.client.response_cache.embed_fn = lambda text: [1.0, 0.0]
+        system = {"role": "system", "content": "Context A"}
+
+        self.client.generate_response([system, {"role": "user", "content": "What is X?"}])
+        paraphrase = self.client.generate_response([system, {"role": "user", "content": "Define X"}])
+        other_context = self.client.generate_response(
+            [{"role": "system", "content": "Context B"}, {"role": "user", "content": "Define X"}]
+        )
+        other_params = self.client.generate_response([system, {"role": "user", "content": "Define X"}], max_tokens=50)
+
+        assert paraphrase["content"] == "answer 1"
+        assert other_context["content"] == "answer 2"
+        assert other_params["content"] == "answer 3"
+
+    def test_stream_response(self):
+        """Test that streamed chunks join to the full answer and are cached."""
+        chunks = [FakeChunk("Hel"), FakeChunk("lo")]
+        self.client.llm.stream = lambda messages: iter(chunks)
+        messages = [{"role": "user", "content": "Stream"}]
+
+        assert "".join(self.client.stream_response(messages)) == "Hello"
+        assert self.client.generate_response(messages)["content"] == "Hello"
+        assert self.client.llm.calls == 0
+
+    def test_speculative_generate_returns_fastest(self):
+        """Test that the first successful provider wins and the rest are cancelled."""
+        self.client.config["speculative_execution"] = True
+        fast_fail, fast, slow = SlowLLM("x", 0, fail=True), SlowLLM("fast", 0.01), SlowLLM("slow", 1)
+
+        async def run():
+            result = await self.client.speculative_generate(
+                [{"role": "user", "content": "Hi"}], providers=[fast_fail, slow, fast], no_cache=True
+            )
+            await asyncio.sleep(0)
+            return result
+
+        result = asyncio.run(run())
+
+        assert result["content"] == "fast"
+        assert slow.cancelled
+
+    def test_speculative_generate_caches_under_applied_overrides(self, monkeypatch):
+        """Test that overrides reach the primary LLM and unapplied ones are never cached."""
+        self.client.config["speculative_execution"] = True
+        messages = [{"role": "user", "content": "Hi"}]
+        full, short = SlowLLM("full", 0), SlowLLM("short", 0)
+        self.client.llm = full
+        monkeypatch.setattr(LangchainLLMClient, "_async_llm", lambda self, overrides: short if overrides else full)
+
+        result = asyncio.run(self.client.speculative_generate(messages, max_tokens=50))
+
+        assert result["content"] == "short"
+        assert self.client._prepare_call(messages, {"max_tokens": 50})[-1]["content"] == "short"
+        assert self.client._prepare_call(messages, {})[-1] is None
+
+        # An extra provider ignores max_tokens, so its answer must not be cached
+        self.client.config["speculative_providers"] = [SlowLLM("extra", 0)]
+        short.delay = 1
+        result = asyncio.run(self.client.speculative_generate(messages, max_tokens=60))
+
+        assert result["content"] == "extra"
+        assert self.client._prepare_call(messages, {"max_tokens": 60})[-1] is None
+
+    def test_astream_response(self):
+        """Test that async streaming yields chunks and caches the aggregate."""
+        messages = [{"role": "user", "content": "Async stream"}]
+
+        async def collect():
+            return [piece async for piece in self.client.astream_response(messages)]
+
+        assert asyncio.run(collect()) == ["Hel", "lo"]
+        assert self.client.generate_response(messages)["content"] == "Hello"
+
+    def test_atest_connection(self):
+        """Test the async connection check bypasses the response cache."""
+        first = asyncio.run(self.client.atest_connection())
+        second = asyncio.run(self.client.atest_connection())
+
+        assert first["success"] and second["success"]
+        assert self.client.llm.batches == [1, 1]
+
+    def test_agenerate_response_coalesces_inflight(self):
+        """Test that identical concurrent requests share one provider call."""
+        messages = [{"role": "user", "content": "Same question"}]
+
+        async def run():
+            return await asyncio.gather(*(self.client.agenerate_response(messages) for _ in range(3)))
+
+        results = asyncio.run(run())
+
+        assert [r["content"] for r in results] == ["answer 0"] * 3
+        assert self.client.llm.batches == [1]
+        assert not self.client._inflight
+
+    def test_cancelled_leader_does_not_cancel_followers(self):
+        """Test that coalesced requests still get answers when the first caller is cancelled."""
+        messages = [{"role": "user", "content": "Slow question"}]
+        fake = self.client.llm
+        plain_abatch = fake.abatch
+
+        async def slow_abatch(inputs, return_exceptions=False):
+            await asyncio.sleep(0.05)
+            return await plain_abatch(inputs, return_exceptions)
+
+        fake.abatch = slow_abatch
+
+        async def run():
+            leader = asyncio.ensure_future(self.client.agenerate_response(messages))
+            await asyncio.sleep(0)
+            followers = asyncio.gather(*(self.client.agenerate_response(messages) for _ in range(2)))
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            results = await followers
+            return leader.cancelled(), results
+
+        leader_cancelled, results = asyncio.run(run())
+
+        assert leader_cancelled
+        assert [r["content"] for r in results] == ["answer 0"] * 2
+        assert not self.client._inflight
+
+
+class TestAsyncModelsPerLoop:
+    """Test that async calls never reuse connections from another event loop."""
+
+    def test_models_built_per_event_loop(self, monkeypatch):
+        """Test that each loop gets its own ChatOpenAI around its own async pool."""
+        class FakeChatOpenAI:
+            def __init__(self, **params):
+                self.params = params
+
+        monkeypatch.setattr(langchain_llm_client, "_LANGCHAIN", (FakeChatOpenAI, None, None, None))
+        monkeypatch.setattr(langchain_llm_client, "_shared_http_client", lambda: "sync pool")
+        # Stand-in async pool: the loop itself
+        monkeypatch.setattr(langchain_llm_client, "_loop_http_client", asyncio.get_running_loop)
+        monkeypatch.setattr(langchain_llm_client, "settings", replace(langchain_llm_client.settings, openai_api_key="test-key"))
+        client = LangchainLLMClient()
+
+        async def pick():
+            return client._async_llm({}), client._async_llm({}), asyncio.get_running_loop()
+
+        first, again, first_loop = asyncio.run(pick())
+        second, _, second_loop = asyncio.run(pick())
+
+        assert first is again
+        assert first.params["http_async_client"] is first_loop
+        assert second.params["http_async_client"] is second_loop
+        assert "http_async_client" not in client.llm.params
+
@@ -0,0 +1,29 @@
+"""
+Tests for the LangChain conversation memory manager.
+"""
+import pytest
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.ai.langchain.memory_manager import LangchainMemoryManager
+
+
+class TestLangchainMemoryManager:
+    """Test cases for LangchainMemoryManager."""
+
+    def test_shared_llm_left_untouched(self):
+        """Test that token counting stays local instead of patching the shared LLM."""
+        def get_num_tokens(text):
+            return 42
+
+        llm = SimpleNamespace(model_name="gpt-4o-mini", get_num_tokens=get_num_tokens)
+
+        manager = LangchainMemoryManager(llm=llm)
+
+        assert llm.get_num_tokens is get_num_tokens
+        assert manager.count_tokens("abcdefgh") > 0
@@ -0,0 +1,56 @@
+"""
+Tests for the LangChain prompt manager.
+"""
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.ai.langchain.prompt_manager import LangchainPromptManager
+
+
+class TestLangchainPromptManager:
+    """Test cases for LangchainPromptManager."""
+
+    def test_qa_prompt_plain(self):
+        """Test that QA prompts keep plain string content by default."""
+        messages = LangchainPromptManager().build_qa_prompt(context="Some facts.", question="What?")
+
+        assert messages[0]["role"] == "system"
+        assert "Some facts." in messages[-1]["content"]
+        assert messages[-1]["content"].endswith("Question: What?\n\nAnswer:")
+
+    def test_qa_prompt_cache_breakpoint(self):
+        """Test that prompt caching splits context and question blocks."""
+        manager = LangchainPromptManager({"prompt_caching": True})
+
+        messages = manager.build_qa_prompt(context="Some facts.", question="What?", use_chain_of_thought=True)
+        context_block, question_block = messages[-1]["content"]
+
+        assert [m["role"] for m in messages] == ["system", "system", "user"]
+        assert context_block["cache_control"] == {"type": "ephemeral"}
+        assert "Some facts." in context_block["text"]
+        assert "cache_control" not in question_block
+        assert question_block["text"] == "Question: What?\n\nAnswer:"
+
+    def test_qa_prompt_cache_skipped_without_context(self):
+        """Test that empty context falls back to a direct question prompt."""
+        manager = LangchainPromptManager({"prompt_caching": True})
+
+        messages = manager.build_qa_prompt(context="  ", question="What?")
+
+        assert isinstance(messages[-1]["content"], str)
+
+    def test_qa_prompt_cached_shares_system_prefix(self):
+        """Test that cached QA prompts keep one system message for all inputs."""
+        manager = LangchainPromptManager()
+
+        with_context = manager.build_qa_prompt_cached("Some facts.", "What?")
+        without_context = manager.build_qa_prompt_cached("", "What?")
+
+        assert with_context[0] == without_context[0]
+        assert with_context[1]["content"] == "<context>\nSome facts.\n</context>\n\nQuestion: What?"
+        assert without_context[1]["content"] == "Question: What?"
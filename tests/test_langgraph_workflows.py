@@ -0,0 +1,357 @@
+"""
+Tests for the LangGraph QA and summarization workflows.
+"""
+import asyncio
+import pytest
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.ai.langchain.prompt_manager import LangchainPromptManager
+from src.ai.langgraph.workflows.qa_workflow import _QA_CACHE, create_qa_workflow, create_qa_workflow_async
+from src.ai.langgraph.workflows.summarization_workflow import (
+    _SUMMARY_CACHE,
+    create_summarization_workflow,
+    create_summarization_workflow_async,
+)
+
+
+class FakeSearchEngine:
+    """Search engine returning fixed results."""
+
+    def __init__(self, texts):
+        self.texts = texts
+        self.calls = 0
+
+    def search(self, query, **kwargs):
+        self.calls += 1
+        return [SimpleNamespace(text=t, score=0.9, metadata={}) for t in self.texts]
+
+
+class BatchSearchEngine(FakeSearchEngine):
+    """Search engine that also answers many questions in one call."""
+
+    def search_batch(self, queries, **kwargs):
+        self.calls += 1
+        return [[SimpleNamespace(text=f"{q} is answered here.", score=0.9, metadata={})] for q in queries]
+
+
+class FakeLLMClient:
+    """LLM client echoing the last user message."""
+
+    def __init__(self):
+        self.calls = []
+
+    def generate_response(self, messages, **kwargs):
+        self.calls.append(messages)
+        content = messages[-1]["content"]
+        if not isinstance(content, str):
+            content = "".join(part["text"] for part in content)
+        return {"content": "Answer about " + content, "finish_reason": "stop"}
+
+
+class FlakyLLMClient(FakeLLMClient):
+    """LLM client whose first call fails the way real clients report errors."""
+
+    def generate_response(self, messages, **kwargs):
+        if not self.calls:
+            self.calls.append(messages)
+            return {"content": "LLM generation failed: boom timeout", "finish_reason": "error"}
+        return super().generate_response(messages, **kwargs)
+
+
+class StreamingLLMClient(FakeLLMClient):
+    """LLM client that also streams its answer in two pieces."""
+
+    async def astream_response(self, messages, **kwargs):
+        text = self.generate_response(messages)["content"]
+        middle = len(text) // 2
+        for piece in (text[:middle], text[middle:]):
+            yield piece
+
+
+class TestQAWorkflow:
+    """Test cases for the QA workflow."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        _QA_CACHE.clear()
+        self.search = FakeSearchEngine(["Paris is the capital of France."])
+        self.llm = FakeLLMClient()
+        self.state = {
+            "question": "What is the capital of France?",
+            "search_engine": self.search,
+            "llm_client": self.llm,
+            "prompt_manager": LangchainPromptManager(),
+        }
+
+    def test_invoke(self):
+        """Test the synchronous workflow answers from search context."""
+        state = create_qa_workflow().invoke(self.state)
+
+        assert "Paris" in state["answer"]
+        assert state["confidence"] > 0
+
+    def test_ainvoke(self):
+        """Test the async workflow matches the synchronous result."""
+        state = asyncio.run(create_qa_workflow_async().ainvoke(self.state))
+
+        assert "Paris" in state["answer"]
+        assert self.search.calls == 1
+
+    def test_speculative_prefetch_used_without_context(self):
+        """Test that the prefetched direct answer is reused when search is empty."""
+        self.search.texts = []
+        self.state["speculative_prefetch"] = True
+
+        state = asyncio.run(create_qa_workflow_async().ainvoke(self.state))
+
+        assert state["answer"].startswith("Answer about Question:")
+        assert len(self.llm.calls) == 1
+
+    def test_speculative_prefetch_respects_gate(self):
+        """Test that gated questions are answered without a prefetch reaching the LLM."""
+        self.search.texts = []
+        self.state["speculative_prefetch"] = True
+
+        state = asyncio.run(create_qa_workflow_async().ainvoke({**self.state, "question": "Hello!"}))
+
+        assert state["answer"].startswith("Hello")
+        assert self.llm.calls == []
+
+    def test_failed_prefetch_not_used(self):
+        """Test that a prefetched answer reporting an error is regenerated, not returned."""
+        self.search.texts = []
+        self.state["speculative_prefetch"] = True
+        self.state["llm_client"] = llm = FlakyLLMClient()
+
+        state = asyncio.run(create_qa_workflow_async().ainvoke(self.state))
+
+        assert state["answer"].startswith("Answer about")
+        assert len(llm.calls) == 2
+
+    def test_ainvoke_streams_answer(self):
+        """Test that answer chunks are pushed to the caller's queue."""
+        self.state["llm_client"] = StreamingLLMClient()
+
+        async def run():
+            queue = asyncio.Queue()
+            state = await create_qa_workflow_async().ainvoke({**self.state, "answer_stream": queue})
+            pieces = []
+            while (piece := queue.get_nowait()) is not None:
+                pieces.append(piece)
+            return state, pieces
+
+        state, pieces = asyncio.run(run())
+
+        assert len(pieces) == 2
+        assert "".join(pieces) == state["answer"]
+
+    def test_answer_cache(self):
+        """Test that a repeated question is answered from the workflow cache."""
+        self.state["question"] = "Which city is the capital of France?"
+        workflow = create_qa_workflow()
+
+        first = workflow.invoke(self.state)
+        second = workflow.invoke(self.state)
+
+        assert first["answer"] == second["answer"]
+        assert len(self.llm.calls) == 1
+
+    def test_failed_generation_not_cached(self):
+        """Test that an error response is not served from the answer cache."""
+        self.state["llm_client"] = llm = FlakyLLMClient()
+        self.state["question"] = "Which river flows through Paris?"
+        workflow = create_qa_workflow()
+
+        workflow.invoke(self.state)
+        state = workflow.invoke(self.state)
+
+        assert not state["answer"].startswith("LLM generation failed")
+        assert len(llm.calls) >= 2
+
+    def test_semantic_answer_cache_scoped_to_context(self):
+        """Test that a question asked against another notebook is not answered from the first."""
+        pytest.importorskip("numpy")
+        embedded = []
+        embedder = SimpleNamespace(generate_embedding=lambda q: embedded.append(q) or [1.0, 0.0])
+        workflow = create_qa_workflow()
+
+        answers = []
+        for text in ("Paris is the capital of France.", "Lyon is a large French city."):
+            engine = FakeSearchEngine([text])
+            engine.vector_db = SimpleNamespace(embedding_generator=embedder)
+            answers.append(workflow.invoke({**self.state, "search_engine": engine})["answer"])
+
+        assert "Paris" in answers[0] and "Lyon" in answers[1]
+        assert len(self.llm.calls) == 2
+        # One embedding per cache miss, shared by lookup and store
+        assert len(embedded) == 2
+
+    def test_search_sees_new_content(self):
+        """Test that search results are not reused across invocations, so new uploads are found."""
+        workflow = create_qa_workflow()
+        self.search.texts = []
+
+        empty = workflow.invoke(self.state)
+        self.search.texts = ["Paris is the capital of France."]
+        state = workflow.invoke(self.state)
+
+        assert empty["error"] == "no_relevant_content_found"
+        assert "Paris" in state["answer"]
+        assert self.search.calls == 2
+
+    def test_gate_answers_greetings_without_llm(self):
+        """Test that greetings and malformed questions never reach the LLM."""
+        workflow = create_qa_workflow()
+
+        greeting = workflow.invoke({**self.state, "question": "Hello!"})
+        malformed = workflow.invoke({**self.state, "question": "???"})
+
+        assert greeting["answer"].startswith("Hello")
+        assert malformed["error"] == "malformed_question"
+        assert self.llm.calls == []
+
+    def test_speculative_decoding_with_fallback(self):
+        """Test that a draft model routes through generate_response_speculative, falling back on errors."""
+        draft = object()
+        used = []
+
+        def speculative(messages, draft_client, k, **kwargs):
+            used.append((draft_client, k))
+            raise RuntimeError("draft unavailable")
+
+        self.llm.generate_response_speculative = speculative
+        state = create_qa_workflow().invoke({**self.state, "draft_llm_client": draft})
+
+        assert used == [(draft, 4)]
+        assert "Paris" in state["answer"]
+
+    def test_invoke_batch(self):
+        """Test that batched questions share one search call and keep their order."""
+        self.state["search_engine"] = search = BatchSearchEngine([])
+        questions = ["What is the capital of France?", "What is the capital of Spain?"]
+
+        states = create_qa_workflow().invoke_batch([{**self.state, "question": q} for q in questions])
+
+        assert [q in s["answer"] for q, s in zip(questions, states)] == [True, True]
+        assert search.calls == 1
+
+    def test_invoke_batch_dedupes_repeated_questions(self):
+        """Test that a question repeated within one batch is searched once."""
+        states = create_qa_workflow().invoke_batch([self.state, dict(self.state)])
+
+        assert all("Paris" in s["answer"] for s in states)
+        assert self.search.calls == 1
+
+
+class TestSummarizationWorkflow:
+    """Test cases for the summarization workflow."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        _SUMMARY_CACHE.clear()
+        self.llm = FakeLLMClient()
+        self.state = {
+            "content": "word " * 1000,
+            "llm_client": self.llm,
+            "prompt_manager": LangchainPromptManager(),
+        }
+
+    def test_invoke_single_call(self):
+        """Test the synchronous workflow summarizes in one call."""
+        state = create_summarization_workflow().invoke(self.state)
+
+        assert state["summary"]
+        assert len(self.llm.calls) == 1
+
+    def test_failed_generation_not_cached(self):
+        """Test that an error response is not stored as the document's summary."""
+        self.state["llm_client"] = llm = FlakyLLMClient()
+        workflow = create_summarization_workflow()
+
+        workflow.invoke(self.state)
+        cached_after_failure = len(_SUMMARY_CACHE)
+        state = workflow.invoke(self.state)
+
+        assert cached_after_failure == 0
+        assert state["summary"].startswith("Answer about")
+        assert len(llm.calls) == 2
+
+    def test_invoke_summarizes_original_content(self):
+        """Test that the prompt uses the source content rather than re-joined chunks."""
+        self.state["content"] = "x" * 1499 + " tail of the document"
+
+        state = create_summarization_workflow().invoke(self.state)
+
+        assert len(state["chunks"]) == 2
+        assert self.state["content"] in self.llm.calls[0][-1]["content"]
+
+    def test_ainvoke_map_reduce(self):
+        """Test the async workflow maps over chunks and reduces once."""
+        state = asyncio.run(create_summarization_workflow_async().ainvoke(self.state))
+
+        prompts = [messages[-1]["content"] for messages in self.llm.calls]
+        assert state["summary"].startswith("Answer about Combine the following partial summaries")
+        assert len(prompts) == len(state["chunks"]) + 1
+        assert "[Part 1]" in prompts[-1]
+
+    def test_ainvoke_tree_reduce(self):
+        """Test that many partial summaries are merged in groups before the final reduce."""
+        self.state["content"] = "word " * 3000
+
+        state = asyncio.run(create_summarization_workflow_async().ainvoke(self.state))
+
+        reduce_prompts = [m[-1]["content"] for m in self.llm.calls if "[Part 1]" in m[-1]["content"]]
+        assert len(state["chunks"]) == 10
+        # 10 partials -> groups of 4, 4, 2 -> one final reduce
+        assert len(reduce_prompts) == 4
+        assert all("[Part 5]" not in p for p in reduce_prompts)
+
+
+class TestQAValidation:
+    """Test cases for QA answer validation."""
+
+    def test_fused_node_retries_like_graph(self):
+        """Test that the fused node retries until _should_continue ends the loop."""
+        from src.ai.langgraph.workflows.qa_workflow import _synth_and_validate
+
+        calls = []
+        llm = SimpleNamespace(generate_response=lambda messages, **kwargs: calls.append(messages) or {"content": "Something else entirely."})
+        state = {"question": "Capital of France?", "context": "", "llm_client": llm,
+                 "prompt_manager": LangchainPromptManager(), "no_cache": True}
+
+        result = _synth_and_validate(state)
+
+        assert result["max_retries"] == 2
+        assert len(calls) == 2
+        assert "question" not in result
+
+    def test_retry_bypasses_answer_cache(self):
+        """Test that a low-confidence answer is regenerated, not re-read from the cache."""
+        from src.ai.langgraph.workflows.qa_workflow import _synth_and_validate
+
+        _QA_CACHE.clear()
+        calls = []
+        llm = SimpleNamespace(generate_response=lambda messages, **kwargs: calls.append(kwargs) or
+                              {"content": "Something else entirely.", "finish_reason": "stop"})
+        state = {"question": "Capital of Portugal?", "context": "", "llm_client": llm,
+                 "prompt_manager": LangchainPromptManager()}
+
+        result = _synth_and_validate(state)
+
+        assert result["max_retries"] == 2
+        assert len(calls) == 2
+
+    def test_overlap_ignores_case_and_punctuation(self):
+        """Test that question tokens match answer words regardless of case/punctuation."""
+        from src.ai.langgraph.workflows.qa_workflow import _validate_agent
+
+        result = _validate_agent({"question": "Capital of France?", "answer": "FRANCE's capital, of course.", "confidence": 0.8})
+
+        assert result["confidence"] == pytest.approx(0.9)
+        assert result["q_tokens"] == frozenset({"capital", "of", "france"})
@@ -0,0 +1,194 @@
+"""
+Tests for the OpenAI SDK LLM client.
+"""
+import asyncio
+import json
+import pytest
+import sys
+from dataclasses import replace
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.ai import llm_client as llm_client_module
+from src.ai.llm_client import LLMClient
+from src.utils.tokens import token_encoding
+
+# Keep the global conversation memory out of these tests
+NO_MEMORY = {"use_memory": False, "store_in_memory": False}
+
+
+class FakeCompletions:
+    """chat.completions stand-in answering "answer <n>"."""
+
+    def __init__(self):
+        self.calls = []
+
+    def create(self, **params):
+        self.calls.append(params)
+        message = SimpleNamespace(content=f"answer {len(self.calls)}", tool_calls=None, function_call=None)
+        return SimpleNamespace(
+            model=params["model"],
+            usage=None,
+            choices=[SimpleNamespace(message=message, finish_reason="stop")],
+        )
+
+
+def raw_completion(body):
+    """httpx-like response carrying a chat-completions JSON body."""
+    data = {
+        "model": body["model"],
+        "choices": [{"message": {"content": "raw answer"}, "finish_reason": "stop"}],
+        "usage": {"total_tokens": 3},
+    }
+    return SimpleNamespace(content=json.dumps(data).encode())
+
+
+class FakeSDKClient:
+    """Minimal stand-in for a sync OpenAI SDK client, including the raw transport."""
+
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=FakeCompletions())
+        self.posts = []
+
+    @property
+    def calls(self):
+        return self.chat.completions.calls
+
+    def post(self, path, body, cast_to):
+        self.posts.append((path, body))
+        return raw_completion(body)
+
+
+class FakeAsyncCompletions(FakeCompletions):
+    """Async chat.completions stand-in."""
+
+    async def create(self, **params):
+        return FakeCompletions.create(self, **params)
+
+
+class FakeAsyncSDKClient:
+    """Minimal stand-in for an async OpenAI SDK client, including the raw transport."""
+
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=FakeAsyncCompletions())
+        self.posts = []
+
+    @property
+    def calls(self):
+        return self.chat.completions.calls
+
+    async def post(self, path, body, cast_to):
+        self.posts.append((path, body))
+        return raw_completion(body)
+
+
+class TestLLMClient:
+    """Test cases for LLMClient with a fake SDK client."""
+
+    @pytest.fixture(autouse=True)
+    def _client(self, monkeypatch):
+        """Build a client whose SDK client is replaced by a fake."""
+        pytest.importorskip("openai")
+        monkeypatch.setattr(llm_client_module, "settings", replace(
+            llm_client_module.settings, openai_api_key="sk-test", azure_openai_api_key=None
+        ))
+        self.monkeypatch = monkeypatch
+        self.client = self._make_client()
+
+    def _make_client(self, **kwargs):
+        client = LLMClient({"temperature": 0.0}, **kwargs)
+        client.openai_client = FakeSDKClient()
+        return client
+
+    def test_cache_key_ignores_memory_context(self):
+        """Test that the response cache is keyed before the per-turn memory context is added."""
+        turns = iter(range(100))
+
+        def enhance(self, messages, **kwargs):
+            return [{"role": "system", "content": f"Context turn {next(turns)}"}, *messages]
+
+        self.monkeypatch.setattr(LLMClient, "_enhance_with_memory", enhance)
+        messages = [{"role": "user", "content": "Hi"}]
+
+        first = self.client.generate_response(messages, store_in_memory=False)
+        second = self.client.generate_response(messages, store_in_memory=False)
+
+        assert first.content == second.content == "answer 1"
+        assert len(self.client.openai_client.calls) == 1
+        assert self.client.openai_client.calls[0]["messages"][0]["content"] == "Context turn 0"
+
+    def test_semantic_hits_scoped_to_generation_params(self):
+        """Test that a paraphrase only hits answers generated with the same model parameters."""
+        pytest.importorskip("numpy")
+        client = self._make_client(embed_fn=lambda text: [1.0, 0.0])
+
+        client.generate_response([{"role": "user", "content": "What is X?"}], max_tokens=50, **NO_MEMORY)
+        paraphrase = client.generate_response([{"role": "user", "content": "Define X"}], max_tokens=50, **NO_MEMORY)
+        longer = client.generate_response([{"role": "user", "content": "Define X"}], max_tokens=500, **NO_MEMORY)
+
+        assert paraphrase.content == "answer 1"
+        assert longer.content == "answer 2"
+        assert len(client.openai_client.calls) == 2
+
+    def test_count_tokens_estimates_when_encoding_unavailable(self):
+        """Test that a failed BPE download falls back to the ~4 characters per token estimate."""
+        def offline(name):
+            raise ConnectionError("BPE download blocked")
+
+        self.monkeypatch.setitem(sys.modules, "tiktoken", SimpleNamespace(encoding_for_model=offline, get_encoding=offline))
+        token_encoding.cache_clear()
+        try:
+            client = self._make_client()
+            assert client.count_tokens("abcdefgh") == 2
+            assert client.count_tokens(["abcd", "abcdefgh"]) == [1, 2]
+        finally:
+            token_encoding.cache_clear()
+
+    def test_agenerate_response_without_credentials(self):
+        """Test that the async path returns the placeholder response without SDK clients."""
+        self.client.openai_client = None
+
+        result = asyncio.run(self.client.agenerate_response([{"role": "user", "content": "Hi"}], **NO_MEMORY))
+
+        assert result.finish_reason == "no_api_key"
+        assert result.model == "none"
+
+    def test_agenerate_response_uses_async_client_and_cache(self):
+        """Test that async generations go through the async SDK client and are cached."""
+        fake = FakeAsyncSDKClient()
+        self.client._async_client = lambda: fake
+        messages = [{"role": "user", "content": "Hi"}]
+
+        async def run():
+            first = await self.client.agenerate_response(messages, **NO_MEMORY)
+            second = await self.client.agenerate_response(messages, **NO_MEMORY)
+            return first, second
+
+        first, second = asyncio.run(run())
+
+        assert first.content == second.content == "answer 1"
+        assert second.usage == {"cached": 1}
+        assert len(fake.calls) == 1
+        assert not self.client.openai_client.calls
+
+    def test_raw_json_transport(self):
+        """Test that plain completions are posted raw and parsed from JSON on both paths."""
+        pytest.importorskip("httpx")
+        client = self._make_client()
+        client._raw_json_transport = True
+        fake = FakeAsyncSDKClient()
+        client._async_client = lambda: fake
+
+        sync_result = client.generate_response([{"role": "user", "content": "Sync"}], no_cache=True, **NO_MEMORY)
+        async_result = asyncio.run(client.agenerate_response([{"role": "user", "content": "Async"}], no_cache=True, **NO_MEMORY))
+
+        assert sync_result.content == async_result.content == "raw answer"
+        assert async_result.usage == {"total_tokens": 3}
+        assert [path for path, _ in client.openai_client.posts] == ["/chat/completions"]
+        assert fake.posts[0][0] == "/chat/completions"
+        assert fake.posts[0][1]["messages"] == [{"role": "user", "content": "Async"}]
+        assert not client.openai_client.calls and not fake.calls
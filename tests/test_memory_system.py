@@ -205,6 +205,10 @@ class TestLongTermMemory:
         # Search by memory type
         fact_results = self.long_term.search_memories("", memory_type="fact", limit=5)
         assert len(fact_results) == 3
+
+        # Queries with trigrams absent from every entry miss without a scan
+        assert self.long_term.search_memories("Rust", limit=5) == []
+        assert len(self.long_term.search_memories("DATA SCI", limit=5)) == 1
     
     def test_consolidation(self):
         """Test consolidating from short-term memory."""
@@ -283,6 +287,21 @@ class TestMemoryManager:
         assert len(context) == 1
         assert context[0].user_input == "What is AI?"
     
+    def test_concurrent_turn_ids_unique(self):
+        """Test that turns recorded from several threads get distinct ids."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        def add(i):
+            return self.memory_manager.add_conversation_turn(
+                user_input=f"Question {i}", assistant_response="Answer",
+                context_used=[], processing_time=0.1, confidence_score=0.5
+            )
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            turn_ids = list(pool.map(add, range(20)))
+
+        assert len(set(turn_ids)) == 20
+
     def test_fact_management(self):
         """Test adding and retrieving facts."""
         fact_id = self.memory_manager.add_fact(
@@ -0,0 +1,88 @@
+"""
+Tests for application settings.
+"""
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from config.settings import Settings, get_settings, settings
+
+
+class TestSettings:
+    """Test cases for Settings."""
+
+    def test_get_settings_returns_singleton(self):
+        """Test that the accessor always returns the same instance."""
+        assert get_settings() is get_settings()
+        assert get_settings() is settings
+
+    def test_from_env_reads_environment(self, monkeypatch):
+        """Test that from_env reads environment variables."""
+        monkeypatch.setenv("CHUNK_SIZE", "1234")
+        monkeypatch.setenv("DEBUG", "true")
+
+        fresh = Settings.from_env()
+
+        assert fresh.chunk_size == 1234
+        assert fresh.debug is True
+
+    def test_constructor_reads_environment(self, monkeypatch):
+        """Test that bare construction reads environment variables like from_env."""
+        from config.settings import Flag
+
+        monkeypatch.setenv("CHUNK_SIZE", "1234")
+        monkeypatch.setenv("ENABLE_WEB_SEARCH", "true")
+
+        fresh = Settings()
+
+        assert fresh == Settings.from_env()
+        assert fresh.chunk_size == 1234
+        assert fresh.flags & Flag.WEB_SEARCH
+        assert Settings(chunk_size=5).chunk_size == 5
+
+    def test_parse_env_file(self, tmp_path):
+        """Test native .env parsing of comments, quotes and exports."""
+        env_file = tmp_path / ".env"
+        env_file.write_text(
+            "# comment\n"
+            "\n"
+            "APP_NAME=Thunderbolts\n"
+            "export LOG_LEVEL=DEBUG\n"
+            "OPENAI_BASE_URL=\"https://example.com/v1\"\n"
+            "TTS_VOICE=alloy # inline comment\n"
+            "NOT_A_PAIR\n",
+            encoding="utf-8",
+        )
+
+        values = Settings._parse_env_file(env_file)
+
+        assert values == {
+            "APP_NAME": "Thunderbolts",
+            "LOG_LEVEL": "DEBUG",
+            "OPENAI_BASE_URL": "https://example.com/v1",
+            "TTS_VOICE": "alloy",
+        }
+
+    def test_settings_are_immutable(self):
+        """Test that settings cannot be reassigned after construction."""
+        with pytest.raises(AttributeError):
+            settings.chunk_size = 1
+
+    def test_feature_flags(self, monkeypatch):
+        """Test that enable_* switches are packed into the flags bitmask."""
+        from config.settings import Flag
+
+        monkeypatch.setenv("ENABLE_WEB_SEARCH", "true")
+        monkeypatch.setenv("ENABLE_TTS", "false")
+
+        fresh = Settings.from_env()
+
+        assert fresh.flags & Flag.WEB_SEARCH
+        assert not fresh.flags & Flag.TTS
+        assert fresh.enable_web_search is True
+        assert fresh.enable_tts is False
+        assert Settings().cache_enabled is True